@@ -0,0 +1,89 @@
+import asyncio
+import time
+from src.ingestion.loader import DocumentLoader
+from src.chunking.chunker import SmartChunker
+from src.vectorstore.embeddings import Embedder
+from src.vectorstore.store import VectorStore
+from src.vectorstore.retriever import AsyncRetriever
+
+
+WORKER_COUNTS = [1, 2, 4, 8]
+CONCURRENT_REQUESTS = 64
+
+QUESTIONS = [
+    "What are the key features of GovDelivery Communications Cloud?",
+    "How much does the Enterprise plan cost for 100,000 subscribers?",
+    "Which Meeting Management Suite tier includes multi-language support?",
+    "What encryption standards are used for data at rest and in transit?",
+]
+
+
+async def measure_loop_lag(stop: asyncio.Event) -> float:
+    """
+    Heartbeat on the event loop; the worst lag shows how long the loop
+    was blocked (what /health would experience under load).
+    """
+    worst = 0.0
+    while not stop.is_set():
+        tick = time.perf_counter()
+        await asyncio.sleep(0.01)
+        worst = max(worst, time.perf_counter() - tick - 0.01)
+    return worst
+
+
+async def run_level(store: VectorStore, workers: int) -> dict:
+    retriever = AsyncRetriever(store, max_workers=workers)
+
+    # Warm-up so thread start-up is not measured
+    await retriever.query(QUESTIONS[0])
+
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_loop_lag(stop))
+
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        retriever.query(QUESTIONS[i % len(QUESTIONS)])
+        for i in range(CONCURRENT_REQUESTS)
+    ])
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    max_lag = await lag_task
+    retriever.shutdown()
+
+    return {
+        "workers": workers,
+        "seconds": elapsed,
+        "qps": CONCURRENT_REQUESTS / elapsed,
+        "max_loop_lag_ms": max_lag * 1000
+    }
+
+
+async def run_benchmark():
+    embedder = Embedder()
+    store = VectorStore(embedder=embedder)
+
+    if store.is_empty():
+        documents = DocumentLoader(data_dir="data").load()
+        store.index_chunks(SmartChunker().chunk_documents(documents))
+
+    # Baseline: the old behaviour, calling store.query on the loop
+    start = time.perf_counter()
+    for i in range(CONCURRENT_REQUESTS):
+        store.query(QUESTIONS[i % len(QUESTIONS)])
+    blocking_qps = CONCURRENT_REQUESTS / (time.perf_counter() - start)
+
+    print("\n🚀 Retrieval Concurrency Benchmark\n")
+    print(f"On-loop (blocking) baseline: {blocking_qps:.1f} q/s\n")
+    print(f"{'workers':>8} {'seconds':>9} {'q/s':>8} {'speedup':>8} {'loop lag ms':>12}")
+
+    for workers in WORKER_COUNTS:
+        row = await run_level(store, workers)
+        print(
+            f"{row['workers']:>8} {row['seconds']:>9.2f} {row['qps']:>8.1f} "
+            f"{row['qps'] / blocking_qps:>7.2f}x {row['max_loop_lag_ms']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
@@ -0,0 +1,86 @@
+import time
+
+import numpy as np
+
+from src.vectorstore.embeddings import Embedder
+
+
+QUERY_RUNS = 200
+BATCH_SIZE = 64
+
+QUESTIONS = [
+    "What are the key features of GovDelivery Communications Cloud?",
+    "How much does the Enterprise plan cost for 100,000 subscribers?",
+    "Which Meeting Management Suite tier includes multi-language support?",
+    "What encryption standards are used for data at rest and in transit?",
+    "Which customer segments prioritize GIS integration as a key requirement?",
+]
+
+PASSAGE = (
+    "Granicus provides cloud-based solutions for government agencies, including "
+    "GovDelivery Communications Cloud for email and SMS outreach, Meeting Management "
+    "Suite for agendas and minutes, and records management with audit logging. "
+)
+
+# (label, Embedder kwargs)
+BACKENDS = [
+    ("torch", {"backend": "torch"}),
+    ("onnx fp32", {"backend": "onnx", "onnx_quantize": False}),
+    ("onnx int8", {"backend": "onnx", "onnx_quantize": True}),
+]
+
+
+def query_latencies(embedder: Embedder):
+    latencies = []
+
+    for i in range(QUERY_RUNS):
+        start = time.perf_counter()
+        embedder.embed_query(QUESTIONS[i % len(QUESTIONS)])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    return np.percentile(latencies, 50), np.percentile(latencies, 95)
+
+
+def batch_throughput(embedder: Embedder):
+    passages = [f"{i}. {PASSAGE}" for i in range(BATCH_SIZE)]
+
+    start = time.perf_counter()
+    embedder.embed_texts(passages)
+    return BATCH_SIZE / (time.perf_counter() - start)
+
+
+def run_benchmark():
+    print("\n🚀 Embedding Backend Benchmark\n")
+    print(f"{QUERY_RUNS} single queries, {BATCH_SIZE}-passage batch\n")
+    print(
+        f"{'backend':>10} {'load s':>7} {'query p50 ms':>13} {'query p95 ms':>13} "
+        f"{'passages/s':>11} {'min cosine':>11}"
+    )
+
+    reference = None
+
+    for label, kwargs in BACKENDS:
+        start = time.perf_counter()
+        embedder = Embedder(**kwargs)
+        load_seconds = time.perf_counter() - start
+
+        # Warm-up
+        embedder.embed_query(QUESTIONS[0])
+
+        p50, p95 = query_latencies(embedder)
+        throughput = batch_throughput(embedder)
+
+        # Agreement with the torch path on the benchmark questions
+        vectors = np.array(embedder.embed_texts(QUESTIONS))
+        if reference is None:
+            reference = vectors
+        cosine = float((reference * vectors).sum(axis=1).min())
+
+        print(
+            f"{label:>10} {load_seconds:>7.2f} {p50:>13.2f} {p95:>13.2f} "
+            f"{throughput:>11.1f} {cosine:>11.4f}"
+        )
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,75 @@
+import asyncio
+import time
+from src.vectorstore.embeddings import Embedder
+from src.vectorstore.retriever import AsyncRetriever
+from src.vectorstore.batcher import EmbeddingBatcher
+
+
+CONCURRENT_REQUESTS = 256
+WORKERS = 4
+
+# (max_batch_size, max_wait_ms)
+BATCH_CONFIGS = [(8, 2.0), (16, 5.0), (32, 5.0), (64, 10.0)]
+
+QUESTIONS = [
+    "What are the key features of GovDelivery Communications Cloud?",
+    "How much does the Enterprise plan cost for 100,000 subscribers?",
+    "Which Meeting Management Suite tier includes multi-language support?",
+    "What encryption standards are used for data at rest and in transit?",
+    "Which customer segments prioritize GIS integration as a key requirement?",
+]
+
+
+class EmbedderOnlyStore:
+    def __init__(self, embedder):
+        self.embedder = embedder
+
+
+async def run_unbatched(retriever: AsyncRetriever) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        retriever.embed(QUESTIONS[i % len(QUESTIONS)])
+        for i in range(CONCURRENT_REQUESTS)
+    ])
+    return CONCURRENT_REQUESTS / (time.perf_counter() - start)
+
+
+async def run_batched(retriever: AsyncRetriever, batch_size: int, wait_ms: float):
+    batcher = EmbeddingBatcher(retriever, max_batch_size=batch_size, max_wait_ms=wait_ms)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        batcher.embed(QUESTIONS[i % len(QUESTIONS)])
+        for i in range(CONCURRENT_REQUESTS)
+    ])
+    qps = CONCURRENT_REQUESTS / (time.perf_counter() - start)
+
+    stats = batcher.stats()
+    batcher.shutdown()
+    return qps, stats["avg_batch_size"]
+
+
+async def run_benchmark():
+    embedder = Embedder()
+    retriever = AsyncRetriever(EmbedderOnlyStore(embedder), max_workers=WORKERS)
+
+    # Warm-up
+    await retriever.embed(QUESTIONS[0])
+
+    baseline = await run_unbatched(retriever)
+
+    print("\n🚀 Query Embedding Micro-batching Benchmark\n")
+    print(f"{CONCURRENT_REQUESTS} concurrent queries, {WORKERS} executor workers\n")
+    print(f"{'mode':>20} {'q/s':>9} {'avg batch':>10} {'speedup':>8}")
+    print(f"{'one-at-a-time':>20} {baseline:>9.1f} {1:>10.1f} {1:>7.2f}x")
+
+    for batch_size, wait_ms in BATCH_CONFIGS:
+        qps, avg_batch = await run_batched(retriever, batch_size, wait_ms)
+        label = f"batch {batch_size} / {wait_ms:g}ms"
+        print(f"{label:>20} {qps:>9.1f} {avg_batch:>10.1f} {qps / baseline:>7.2f}x")
+
+    retriever.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
@@ -0,0 +1,122 @@
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from src.ingestion.loader import DocumentLoader
+
+
+SOURCE_DIR = Path("data")
+COPIES = 20
+PDF_PAGES = 40
+WORKER_COUNTS = [2, 4, 8]
+
+
+def write_pdf(path: Path, pages: list):
+    """
+    Minimal multi-page text PDF (no extra dependencies), so the benchmark
+    exercises pdfplumber page extraction.
+    """
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+
+    for lines in pages:
+        text = "BT /F1 9 Tf 40 800 Td 11 TL " + " ".join(
+            "(" + line.replace("\\", "").replace("(", "").replace(")", "") + ") '"
+            for line in lines
+        ) + " ET"
+        objects.append(f"<< /Length {len(text)} >>\nstream\n{text}\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        page_ids.append(len(objects))
+
+    objects[1] = (
+        f"<< /Type /Pages /Count {len(page_ids)} "
+        f"/Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] >>"
+    )
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1", "ignore")
+
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+
+    path.write_bytes(out)
+
+
+def build_corpus(target: Path, copies: int) -> int:
+    """
+    Replicate data/ `copies` times plus one PDF per copy built from the
+    text sources; returns total bytes.
+    """
+    total = 0
+
+    lines = [
+        line[:110]
+        for path in sorted(SOURCE_DIR.glob("*.txt"))
+        for line in path.read_text(encoding="utf-8", errors="ignore").splitlines()
+        if line.strip()
+    ]
+    pages = [lines[(i * 60) % len(lines):][:60] for i in range(PDF_PAGES)]
+
+    for i in range(copies):
+        for path in sorted(SOURCE_DIR.iterdir()):
+            if path.is_file():
+                copy = target / f"{path.stem}_{i:03d}{path.suffix}"
+                shutil.copy(path, copy)
+                total += copy.stat().st_size
+
+        pdf_path = target / f"generated_{i:03d}.pdf"
+        write_pdf(pdf_path, pages)
+        total += pdf_path.stat().st_size
+
+    return total
+
+
+def timed_load(loader: DocumentLoader):
+    start = time.perf_counter()
+    documents = loader.load()
+    return documents, time.perf_counter() - start
+
+
+def run_benchmark():
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = Path(tmp)
+        total_bytes = build_corpus(corpus, COPIES)
+        file_count = len(list(corpus.iterdir()))
+
+        print("\n🚀 Document Ingestion Benchmark\n")
+        print(f"{file_count} files, {total_bytes / 1e6:.1f} MB ({COPIES}x data/)\n")
+        print(f"{'mode':>14} {'seconds':>9} {'files/s':>9} {'MB/s':>7} {'speedup':>8}")
+
+        baseline_docs, baseline = timed_load(DocumentLoader(data_dir=str(corpus)))
+        print(
+            f"{'sequential':>14} {baseline:>9.2f} {file_count / baseline:>9.1f} "
+            f"{total_bytes / 1e6 / baseline:>7.2f} {1:>7.2f}x"
+        )
+
+        for workers in WORKER_COUNTS:
+            documents, seconds = timed_load(
+                DocumentLoader(data_dir=str(corpus), workers=workers)
+            )
+
+            # Parallel output must match sequential output exactly
+            identical = [d.content for d in documents] == [d.content for d in baseline_docs]
+
+            label = f"{workers} workers"
+            print(
+                f"{label:>14} {seconds:>9.2f} {file_count / seconds:>9.1f} "
+                f"{total_bytes / 1e6 / seconds:>7.2f} {baseline / seconds:>7.2f}x"
+                f"{'' if identical else '  (OUTPUT MISMATCH)'}"
+            )
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,332 @@
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+
+QUESTIONS = [
+    "What are the key features of GovDelivery Communications Cloud?",
+    "How much does the Enterprise plan cost for 100,000 subscribers?",
+    "Which Meeting Management Suite tier includes multi-language support?",
+    "What encryption standards are used for data at rest and in transit?",
+    "Which customer segments prioritize GIS integration as a key requirement?",
+    "How does SMS Alerts availability differ between Starter, Professional, and Enterprise tiers?",
+    "What discount is offered for annual billing compared to monthly pricing?",
+    "What are the API rate limits for GovDelivery Communications Cloud?",
+    "Which govAccess ADA Compliance plan includes a legal compliance guarantee?",
+    "What security certifications and compliance standards does Granicus maintain?",
+]
+
+
+# ---------------------------
+# Local servers (mock Ollama + the API), fully offline
+# ---------------------------
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for(url: str, timeout: float) -> bool:
+    deadline = time.time() + timeout
+
+    while time.time() < deadline:
+        try:
+            if httpx.get(url, timeout=2).status_code == 200:
+                return True
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+
+    return False
+
+
+def start_servers(args) -> Tuple[str, List[subprocess.Popen]]:
+    mock_port, api_port = free_port(), free_port()
+
+    mock = subprocess.Popen([
+        sys.executable, "-m", "benchmarks.mock_ollama",
+        "--port", str(mock_port),
+        "--prefill-ms", str(args.prefill_ms),
+        "--tokens-per-second", str(args.tokens_per_second),
+        "--num-tokens", str(args.num_tokens),
+        "--parallel", str(args.ollama_parallel)
+    ])
+
+    env = {
+        **os.environ,
+        "OLLAMA_HOST": f"http://127.0.0.1:{mock_port}",
+        "RAG_LLM_BACKEND": "ollama",
+        # Models must already be in the local cache: never download
+        "HF_HUB_OFFLINE": "1",
+        "TRANSFORMERS_OFFLINE": "1",
+    }
+    if not args.allow_cache:
+        # Similarity above 1 never matches: every request runs the pipeline
+        env["RAG_CACHE_SIMILARITY"] = "2.0"
+
+    api = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "src.api.app:app",
+            "--port", str(api_port),
+            "--workers", str(args.workers),
+            "--log-level", "warning"
+        ],
+        env=env
+    )
+
+    base_url = f"http://127.0.0.1:{api_port}"
+    processes = [api, mock]
+
+    if not wait_for(f"http://127.0.0.1:{mock_port}/api/tags", 30) or not wait_for(
+        f"{base_url}/ready", args.startup_timeout
+    ):
+        stop_servers(processes)
+        raise RuntimeError("Servers did not become ready")
+
+    return base_url, processes
+
+
+def stop_servers(processes: List[subprocess.Popen]):
+    for process in processes:
+        process.terminate()
+
+    for process in processes:
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+# ---------------------------
+# Load generation
+# ---------------------------
+def question(i: int, distinct: bool) -> str:
+    """
+    i-th question; distinct ones carry a request number so concurrent
+    duplicates are not coalesced onto a single pipeline run.
+    """
+    text = QUESTIONS[i % len(QUESTIONS)]
+    return f"{text} (request {i})" if distinct else text
+
+
+async def send(client: httpx.AsyncClient, path: str, text: str, stream: bool) -> dict:
+    start = time.perf_counter()
+    ttft = None
+
+    try:
+        if stream:
+            async with client.stream("POST", path, json={"question": text}) as response:
+                if response.status_code != 200:
+                    return {"ok": False, "latency": time.perf_counter() - start}
+
+                async for line in response.aiter_lines():
+                    if ttft is None and line.startswith("event: token"):
+                        ttft = time.perf_counter() - start
+
+                    # Failures mid-stream arrive as an error event on a 200
+                    if line.startswith("event: error"):
+                        return {"ok": False, "latency": time.perf_counter() - start}
+        else:
+            response = await client.post(path, json={"question": text})
+            if response.status_code != 200:
+                return {"ok": False, "latency": time.perf_counter() - start}
+
+        return {"ok": True, "latency": time.perf_counter() - start, "ttft": ttft}
+
+    except httpx.HTTPError:
+        return {"ok": False, "latency": time.perf_counter() - start}
+
+
+async def closed_loop(client, path, stream, distinct, concurrency: int, duration: float) -> list:
+    """
+    `concurrency` users, each sending its next request as soon as the
+    previous one returns.
+    """
+    results = []
+    deadline = time.perf_counter() + duration
+
+    async def user(offset: int):
+        i = offset
+        while time.perf_counter() < deadline:
+            results.append(await send(client, path, question(i, distinct), stream))
+            i += concurrency
+
+    await asyncio.gather(*(user(i) for i in range(concurrency)))
+    return results
+
+
+async def open_loop(client, path, stream, distinct, rps: float, duration: float) -> list:
+    """
+    Requests started at a fixed rate regardless of how many are still
+    in flight (arrivals do not slow down when the server does).
+    """
+    tasks = []
+    start = time.perf_counter()
+
+    for i in range(int(rps * duration)):
+        delay = start + i / rps - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        tasks.append(asyncio.create_task(
+            send(client, path, question(i, distinct), stream)
+        ))
+
+    return await asyncio.gather(*tasks)
+
+
+def summarize(level, results: list, seconds: float) -> dict:
+    ok = [r for r in results if r["ok"]]
+    latencies = np.array([r["latency"] for r in ok]) * 1000
+    ttfts = np.array([r["ttft"] for r in ok if r.get("ttft") is not None]) * 1000
+
+    def pct(values, q):
+        return round(float(np.percentile(values, q)), 1) if len(values) else None
+
+    return {
+        "level": level,
+        "requests": len(results),
+        "throughput_rps": round(len(ok) / seconds, 2),
+        "error_rate": round(1 - len(ok) / len(results), 4) if results else 0.0,
+        "p50_ms": pct(latencies, 50),
+        "p95_ms": pct(latencies, 95),
+        "p99_ms": pct(latencies, 99),
+        "ttft_p50_ms": pct(ttfts, 50),
+        "ttft_p95_ms": pct(ttfts, 95)
+    }
+
+
+def find_knee(rows: list, factor: float) -> Optional[dict]:
+    """
+    The highest load level whose p95 stays within `factor` times the p95
+    at the lightest load; past it, queueing dominates latency.
+    """
+    rows = [row for row in rows if row["p95_ms"] is not None]
+    if not rows:
+        return None
+
+    reference = rows[0]["p95_ms"]
+    knee = rows[0]
+
+    for row in rows[1:]:
+        if row["p95_ms"] > factor * reference:
+            break
+        knee = row
+
+    return knee
+
+
+async def run_levels(base_url: str, args) -> list:
+    path = "/chat/stream" if args.stream else "/chat"
+    distinct = not args.allow_coalescing
+    levels = args.rps if args.rps else args.concurrency
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    timeout = httpx.Timeout(args.request_timeout)
+
+    rows = []
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        # Warm-up: first requests pay lazy initialization
+        await send(client, path, QUESTIONS[0], args.stream)
+
+        for level in levels:
+            start = time.perf_counter()
+
+            if args.rps:
+                results = await open_loop(client, path, args.stream, distinct, level, args.duration)
+            else:
+                results = await closed_loop(client, path, args.stream, distinct, level, args.duration)
+
+            row = summarize(level, results, time.perf_counter() - start)
+            rows.append(row)
+            print_row(row, args)
+
+    return rows
+
+
+def print_row(row: dict, args):
+    ttft = f"{row['ttft_p50_ms']!s:>10}" if args.stream else ""
+    print(
+        f"{row['level']:>8} {row['requests']:>9} {row['throughput_rps']:>8} "
+        f"{row['p50_ms']!s:>9} {row['p95_ms']!s:>9} {row['p99_ms']!s:>9} "
+        f"{row['error_rate']:>7.2%}{ttft}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Offline load test of the FastAPI app against a mock Ollama server."
+    )
+    parser.add_argument("--url", help="Test an already running API instead of starting one.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--rps", type=float, nargs="+", help="Open-loop request rates (overrides --concurrency).")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per load level.")
+    parser.add_argument("--stream", action="store_true", help="Drive /chat/stream and report time to first token.")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the started API.")
+    parser.add_argument("--allow-cache", action="store_true", help="Keep the semantic answer cache on.")
+    parser.add_argument(
+        "--allow-coalescing",
+        action="store_true",
+        help="Repeat the question set verbatim, so concurrent duplicates share one pipeline run."
+    )
+    parser.add_argument("--knee-factor", type=float, default=2.0)
+    parser.add_argument("--request-timeout", type=float, default=120.0)
+    parser.add_argument("--startup-timeout", type=float, default=300.0)
+    parser.add_argument("--prefill-ms", type=float, default=200.0)
+    parser.add_argument("--tokens-per-second", type=float, default=30.0)
+    parser.add_argument("--num-tokens", type=int, default=40)
+    parser.add_argument("--ollama-parallel", type=int, default=4)
+    parser.add_argument("--output", help="Write the results as JSON here.")
+    args = parser.parse_args()
+
+    processes = []
+    base_url = args.url
+
+    if base_url is None:
+        print("Starting mock Ollama and API...")
+        base_url, processes = start_servers(args)
+
+    try:
+        mode = "rps" if args.rps else "users"
+
+        print("\n🚀 Load Test\n")
+        print(
+            f"{'/chat/stream' if args.stream else '/chat'}, {args.duration:.0f}s per level, "
+            f"mock Ollama: {args.prefill_ms:.0f} ms prefill, {args.tokens_per_second:.0f} tok/s, "
+            f"{args.ollama_parallel} parallel\n"
+        )
+        print(
+            f"{mode:>8} {'requests':>9} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} "
+            f"{'p99 ms':>9} {'errors':>7}{'  ttft p50' if args.stream else ''}"
+        )
+
+        rows = asyncio.run(run_levels(base_url, args))
+
+    finally:
+        stop_servers(processes)
+
+    knee = find_knee(rows, args.knee_factor)
+    if knee is not None:
+        print(
+            f"\nKnee: {knee['level']} {mode} ({knee['throughput_rps']} req/s, p95 {knee['p95_ms']} ms); "
+            f"beyond it p95 exceeds {args.knee_factor:g}x the lightest-load p95"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"mode": mode, "levels": rows, "knee": knee}, f, indent=2)
+        print(f"✅ Results saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+ANSWER = (
+    "GovDelivery Communications Cloud offers email and SMS outreach, audience "
+    "segmentation, automated workflows and an analytics dashboard. The Enterprise "
+    "tier adds full API access, SSO and dedicated support."
+)
+
+
+class MockOllama:
+    """
+    Stand-in for Ollama's /api/generate with tunable timing.
+
+    Each request waits for one of `parallel` model slots (Ollama serves
+    OLLAMA_NUM_PARALLEL requests at once and queues the rest), spends
+    prefill_ms (+/- jitter) on the prompt, then emits num_tokens tokens at
+    tokens_per_second, streamed as NDJSON or returned in one JSON body.
+    The final message carries Ollama's timing fields.
+    """
+
+    def __init__(
+        self,
+        prefill_ms: float = 200.0,
+        tokens_per_second: float = 30.0,
+        num_tokens: int = 40,
+        parallel: int = 1,
+        jitter: float = 0.1,
+        seed: int = 0
+    ):
+        self.prefill_ms = prefill_ms
+        self.tokens_per_second = tokens_per_second
+        self.num_tokens = num_tokens
+        self.jitter = jitter
+        self.random = random.Random(seed)
+
+        self.slots = asyncio.Semaphore(parallel)
+        self.requests = 0
+
+    def _tokens(self, limit: int):
+        words = ANSWER.split(" ")
+        return [words[i % len(words)] + " " for i in range(min(limit, self.num_tokens))]
+
+    def _vary(self, seconds: float) -> float:
+        return max(0.0, seconds * (1 + self.random.uniform(-self.jitter, self.jitter)))
+
+    async def generate(self, payload: dict):
+        limit = int(payload.get("options", {}).get("num_predict", self.num_tokens))
+        prompt = payload.get("system", "") + payload.get("prompt", "")
+
+        received = time.perf_counter_ns()
+
+        async with self.slots:
+            self.requests += 1
+            started = time.perf_counter_ns()
+
+            await asyncio.sleep(self._vary(self.prefill_ms / 1000))
+            prefilled = time.perf_counter_ns()
+
+            for token in self._tokens(limit):
+                await asyncio.sleep(self._vary(1 / self.tokens_per_second))
+                yield {"model": payload.get("model"), "response": token, "done": False}
+
+            finished = time.perf_counter_ns()
+
+        yield {
+            "model": payload.get("model"),
+            "response": "",
+            "done": True,
+            "total_duration": finished - received,
+            "load_duration": started - received,
+            "prompt_eval_count": len(prompt) // 4,
+            "prompt_eval_duration": prefilled - started,
+            "eval_count": min(limit, self.num_tokens),
+            "eval_duration": finished - prefilled
+        }
+
+
+def create_app(mock: MockOllama) -> FastAPI:
+    app = FastAPI(title="Mock Ollama")
+
+    @app.post("/api/generate")
+    async def generate(request: Request):
+        payload = await request.json()
+
+        if payload.get("stream", True):
+            async def lines():
+                async for message in mock.generate(payload):
+                    yield json.dumps(message) + "\n"
+
+            return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+        response = ""
+        async for message in mock.generate(payload):
+            response += message["response"]
+
+        return JSONResponse({**message, "response": response})
+
+    @app.get("/api/tags")
+    async def tags():
+        return {"models": [{"name": "phi3:mini"}]}
+
+    @app.get("/stats")
+    async def stats():
+        return {"requests": mock.requests}
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Mock Ollama server for offline load tests.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--prefill-ms", type=float, default=200.0)
+    parser.add_argument("--tokens-per-second", type=float, default=30.0)
+    parser.add_argument("--num-tokens", type=int, default=40)
+    parser.add_argument("--parallel", type=int, default=1, help="Requests served at once (OLLAMA_NUM_PARALLEL).")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    args = parser.parse_args()
+
+    mock = MockOllama(
+        prefill_ms=args.prefill_ms,
+        tokens_per_second=args.tokens_per_second,
+        num_tokens=args.num_tokens,
+        parallel=args.parallel,
+        jitter=args.jitter
+    )
+
+    uvicorn.run(create_app(mock), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
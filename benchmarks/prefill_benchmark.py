@@ -0,0 +1,120 @@
+import asyncio
+import time
+
+import numpy as np
+
+from src.llm.generator import GroundedGenerator, SYSTEM_PROMPT, cuda_available
+from src.llm.ollama_client import OllamaClient
+
+
+REQUESTS = 20
+
+QUESTIONS = [
+    "What are the key features of GovDelivery Communications Cloud?",
+    "How much does the Enterprise plan cost for 100,000 subscribers?",
+    "Which Meeting Management Suite tier includes multi-language support?",
+    "What encryption standards are used for data at rest and in transit?",
+]
+
+CONTEXT = (
+    "Product: GovDelivery Communications Cloud\n"
+    "Plan: Enterprise | Subscribers: 100,000 | Annual price: $48,000\n"
+    "Features: email and SMS outreach, audience segmentation, analytics dashboard"
+)
+
+
+# ---------------------------
+# Ollama: prompt_eval stats as reported by the server
+# ---------------------------
+async def ollama_prefill(generator: GroundedGenerator, split: bool):
+    tokens, seconds = [], []
+
+    for i in range(REQUESTS):
+        question = QUESTIONS[i % len(QUESTIONS)]
+
+        if split:
+            payload = generator._ollama_payload(question, CONTEXT)
+        else:
+            payload = {
+                "model": generator.model_name,
+                "prompt": generator.build_prompt(question, CONTEXT),
+                "options": {"temperature": 0.01, "num_predict": 1}
+            }
+
+        payload["options"]["num_predict"] = 1
+        result = await generator.ollama.generate({**payload, "stream": False})
+
+        tokens.append(result.get("prompt_eval_count", 0))
+        seconds.append(result.get("prompt_eval_duration", 0) / 1e9)
+
+    # First request of each mode fills the cache; report the steady state
+    return np.mean(tokens[1:]), 1000 * np.mean(seconds[1:])
+
+
+async def run_ollama():
+    generator = GroundedGenerator(backend="ollama", ollama_client=OllamaClient())
+
+    print(f"Ollama ({generator.model_name}), {REQUESTS} requests per mode\n")
+    print(f"{'mode':>24} {'prompt_eval tokens':>19} {'prompt_eval ms':>15}")
+
+    for label, split in [("full prompt", False), ("system + keep_alive", True)]:
+        tokens, ms = await ollama_prefill(generator, split)
+        print(f"{label:>24} {tokens:>19.1f} {ms:>15.1f}")
+
+    await generator.aclose()
+
+
+# ---------------------------
+# HF: forward pass over the prompt with and without the prefix KV cache
+# ---------------------------
+def run_hf():
+    import torch
+
+    generator = GroundedGenerator(backend="hf", prefix_cache=True)
+
+    print(f"\nHF ({generator.hf_model_name}), {REQUESTS} prompts per mode\n")
+    print(f"{'mode':>24} {'prefill p50 ms':>15} {'prefill p95 ms':>15}")
+
+    def full(question):
+        ids = generator.tokenizer(
+            generator.build_prompt(question, CONTEXT), return_tensors="pt"
+        ).input_ids.to(generator.device)
+        generator.model(ids, use_cache=True)
+
+    def cached(question):
+        inputs = generator._prefixed_inputs(generator.build_user_prompt(question, CONTEXT))
+        past = inputs["past_key_values"]
+        suffix = inputs["input_ids"][:, generator.prefix_ids.shape[1]:]
+        generator.model(suffix, past_key_values=past, use_cache=True)
+
+    for label, step in [("full prompt", full), ("prefix KV cache", cached)]:
+        latencies = []
+
+        with torch.no_grad():
+            for i in range(REQUESTS):
+                torch.cuda.synchronize()
+                start = time.perf_counter()
+                step(QUESTIONS[i % len(QUESTIONS)])
+                torch.cuda.synchronize()
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        print(
+            f"{label:>24} {np.percentile(latencies, 50):>15.1f} "
+            f"{np.percentile(latencies, 95):>15.1f}"
+        )
+
+
+def run_benchmark():
+    print("\n🚀 Prompt Prefill Benchmark\n")
+    print(f"Static prefix: {len(SYSTEM_PROMPT)} characters\n")
+
+    asyncio.run(run_ollama())
+
+    if cuda_available():
+        run_hf()
+    else:
+        print("\nCUDA not available; skipping the HF prefix-cache comparison.")
+
+
+if __name__ == "__main__":
+    run_benchmark()
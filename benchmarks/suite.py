@@ -0,0 +1,388 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.ingestion_benchmark import write_pdf
+from src.chunking.chunker import SmartChunker
+from src.ingestion.loader import DocumentLoader
+from src.llm.generator import SYSTEM_PROMPT
+
+
+SOURCE_DIR = Path("data").resolve()
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_SCALES = [1, 10, 100]
+PDF_PAGES = 8
+
+# Per-file load cost does not depend on corpus size; cap the files timed
+LOADER_SAMPLE = 20
+
+# Differences smaller than this are noise, whatever the ratio
+MIN_DELTA_MS = 0.05
+
+QUESTIONS = [
+    "What are the key features of GovDelivery Communications Cloud?",
+    "How much does the Enterprise plan cost for 100,000 subscribers?",
+    "Which Meeting Management Suite tier includes multi-language support?",
+    "What encryption standards are used for data at rest and in transit?",
+    "Which customer segments prioritize GIS integration as a key requirement?",
+    "How does SMS Alerts availability differ between Starter, Professional, and Enterprise tiers?",
+    "What discount is offered for annual billing compared to monthly pricing?",
+    "What are the API rate limits for GovDelivery Communications Cloud?",
+]
+
+
+class FakeGenerator:
+    """
+    Deterministic stand-in for Ollama: answers with the first line of the
+    context, instantly, so RAGPipeline.ask timings cover only our code.
+    """
+
+    model_name = "fake"
+
+    async def start(self):
+        pass
+
+    async def aclose(self):
+        pass
+
+    def stats(self) -> dict:
+        return {"backend": "fake"}
+
+    def build_user_prompt(self, question: str, context: str) -> str:
+        return f"\nContext:\n{context}\n\nUser Question:\n{question}\n\nFinal Answer:\n"
+
+    def build_prompt(self, question: str, context: str) -> str:
+        return SYSTEM_PROMPT + self.build_user_prompt(question, context)
+
+    async def generate(self, question: str, context: str) -> str:
+        return context.strip().splitlines()[0] if context.strip() else ""
+
+    async def generate_stream(self, question: str, context: str):
+        yield await self.generate(question, context)
+
+
+# ---------------------------
+# Synthetic corpus
+# ---------------------------
+def build_corpus(target: Path, scale: int) -> int:
+    """
+    data/ replicated `scale` times under distinct file names (so every
+    copy gets its own chunk IDs), plus one real multi-page PDF per copy
+    (data/'s .pdf is HTML); returns the file count.
+    """
+    count = 0
+
+    lines = [
+        line[:110]
+        for path in sorted(SOURCE_DIR.glob("*.txt"))
+        for line in path.read_text(encoding="utf-8", errors="ignore").splitlines()
+        if line.strip()
+    ]
+    pages = [lines[(i * 60) % len(lines):][:60] for i in range(PDF_PAGES)]
+
+    for i in range(scale):
+        for path in sorted(SOURCE_DIR.iterdir()):
+            if path.is_file():
+                shutil.copy(path, target / f"{path.stem}_{i:03d}{path.suffix}")
+                count += 1
+
+        write_pdf(target / f"generated_{i:03d}.pdf", pages)
+        count += 1
+
+    return count
+
+
+def best_of(fn, repeat: int) -> float:
+    """
+    Fastest of `repeat` runs, in seconds (the least noisy estimate).
+    """
+    best = float("inf")
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def p50_ms(fn, inputs) -> float:
+    latencies = []
+
+    for item in inputs:
+        start = time.perf_counter()
+        fn(item)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    return float(np.percentile(latencies, 50))
+
+
+# ---------------------------
+# Stages
+# ---------------------------
+def bench_loader(corpus: Path, repeat: int) -> dict:
+    loader = DocumentLoader(data_dir=str(corpus))
+
+    # Grouped by sniffed type, which picks the parser (not the suffix)
+    by_type = defaultdict(list)
+    for path in loader.discover_files():
+        by_type[loader.detect_file_type(path)].append(path)
+
+    results = {}
+    for file_type, paths in sorted(by_type.items()):
+        paths = paths[:LOADER_SAMPLE]
+        seconds = best_of(lambda: [loader.load_file(p) for p in paths], repeat)
+        results[f"load.{file_type}.ms_per_file"] = 1000 * seconds / len(paths)
+
+    return results
+
+
+def bench_chunker(documents, repeat: int):
+    chunker = SmartChunker()
+    chunks = chunker.chunk_documents(documents)
+
+    seconds = best_of(lambda: chunker.chunk_documents(documents), repeat)
+    return chunks, {"chunk.ms_per_document": 1000 * seconds / len(documents)}
+
+
+def bench_embedder(embedder, chunks, embed_sample: int, repeat: int) -> dict:
+    texts = [chunk.content for chunk in chunks[:embed_sample]]
+
+    # Warm-up (first call pays lazy initialization)
+    embedder.embed_query(QUESTIONS[0])
+
+    seconds = best_of(lambda: embedder.embed_texts(texts), repeat)
+
+    return {
+        "embed_texts.ms_per_text": 1000 * seconds / len(texts),
+        "embed_query.p50_ms": p50_ms(embedder.embed_query, QUESTIONS * 5)
+    }
+
+
+def bench_store(embedder, chunks, workdir: Path, backend: str) -> dict:
+    from src.vectorstore.embedding_cache import EmbeddingCache
+    from src.vectorstore.store import VectorStore
+
+    # Replicated chunks share text, so the cache leaves mostly write cost
+    cache = EmbeddingCache(str(workdir / "embedding_cache"), embedder.cache_key)
+    store = VectorStore(
+        embedder=embedder,
+        persist_dir=str(workdir / "store"),
+        embedding_cache=cache,
+        backend=backend
+    )
+
+    start = time.perf_counter()
+    store.index_chunks(chunks)
+    index_seconds = time.perf_counter() - start
+
+    embeddings = [embedder.embed_query(q) for q in QUESTIONS]
+    query_ms = p50_ms(
+        lambda e: store.query("", top_k=5, query_embedding=e), embeddings * 10
+    )
+
+    return {
+        "index_chunks.ms_per_chunk": 1000 * index_seconds / len(chunks),
+        "query.p50_ms": query_ms
+    }
+
+
+@contextmanager
+def patched_env(**values):
+    """
+    Set environment variables for the duration of the block only, so one
+    scale's settings do not leak into the next or the rest of the process.
+    """
+    saved = {name: os.environ.get(name) for name in values}
+    os.environ.update(values)
+
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def bench_ask(corpus: Path, workdir: Path, backend: str) -> dict:
+    from src.rag_pipeline import RAGPipeline
+
+    with patched_env(
+        RAG_EMBEDDING_CACHE_DIR=str(workdir / "embedding_cache"),
+        RAG_VECTOR_BACKEND=backend
+    ):
+        # Similarity above 1 disables the answer cache: every ask runs.
+        # The fake generator is passed in, so no Ollama client is opened
+        rag = RAGPipeline(
+            data_dir=str(corpus),
+            persist_dir=str(workdir / "pipeline"),
+            cache_similarity=2.0,
+            generator=FakeGenerator()
+        )
+
+    async def run():
+        await rag.startup()
+
+        try:
+            await rag.ask(QUESTIONS[0])
+
+            latencies = []
+            for question in QUESTIONS * 5:
+                start = time.perf_counter()
+                await rag.ask(question)
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        finally:
+            await rag.shutdown()
+
+        return float(np.percentile(latencies, 50))
+
+    return {"ask.p50_ms": asyncio.run(run())}
+
+
+def run_scale(scale: int, embedder, args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = Path(tmp) / "data"
+        corpus.mkdir()
+        files = build_corpus(corpus, scale)
+
+        documents = DocumentLoader(data_dir=str(corpus)).load()
+
+        results = bench_loader(corpus, args.repeat)
+        chunks, chunk_results = bench_chunker(documents, args.repeat)
+        results.update(chunk_results)
+        results.update(bench_embedder(embedder, chunks, args.embed_sample, args.repeat))
+        results.update(bench_store(embedder, chunks, Path(tmp), args.backend))
+        results.update(bench_ask(corpus, Path(tmp), args.backend))
+
+        print(f"\n{scale}x data/: {files} files, {len(documents)} documents, {len(chunks)} chunks")
+
+    return {name: round(value, 4) for name, value in results.items()}
+
+
+# ---------------------------
+# Baseline comparison
+# ---------------------------
+def compare(current: dict, baseline: dict, threshold: float, thresholds: dict = None) -> list:
+    """
+    Regressions as (scale, metric, baseline, current, ratio). A metric
+    regresses when it is more than its threshold (per-metric override,
+    else the global one) slower than the baseline, and by more than
+    MIN_DELTA_MS. Lower is better for every metric.
+    """
+    thresholds = thresholds or {}
+    regressions = []
+
+    for scale, metrics in current.items():
+        for metric, value in metrics.items():
+            reference = baseline.get(scale, {}).get(metric)
+            if reference is None:
+                continue
+
+            limit = thresholds.get(metric, threshold)
+            ratio = value / reference if reference > 0 else float("inf")
+
+            if ratio > 1 + limit and value - reference > MIN_DELTA_MS:
+                regressions.append((scale, metric, reference, value, round(ratio, 2)))
+
+    return regressions
+
+
+def print_results(results: dict, baseline: dict):
+    for scale, metrics in results.items():
+        print(f"\n{scale}")
+        print(f"{'metric':>32} {'value':>10} {'baseline':>10} {'ratio':>7}")
+
+        for metric, value in metrics.items():
+            reference = baseline.get(scale, {}).get(metric)
+            ratio = f"{value / reference:.2f}" if reference else "-"
+            reference = f"{reference:.3f}" if reference is not None else "-"
+            print(f"{metric:>32} {value:>10.3f} {reference:>10} {ratio:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Component micro-benchmarks with baseline regression checks."
+    )
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES)
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Write these results as the new baseline instead of comparing."
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=float(os.getenv("RAG_BENCH_THRESHOLD", "0.25")),
+        help="Allowed slowdown vs. baseline (0.25 = 25%%) before failing."
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--embed-sample", type=int, default=256)
+    parser.add_argument("--backend", default="chroma", choices=["chroma", "flat"])
+    args = parser.parse_args()
+
+    from src.vectorstore.embeddings import Embedder
+
+    print("\n🚀 Component Benchmark Suite")
+
+    embedder = Embedder()
+
+    results = {}
+    for scale in args.scales:
+        results[f"{scale}x"] = run_scale(scale, embedder, args)
+
+    baseline_path = Path(args.baseline)
+    stored = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+    baseline = stored.get("results", {})
+
+    print_results(results, baseline)
+
+    if args.update_baseline:
+        stored = {
+            "meta": {
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "cpus": os.cpu_count(),
+                "embedding_model": embedder.cache_key,
+                "vector_backend": args.backend
+            },
+            # Per-metric overrides of --threshold survive updates
+            "thresholds": stored.get("thresholds", {}),
+            "results": {**baseline, **results}
+        }
+        baseline_path.write_text(json.dumps(stored, indent=2, sort_keys=True))
+        print(f"\n✅ Baseline written to {baseline_path}")
+        return
+
+    if not baseline:
+        print(f"\nNo baseline at {baseline_path}; run with --update-baseline to create one.")
+        return
+
+    regressions = compare(results, baseline, args.threshold, stored.get("thresholds"))
+
+    if regressions:
+        print("\n❌ Regressions:")
+        for scale, metric, reference, value, ratio in regressions:
+            print(f"  {scale} {metric}: {reference:.3f} -> {value:.3f} ({ratio}x)")
+        sys.exit(1)
+
+    print(f"\n✅ No stage regressed more than {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from src.chunking.chunker import Chunk
+from src.vectorstore.store import VectorStore
+
+
+CORPUS_SIZES = [1000, 5000, 20000]
+DIM = 384
+QUERIES = 200
+TOP_K = 5
+
+
+class PrecomputedEmbedder:
+    """Queries are passed as embeddings, so no model is needed."""
+
+    model_name = "precomputed"
+
+
+def make_corpus(n: int, seed: int = 0):
+    # Clustered vectors look more like real chunk embeddings than noise
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(8, n // 100), DIM))
+    vectors = centers[rng.integers(len(centers), size=n)] + 0.5 * rng.normal(size=(n, DIM))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    queries = vectors[rng.integers(n, size=QUERIES)] + 0.3 * rng.normal(size=(QUERIES, DIM))
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    return vectors.astype(np.float32), queries.astype(np.float32)
+
+
+def build(backend: str, vectors: np.ndarray, persist_dir: str):
+    store = VectorStore(
+        embedder=PrecomputedEmbedder(),
+        persist_dir=persist_dir,
+        backend=backend,
+        write_batch_size=5000
+    )
+
+    chunks = [
+        Chunk(chunk_id=f"c{i}", source=f"doc{i % 50}.txt", content=f"chunk {i}")
+        for i in range(len(vectors))
+    ]
+
+    start = time.perf_counter()
+    store.write_batch(chunks, vectors.tolist())
+    build_seconds = time.perf_counter() - start
+
+    return store, build_seconds
+
+
+def measure(store: VectorStore, queries: np.ndarray, exact: np.ndarray):
+    latencies = []
+    hits = 0
+
+    for query, truth in zip(queries, exact):
+        start = time.perf_counter()
+        results = store.query("", top_k=TOP_K, query_embedding=query.tolist())
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        found = {int(doc.split()[1]) for doc in results["documents"][0]}
+        hits += len(found & set(truth.tolist()))
+
+    latencies = np.array(latencies)
+
+    return {
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "recall": hits / (len(queries) * TOP_K)
+    }
+
+
+def run_benchmark():
+    print("\n🚀 Vector Backend Benchmark (Chroma HNSW vs. NumPy flat index)\n")
+    print(f"{QUERIES} queries, top_k={TOP_K}, dim={DIM}\n")
+    print(
+        f"{'chunks':>7} {'backend':>8} {'build s':>8} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'recall@5':>9}"
+    )
+
+    for n in CORPUS_SIZES:
+        vectors, queries = make_corpus(n)
+        exact = np.argsort(-(queries @ vectors.T), axis=1)[:, :TOP_K]
+
+        for backend in ("chroma", "flat"):
+            persist_dir = tempfile.mkdtemp(prefix=f"bench_{backend}_")
+
+            try:
+                store, build_seconds = build(backend, vectors, persist_dir)
+
+                # Warm-up
+                store.query("", top_k=TOP_K, query_embedding=queries[0].tolist())
+
+                result = measure(store, queries, exact)
+
+                print(
+                    f"{n:>7} {backend:>8} {build_seconds:>8.2f} "
+                    f"{result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} "
+                    f"{result['recall']:>9.3f}"
+                )
+
+            finally:
+                shutil.rmtree(persist_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,107 @@
+import asyncio
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from src.rag_pipeline import RAGPipeline
+
+
+BASE_DIR = Path(__file__).resolve().parent
+INPUT_FILE = BASE_DIR / "questions.xlsx"
+OUTPUT_FILE = BASE_DIR / "rerank_results.xlsx"
+
+
+async def answer(rag: RAGPipeline, question: str) -> dict:
+    """
+    Retrieval + generation without the answer cache, so both runs
+    really call the model.
+    """
+    prepared = await rag._prepare_context(question, top_k=5)
+
+    if prepared is None:
+        return {"answer": "", "prompt_tokens": 0, "generation": 0.0}
+
+    context, _, prompt_tokens = prepared
+
+    start = time.time()
+    text = await rag.generator.generate(question, context)
+
+    return {
+        "answer": text,
+        "prompt_tokens": prompt_tokens,
+        "generation": round(time.time() - start, 3)
+    }
+
+
+async def run_rerank_evaluation():
+
+    if not INPUT_FILE.exists():
+        raise FileNotFoundError(f"{INPUT_FILE} not found.")
+
+    df = pd.read_excel(INPUT_FILE)
+
+    if "Questions" not in df.columns:
+        raise ValueError("Excel must contain a column named 'Questions'")
+
+    df = df[df["Questions"].apply(lambda q: isinstance(q, str) and q.strip() != "")]
+
+    rag = RAGPipeline()
+    reranker = rag.reranker
+
+    if reranker is None:
+        raise RuntimeError("Reranker is disabled or failed to load (RAG_RERANK)")
+
+    print("\n🚀 Reranking Evaluation\n")
+
+    runs = {}
+    for label, stage in [("Baseline", None), ("Reranked", reranker)]:
+        rag.reranker = stage
+        runs[label] = []
+
+        for question in df["Questions"]:
+            print(f"[{label}] {question}")
+            runs[label].append(await answer(rag, question))
+
+    rag.reranker = reranker
+
+    for label, results in runs.items():
+        df[f"{label}_Answer"] = [r["answer"] for r in results]
+        df[f"{label}_Prompt_Tokens"] = [r["prompt_tokens"] for r in results]
+        df[f"{label}_Generation_sec"] = [r["generation"] for r in results]
+
+    # Answer agreement: cosine similarity of the two answers' embeddings
+    agreement = []
+    for before, after in zip(runs["Baseline"], runs["Reranked"]):
+        if not before["answer"] and not after["answer"]:
+            agreement.append(1.0)
+            continue
+
+        a = np.array(rag.embedder.embed_query(before["answer"] or " "))
+        b = np.array(rag.embedder.embed_query(after["answer"] or " "))
+        agreement.append(float(a @ b / max(np.linalg.norm(a) * np.linalg.norm(b), 1e-12)))
+
+    df["Answer_Agreement"] = np.round(agreement, 4)
+
+    answered = [i for i, r in enumerate(runs["Baseline"]) if r["prompt_tokens"]]
+
+    print(f"\n{len(answered)} of {len(df)} questions reached generation\n")
+    print(f"{'':>10} {'prompt tokens':>14} {'generation s':>13}")
+
+    for label, results in runs.items():
+        tokens = np.mean([results[i]["prompt_tokens"] for i in answered]) if answered else 0.0
+        seconds = np.mean([results[i]["generation"] for i in answered]) if answered else 0.0
+        print(f"{label:>10} {tokens:>14.1f} {seconds:>13.2f}")
+
+    print(
+        f"\nAnswer agreement: mean {np.mean(agreement):.3f}, "
+        f"{np.mean(np.array(agreement) >= 0.9):.0%} of answers at >= 0.9"
+    )
+    print(f"Reranker: {reranker.stats()}")
+
+    df.to_excel(OUTPUT_FILE, index=False)
+
+    print(f"\n✅ Results saved to: {OUTPUT_FILE}")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_rerank_evaluation())
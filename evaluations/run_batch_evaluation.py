@@ -25,6 +25,7 @@ async def run_batch():
     answers = []
     confidences = []
     latencies = []
+    prompt_tokens = []
 
     print("\n🚀 Starting Batch Evaluation...\n")
 
@@ -33,6 +34,7 @@ async def run_batch():
             answers.append("")
             confidences.append(0.0)
             latencies.append(0.0)
+            prompt_tokens.append(0)
             continue
 
         print(f"Processing: {question}")
@@ -43,21 +45,25 @@ async def run_batch():
             response = await rag.ask(question)
             answer = response.get("answer", "")
             confidence = response.get("confidence", 0.0)
+            tokens = response.get("prompt_tokens", 0)
         except Exception as e:
             answer = f"ERROR: {str(e)}"
             confidence = 0.0
+            tokens = 0
 
         latency = round(time.time() - start_time, 3)
 
         answers.append(answer)
         confidences.append(confidence)
         latencies.append(latency)
+        prompt_tokens.append(tokens)
 
         print(f"   → Done in {latency}s")
 
     df["Answer"] = answers
     df["Confidence"] = confidences
     df["Latency_sec"] = latencies
+    df["Prompt_Tokens"] = prompt_tokens
 
     df.to_excel(OUTPUT_FILE, index=False)
 
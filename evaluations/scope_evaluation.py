@@ -0,0 +1,108 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from src.rag_pipeline import RAGPipeline
+
+
+BASE_DIR = Path(__file__).resolve().parent
+INPUT_FILE = BASE_DIR / "questions.xlsx"
+OUTPUT_FILE = BASE_DIR / "scope_results.xlsx"
+
+THRESHOLDS = np.round(np.arange(0.30, 0.81, 0.05), 2)
+
+
+def run_scope_evaluation():
+
+    if not INPUT_FILE.exists():
+        raise FileNotFoundError(f"{INPUT_FILE} not found.")
+
+    df = pd.read_excel(INPUT_FILE)
+
+    if "Questions" not in df.columns or "In_Scope" not in df.columns:
+        raise ValueError("Excel must contain 'Questions' and 'In_Scope' columns")
+
+    df = df[df["Questions"].apply(lambda q: isinstance(q, str) and q.strip() != "")]
+
+    # The gate is off by default; it is what is being evaluated here
+    os.environ["RAG_SCOPE_GATE"] = "1"
+
+    rag = RAGPipeline()
+    gate = rag.scope_gate
+
+    print("\n🚀 Scope Gate Evaluation\n")
+    print(f"{len(df)} questions, {gate.stats()['centroids']} centroids\n")
+
+    scores = []
+    nearest = []
+    gate_ms = []
+    retrieval_ms = []
+
+    for question in df["Questions"]:
+        embedding = rag.embedder.embed_query(question)
+
+        start = time.perf_counter()
+        scores.append(gate.score(embedding))
+        gate_ms.append((time.perf_counter() - start) * 1000)
+
+        # What the gate saves: the vector search it replaces
+        start = time.perf_counter()
+        results = rag.store.query(question, top_k=5, query_embedding=embedding)
+        retrieval_ms.append((time.perf_counter() - start) * 1000)
+
+        distances = results.get("distances", [[]])[0]
+        nearest.append(1 - min(distances) if distances else 0.0)
+
+    df["Scope_Score"] = np.round(scores, 4)
+    df["Nearest_Chunk_Similarity"] = np.round(nearest, 4)
+
+    labels = df["In_Scope"].astype(bool).to_numpy()
+    scores = np.array(scores)
+
+    print(
+        f"{'threshold':>9} {'in-scope kept':>14} {'off-topic rejected':>19} "
+        f"{'refusal precision':>18} {'accuracy':>9}"
+    )
+
+    # Highest threshold that still keeps every in-scope question
+    recommended = None
+
+    for threshold in THRESHOLDS:
+        predicted = scores >= threshold
+
+        kept = (predicted & labels).sum() / max(labels.sum(), 1)
+        rejected = (~predicted & ~labels).sum() / max((~labels).sum(), 1)
+        precision = (~predicted & ~labels).sum() / max((~predicted).sum(), 1)
+        accuracy = (predicted == labels).mean()
+
+        if kept == 1.0:
+            recommended = threshold
+
+        marker = "  <- current" if np.isclose(threshold, gate.threshold) else ""
+        print(
+            f"{threshold:>9.2f} {kept:>14.2%} {rejected:>19.2%} "
+            f"{precision:>18.2%} {accuracy:>9.2%}{marker}"
+        )
+
+    print()
+    if recommended is not None:
+        print(f"Highest threshold keeping every in-scope question: {recommended:.2f}")
+
+    if labels.any() and (~labels).any():
+        print(
+            f"Lowest in-scope score: {scores[labels].min():.4f}, "
+            f"highest off-topic score: {scores[~labels].max():.4f}"
+        )
+    print(
+        f"Gate check: {np.mean(gate_ms):.3f} ms vs vector search: {np.mean(retrieval_ms):.2f} ms"
+    )
+
+    df["In_Scope_Predicted"] = scores >= gate.threshold
+    df.to_excel(OUTPUT_FILE, index=False)
+
+    print(f"\n✅ Results saved to: {OUTPUT_FILE}")
+
+
+if __name__ == "__main__":
+    run_scope_evaluation()
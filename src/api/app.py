@@ -1,15 +1,69 @@
-from fastapi import FastAPI, HTTPException
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+from fastapi import FastAPI, Header, HTTPException, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from src.rag_pipeline import RAGPipeline
+from src.monitoring.metrics import metrics
+from src.monitoring import tracing
+import asyncio
+import json
 import time
+import uuid
 import logging
+import numpy as np
 
 logging.basicConfig(level=logging.INFO)
 
-app = FastAPI(title="Granicus RAG Chatbot")
+# Built in the background after the server binds (see lifespan)
+rag_pipeline: Optional[RAGPipeline] = None
+startup_error: Optional[str] = None
 
-rag_pipeline = RAGPipeline()
-request_count = 0
+# Recent time-to-first-token samples from /chat/stream
+ttft_samples = deque(maxlen=1000)
+
+
+async def build_pipeline():
+    """
+    Load models, sync the index and open connections off the event loop,
+    so the worker answers /health while the pipeline is still starting.
+    """
+    global rag_pipeline, startup_error
+
+    start_time = time.time()
+
+    try:
+        pipeline = await asyncio.to_thread(RAGPipeline)
+        await pipeline.startup()
+        rag_pipeline = pipeline
+
+        logging.info(f"[API] Ready in {time.time() - start_time:.2f}s")
+
+    except Exception as e:
+        startup_error = str(e)
+        logging.error(f"[API STARTUP ERROR] {startup_error}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    startup_task = asyncio.create_task(build_pipeline())
+    yield
+
+    if not startup_task.done():
+        startup_task.cancel()
+
+    if rag_pipeline is not None:
+        await rag_pipeline.shutdown()
+
+
+def get_pipeline() -> RAGPipeline:
+    if rag_pipeline is None:
+        raise HTTPException(status_code=503, detail="Service is starting up.")
+    return rag_pipeline
+
+
+app = FastAPI(title="Granicus RAG Chatbot", lifespan=lifespan)
 
 
 class ChatRequest(BaseModel):
@@ -20,50 +74,162 @@ class ChatResponse(BaseModel):
     answer: str
     confidence: float
     latency_seconds: float
+    prompt_tokens: int = 0
+    # Seconds per trace span; only with the X-Debug-Timing header
+    timings: Optional[Dict[str, float]] = None
 
 
 @app.get("/health")
 async def health():
+    """
+    Liveness: the process is up and serving, even while still starting.
+    """
+    return {"status": "ok", "ready": rag_pipeline is not None}
+
+
+@app.get("/ready")
+async def ready():
+    """
+    Readiness: 200 once the pipeline can answer questions, 503 before.
+    """
+    if rag_pipeline is None:
+        return JSONResponse(
+            status_code=503,
+            content={
+                "status": "failed" if startup_error else "starting",
+                "error": startup_error
+            }
+        )
+
     try:
-        count = rag_pipeline.store.collection.count()
-        return {
-            "status": "ok",
-            "vectorstore_ready": True,
-            "indexed_chunks": count
-        }
-    except Exception:
-        return {
-            "status": "error",
-            "vectorstore_ready": False
-        }
+        count = rag_pipeline.store.count()
+    except Exception as e:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "error", "error": str(e)}
+        )
+
+    return {
+        "status": "ready",
+        "indexed_chunks": count,
+        "startup_timings": rag_pipeline.startup_timings
+    }
 
 
 @app.get("/stats")
 async def stats():
+    pipeline = get_pipeline()
+
     return {
-        "indexed_documents": rag_pipeline.store.collection.count(),
-        "total_requests": request_count
+        "indexed_documents": pipeline.store.count(),
+        "total_requests": int(metrics.total("rag_requests_total")),
+        "vector_store": pipeline.store.stats(),
+        "retrieval": pipeline.retriever.stats(),
+        "embedding_batches": pipeline.embed_batcher.stats(),
+        "generator": pipeline.generator.stats(),
+        "cache": pipeline.cache.stats(),
+        "coalescing": pipeline.single_flight.stats(),
+        "scope_gate": pipeline.scope_gate.stats() if pipeline.scope_gate else None,
+        "reranker": pipeline.reranker.stats() if pipeline.reranker else (
+            {"error": pipeline.reranker_error} if pipeline.reranker_error else None
+        ),
+        "time_to_first_token": ttft_summary()
     }
 
 
-@app.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
-    global request_count
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """
+    Prometheus text exposition, aggregated over all uvicorn workers.
+    """
+    text = await asyncio.to_thread(metrics.render)
+    return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
+
+def ttft_summary() -> dict:
+    if not ttft_samples:
+        return {"count": 0}
 
+    samples = np.array(ttft_samples)
+    return {
+        "count": len(samples),
+        "avg_seconds": round(float(samples.mean()), 3),
+        "p50_seconds": round(float(np.percentile(samples, 50)), 3),
+        "p95_seconds": round(float(np.percentile(samples, 95)), 3)
+    }
+
+
+def debug_timing_requested(value: Optional[str]) -> bool:
+    return value is not None and value.strip().lower() not in ("", "0", "false", "no")
+
+
+@app.post("/chat", response_model=ChatResponse, response_model_exclude_none=True)
+async def chat(
+    request: ChatRequest,
+    response: Response,
+    x_request_id: Optional[str] = Header(None),
+    x_debug_timing: Optional[str] = Header(None)
+):
     if not request.question.strip():
         raise HTTPException(status_code=400, detail="Question cannot be empty.")
 
+    pipeline = get_pipeline()
+
     start = time.time()
 
-    response = await rag_pipeline.ask(request.question)
+    with tracing.start_trace("POST /chat", request_id=x_request_id) as trace:
+        with metrics.in_flight("rag_in_flight_requests"):
+            result = await pipeline.ask(request.question)
 
     latency = time.time() - start
-    request_count += 1
+    metrics.inc("rag_requests_total", endpoint="chat")
 
-    logging.info(f"[API] Total latency: {latency:.2f}s")
+    logging.info(f"[API] [{trace.request_id}] Total latency: {latency:.2f}s")
 
-    return {
-        "answer": response["answer"],
-        "confidence": response["confidence"],
-        "latency_seconds": round(latency, 3)
+    response.headers["X-Request-ID"] = trace.request_id
+
+    body = {
+        "answer": result["answer"],
+        "confidence": result["confidence"],
+        "latency_seconds": round(latency, 3),
+        "prompt_tokens": result.get("prompt_tokens", 0)
     }
+
+    if debug_timing_requested(x_debug_timing):
+        body["timings"] = trace.timings()
+
+    return body
+
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest, x_request_id: Optional[str] = Header(None)):
+    """
+    Server-sent events: one "token" event per generated piece, then a
+    final "done" event with confidence and stage timings.
+    """
+    if not request.question.strip():
+        raise HTTPException(status_code=400, detail="Question cannot be empty.")
+
+    pipeline = get_pipeline()
+    request_id = x_request_id or uuid.uuid4().hex[:16]
+
+    async def event_stream():
+        with tracing.start_trace("POST /chat/stream", request_id=request_id), \
+                metrics.in_flight("rag_in_flight_requests"):
+            async for event in pipeline.ask_stream(request.question):
+                if event["type"] == "done":
+                    metrics.inc("rag_requests_total", endpoint="chat_stream")
+
+                    ttft = event["timings"].get("time_to_first_token")
+                    if ttft is not None:
+                        ttft_samples.append(ttft)
+
+                    logging.info(f"[API] Streaming total latency: {event['timings']['total']:.2f}s")
+
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"X-Request-ID": request_id}
+    )
@@ -0,0 +1,225 @@
+import json
+import logging
+import re
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+
+
+def normalize_question(question: str) -> str:
+    """
+    Case-, whitespace- and trailing-punctuation-insensitive form of a question.
+    """
+    question = re.sub(r"\s+", " ", question.strip().lower())
+    return question.rstrip("?!. ")
+
+
+class CacheEntry:
+    def __init__(self, question: str, embedding: np.ndarray, result: dict):
+        self.question = question
+        self.embedding = embedding
+        self.result = result
+        self.created_at = time.monotonic()
+
+        self.nbytes = (
+            embedding.nbytes
+            + len(question.encode("utf-8"))
+            + len(json.dumps(result).encode("utf-8"))
+        )
+
+
+class SemanticCache:
+    """
+    Bounded answer cache keyed on query embeddings.
+
+    - A question is served from the cache when its cosine similarity to
+      a cached question is at least similarity_threshold. Embeddings are
+      L2-normalized, so lookup is one matrix-vector dot product.
+    - Entries are evicted least-recently-used once max_entries or
+      max_bytes is exceeded, and expire after ttl_seconds.
+    - Keys include the vector index version, so a reindex drops every
+      entry built against the old index.
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.95,
+        max_entries: int = 1000,
+        max_bytes: int = 16 * 1024 * 1024,
+        ttl_seconds: Optional[float] = 3600.0
+    ):
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        # (index_version, normalized question) -> CacheEntry, in LRU order
+        self._entries: "OrderedDict[tuple, CacheEntry]" = OrderedDict()
+        self._index_version: Optional[str] = None
+        self.bytes = 0
+
+        # Lookup matrix, rebuilt lazily after inserts/evictions
+        self._keys: List[tuple] = []
+        self._matrix: Optional[np.ndarray] = None
+        self._dirty = False
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ---------------------------
+    # Lookup
+    # ---------------------------
+    def lookup(
+        self,
+        embedding: List[float],
+        index_version: Optional[str] = None
+    ) -> Optional[dict]:
+        self._check_version(index_version)
+        self._expire()
+
+        if not self._entries or not embedding:
+            self.misses += 1
+            return None
+
+        if self._dirty:
+            self._rebuild_matrix()
+
+        query = np.asarray(embedding, dtype=np.float32)
+        similarities = self._matrix @ query
+
+        best = int(np.argmax(similarities))
+        similarity = float(similarities[best])
+
+        if similarity < self.similarity_threshold:
+            self.misses += 1
+            return None
+
+        key = self._keys[best]
+        entry = self._entries[key]
+        self._entries.move_to_end(key)
+
+        self.hits += 1
+
+        logging.info(
+            f"[SemanticCache] Hit (similarity {similarity:.3f}) "
+            f"on cached question: {entry.question}"
+        )
+
+        return entry.result
+
+    # ---------------------------
+    # Insert
+    # ---------------------------
+    def add(
+        self,
+        question: str,
+        embedding: List[float],
+        result: dict,
+        index_version: Optional[str] = None
+    ):
+        if not embedding:
+            return
+
+        self._check_version(index_version)
+
+        key = (self._index_version, normalize_question(question))
+
+        if key in self._entries:
+            self._remove(key)
+
+        entry = CacheEntry(question, np.asarray(embedding, dtype=np.float32), result)
+
+        self._entries[key] = entry
+        self.bytes += entry.nbytes
+        self._dirty = True
+
+        # LRU eviction down to both bounds
+        while len(self._entries) > self.max_entries or (
+            self.max_bytes is not None and self.bytes > self.max_bytes
+        ):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+        self._keys = []
+        self._matrix = None
+        self._dirty = False
+
+    # ---------------------------
+    # Internals
+    # ---------------------------
+    def _check_version(self, index_version: Optional[str]):
+        if index_version == self._index_version:
+            return
+
+        if self._entries:
+            logging.info(
+                f"[SemanticCache] Index version changed "
+                f"({self._index_version} -> {index_version}); "
+                f"dropping {len(self._entries)} entries"
+            )
+            self.invalidations += len(self._entries)
+            self.clear()
+
+        self._index_version = index_version
+
+    def _expire(self):
+        if self.ttl_seconds is None:
+            return
+
+        cutoff = time.monotonic() - self.ttl_seconds
+
+        # Insertion order is not LRU order, so scan all entries
+        expired = [
+            key for key, entry in self._entries.items()
+            if entry.created_at < cutoff
+        ]
+
+        for key in expired:
+            self._remove(key)
+            self.expirations += 1
+
+    def _remove(self, key: tuple):
+        entry = self._entries.pop(key)
+        self.bytes -= entry.nbytes
+        self._dirty = True
+
+    def _rebuild_matrix(self):
+        self._keys = list(self._entries.keys())
+        self._matrix = np.stack([self._entries[key].embedding for key in self._keys])
+        self._dirty = False
+
+    # ---------------------------
+    # Stats
+    # ---------------------------
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+
+        return {
+            "entries": len(self),
+            "bytes": self.bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "similarity_threshold": self.similarity_threshold,
+            "index_version": self._index_version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations
+        }
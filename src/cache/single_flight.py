@@ -0,0 +1,43 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict
+
+logging.basicConfig(level=logging.INFO)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key: the first caller runs
+    the work, every caller that arrives while it is in flight awaits the
+    same future and receives the same result.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable]):
+        future = self._in_flight.get(key)
+
+        if future is not None:
+            self.coalesced += 1
+            logging.info(f"[SingleFlight] Coalesced onto in-flight request: {key}")
+
+        else:
+            self.leaders += 1
+
+            future = asyncio.ensure_future(fn())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+
+        # Shielded so one cancelled waiter does not cancel the shared work
+        return await asyncio.shield(future)
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._in_flight),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced
+        }
@@ -1,6 +1,6 @@
-from typing import List
+from typing import Iterable, Iterator, List
 from src.ingestion.loader import Document
-import uuid
+import hashlib
 import re
 import time
 import logging
@@ -16,6 +16,15 @@ class Chunk:
         self.metadata = metadata or {}
 
 
+def make_chunk_id(source: str, content: str, occurrence: int = 0) -> str:
+    """
+    Deterministic chunk ID derived from the source file and chunk text.
+    occurrence disambiguates identical chunks within the same source.
+    """
+    digest = hashlib.sha256(f"{source}\x00{content}".encode("utf-8")).hexdigest()[:32]
+    return digest if occurrence == 0 else f"{digest}-{occurrence}"
+
+
 class SmartChunker:
     def __init__(self, chunk_size: int = 500, overlap: int = 80):
         self.chunk_size = chunk_size
@@ -105,8 +114,18 @@ class SmartChunker:
     # ---------------------------
     def chunk_documents(self, documents: List[Document]) -> List[Chunk]:
         start_time = time.time()
-        all_chunks = []
 
+        all_chunks = list(self.iter_chunks(documents))
+
+        duration = time.time() - start_time
+        logging.info(f"[Chunking] Created {len(all_chunks)} chunks in {duration:.2f}s")
+
+        return all_chunks
+
+    def iter_chunks(self, documents: Iterable[Document]) -> Iterator[Chunk]:
+        """
+        Lazily chunk a stream of documents, one document at a time.
+        """
         for doc in documents:
             if doc.doc_type == "csv":
                 raw_chunks = self.chunk_csv(doc.content)
@@ -115,22 +134,21 @@ class SmartChunker:
             else:
                 raw_chunks = self.chunk_text_by_heading(doc.content)
 
+            seen = {}
+
             for chunk_text in raw_chunks:
                 if len(chunk_text) < 50:
                     continue
 
-                all_chunks.append(
-                    Chunk(
-                        chunk_id=str(uuid.uuid4()),
-                        source=doc.source,
-                        content=chunk_text.strip(),
-                        metadata={
-                            "doc_type": doc.doc_type
-                        }
-                    )
+                content = chunk_text.strip()
+                occurrence = seen.get(content, 0)
+                seen[content] = occurrence + 1
+
+                yield Chunk(
+                    chunk_id=make_chunk_id(doc.source, content, occurrence),
+                    source=doc.source,
+                    content=content,
+                    metadata={
+                        "doc_type": doc.doc_type
+                    }
                 )
-
-        duration = time.time() - start_time
-        logging.info(f"[Chunking] Created {len(all_chunks)} chunks in {duration:.2f}s")
-
-        return all_chunks
@@ -1,6 +1,8 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Optional
-import pdfplumber
+from typing import Iterator, List, Dict, Optional, Tuple
+import multiprocessing
 
 
 class Document:
@@ -11,57 +13,199 @@ class Document:
         self.content = content
 
 
+# ---------------------------
+# Process-pool tasks (module level so they can be pickled)
+# ---------------------------
+def _load_file_task(data_dir: str, path: str) -> Optional[Document]:
+    return DocumentLoader(data_dir).load_file(Path(path))
+
+
+def _pdf_pages_task(path: str, start: int, stop: int) -> Tuple[List[str], List[str]]:
+    import pdfplumber
+
+    with pdfplumber.open(path) as pdf:
+        return extract_pdf_pages(pdf.pages[start:stop])
+
+
+def extract_pdf_pages(pages) -> Tuple[List[str], List[str]]:
+    """
+    Extract (text_blocks, table_blocks) from a sequence of pdfplumber pages.
+    Tables are flattened into row-wise semantic text.
+    """
+    text_blocks = []
+    table_blocks = []
+
+    for page in pages:
+        # Extract text
+        page_text = page.extract_text()
+        if page_text:
+            text_blocks.append(page_text)
+
+        # Extract tables
+        tables = page.extract_tables()
+        for table in tables:
+            for row in table:
+                row_text = " | ".join(cell.strip() for cell in row if cell)
+                if row_text:
+                    table_blocks.append(row_text)
+
+    return text_blocks, table_blocks
+
+
+def join_pdf_blocks(text_blocks: List[str], table_blocks: List[str]) -> str:
+    content = "\n".join(text_blocks)
+
+    if table_blocks:
+        content += "\n\n=== EXTRACTED TABLE DATA ===\n"
+        content += "\n".join(table_blocks)
+
+    return content
+
+
 class DocumentLoader:
-    def __init__(self, data_dir: str):
+    """
+    workers > 1 loads files on a process pool; PDFs with more than
+    pdf_pages_per_task pages are additionally split into page ranges.
+    Output order always matches discover_files().
+    """
+
+    def __init__(self, data_dir: str, workers: int = 1, pdf_pages_per_task: int = 8):
         self.data_dir = Path(data_dir)
+        self.workers = workers
+        self.pdf_pages_per_task = pdf_pages_per_task
 
     def discover_files(self) -> List[Path]:
-        return [p for p in self.data_dir.iterdir() if p.is_file()]
+        return sorted(p for p in self.data_dir.iterdir() if p.is_file())
 
-    
     def load(self) -> List[Document]:
-        documents = []
+        return self.load_files(self.discover_files())
 
-        import uuid
+    def load_files(self, paths: List[Path]) -> List[Document]:
+        return list(self.iter_documents(paths))
+
+    def iter_documents(self, paths: Optional[List[Path]] = None) -> Iterator[Document]:
+        """
+        Yield documents one at a time, in path order. With workers > 1 at
+        most max_pending files are being loaded at once, so memory stays
+        bounded however large the corpus is.
+        """
+        if paths is None:
+            paths = self.discover_files()
+
+        if self.workers > 1 and len(paths) > 0:
+            yield from self._iter_parallel(paths)
+            return
+
+        for path in paths:
+            document = self.load_file(path)
+
+            if document is not None:
+                yield document
+
+    def _iter_parallel(self, paths: List[Path]) -> Iterator[Document]:
+        max_pending = self.workers * 2
+
+        # spawn, not fork: callers may already hold model / Chroma threads
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            jobs = deque()
+
+            for path in paths:
+                jobs.append((path, self._submit(pool, path)))
+
+                # Yield in submission order so output is deterministic
+                while len(jobs) >= max_pending:
+                    document = self._collect(*jobs.popleft())
+                    if document is not None:
+                        yield document
+
+            while jobs:
+                document = self._collect(*jobs.popleft())
+                if document is not None:
+                    yield document
 
-        for path in self.discover_files():
-            file_type = self.detect_file_type(path)
+    def _submit(self, pool: ProcessPoolExecutor, path: Path):
+        page_count = self._pdf_page_count(path)
 
-            if file_type == "binary" or file_type == "unknown":
-                continue
+        if page_count > self.pdf_pages_per_task:
+            return [
+                pool.submit(_pdf_pages_task, str(path), start, start + self.pdf_pages_per_task)
+                for start in range(0, page_count, self.pdf_pages_per_task)
+            ]
 
-            if file_type == "text":
-                content = self.read_text(path)
+        return pool.submit(_load_file_task, str(self.data_dir), str(path))
 
-            elif file_type == "csv":
-                content = self.read_csv(path)
+    def _collect(self, path: Path, job) -> Optional[Document]:
+        if not isinstance(job, list):
+            return job.result()
 
-            elif file_type == "pdf":
-                content = self.read_pdf(path)
+        text_blocks, table_blocks = [], []
 
-            elif file_type == "html":
-                content = self.read_text(path)
+        try:
+            for future in job:
+                texts, tables = future.result()
+                text_blocks.extend(texts)
+                table_blocks.extend(tables)
+            content = join_pdf_blocks(text_blocks, table_blocks)
+        except Exception:
+            content = ""
+
+        return self.make_document(path, "pdf", content)
+
+    def _pdf_page_count(self, path: Path) -> int:
+        if self.detect_file_type(path) != "pdf":
+            return 0
+
+        try:
+            import pdfplumber
+
+            with pdfplumber.open(path) as pdf:
+                return len(pdf.pages)
+        except Exception:
+            return 0
 
-            else:
-                continue
+    def load_file(self, path: Path) -> Optional[Document]:
+        """
+        Load a single file, or return None if it is unsupported or empty.
+        """
+        file_type = self.detect_file_type(path)
 
-            content = content.strip()
+        if file_type == "binary" or file_type == "unknown":
+            return None
 
-            if not content or len(content) < 50:
-                continue
+        if file_type == "text":
+            content = self.read_text(path)
 
-            documents.append(
-                Document(
-                    doc_id=str(uuid.uuid4()),
-                    source=path.name,
-                    doc_type=file_type,
-                    content=content
-                )
-            )
+        elif file_type == "csv":
+            content = self.read_csv(path)
 
-        return documents
+        elif file_type == "pdf":
+            content = self.read_pdf(path)
 
-    
+        elif file_type == "html":
+            content = self.read_text(path)
+
+        else:
+            return None
+
+        return self.make_document(path, file_type, content)
+
+    def make_document(self, path: Path, file_type: str, content: str) -> Optional[Document]:
+        import uuid
+
+        content = content.strip()
+
+        if not content or len(content) < 50:
+            return None
+
+        return Document(
+            doc_id=str(uuid.uuid4()),
+            source=path.name,
+            doc_type=file_type,
+            content=content
+        )
 
     def detect_file_type(self, path: Path) -> str:
         """
@@ -143,37 +287,13 @@ class DocumentLoader:
         Extract text and tables from PDF using pdfplumber.
         Tables are flattened into row-wise semantic text.
         """
-        
-
-        text_blocks = []
-        table_blocks = []
-
         try:
+            import pdfplumber
+
             with pdfplumber.open(path) as pdf:
-                for page in pdf.pages:
-                    # Extract text
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_blocks.append(page_text)
-
-                    # Extract tables
-                    tables = page.extract_tables()
-                    for table in tables:
-                        for row in table:
-                            row_text = " | ".join(cell.strip() for cell in row if cell)
-                            if row_text:
-                                table_blocks.append(row_text)
+                text_blocks, table_blocks = extract_pdf_pages(pdf.pages)
 
         except Exception:
             return ""
 
-        content = "\n".join(text_blocks)
-
-        if table_blocks:
-            content += "\n\n=== EXTRACTED TABLE DATA ===\n"
-            content += "\n".join(table_blocks)
-
-        return content
-
-
-
+        return join_pdf_blocks(text_blocks, table_blocks)
@@ -1,7 +1,118 @@
-from typing import Dict
+import math
+from typing import Dict, List, Optional
 
 
 class ContextBuilder:
+    """
+    Assembles the retrieved chunks that go into the prompt.
+
+    pack() works on a token budget: chunks are taken whole, in rank
+    order, while they fit in max_tokens, so the prompt never carries a
+    chunk cut off mid-row. The one exception is a best chunk that is over
+    budget on its own: it is kept, trimmed to its leading lines (or
+    words, if even the first line is too long). Tokens are counted with the target model's
+    tokenizer when one is available (a transformers tokenizer, or a
+    tokenizer.json loaded with the tokenizers library), and estimated at
+    ~4 characters per token otherwise.
+    """
+
+    def __init__(
+        self,
+        tokenizer=None,
+        tokenizer_file: Optional[str] = None,
+        max_tokens: int = 512,
+        max_chunks: int = 3,
+        separator: str = "\n\n"
+    ):
+        if tokenizer is None and tokenizer_file:
+            from tokenizers import Tokenizer
+            tokenizer = Tokenizer.from_file(tokenizer_file)
+
+        self.tokenizer = tokenizer
+        self.max_tokens = max_tokens
+        self.max_chunks = max_chunks
+        self.separator = separator
+
+    # ---------------------------
+    # Token counting
+    # ---------------------------
+    def count_tokens(self, text: str) -> int:
+        if not text:
+            return 0
+
+        if self.tokenizer is None:
+            return math.ceil(len(text) / 4)
+
+        try:
+            encoded = self.tokenizer.encode(text, add_special_tokens=False)
+        except TypeError:
+            encoded = self.tokenizer.encode(text)
+
+        # tokenizers.Encoding exposes .ids; transformers returns a list
+        return len(getattr(encoded, "ids", encoded))
+
+    @property
+    def tokenizer_name(self) -> str:
+        return "estimate" if self.tokenizer is None else type(self.tokenizer).__name__
+
+    # ---------------------------
+    # Packing
+    # ---------------------------
+    def pack(self, documents: List[str]) -> Dict:
+        """
+        documents must already be ranked best first. Returns the packed
+        context, its token count and how many chunks made it in.
+        """
+        separator_tokens = self.count_tokens(self.separator)
+
+        packed = []
+        used = 0
+
+        for rank, doc in enumerate(documents):
+            if len(packed) >= self.max_chunks:
+                break
+
+            doc = doc.strip()
+            tokens = self.count_tokens(doc)
+            cost = tokens + (separator_tokens if packed else 0)
+
+            if used + cost > self.max_tokens:
+                # The best chunk is never dropped: keep what fits of it
+                if rank == 0:
+                    doc = self._trim(doc)
+                    if doc:
+                        packed.append(doc)
+                        used = self.count_tokens(doc)
+
+                # Skip a chunk that does not fit; a shorter, lower-ranked one may
+                continue
+
+            packed.append(doc)
+            used += cost
+
+        return {
+            "context": self.separator.join(packed),
+            "context_tokens": used,
+            "chunks": len(packed)
+        }
+
+    def _trim(self, text: str) -> str:
+        """
+        Leading part of text within max_tokens, cut on a line boundary,
+        or on a word boundary if the first line alone is over budget.
+        """
+        for pieces, joiner in ((text.splitlines(), "\n"), (text.split(), " ")):
+            kept = []
+            for piece in pieces:
+                if self.count_tokens(joiner.join(kept + [piece])) > self.max_tokens:
+                    break
+                kept.append(piece)
+
+            if kept:
+                return joiner.join(kept)
+
+        return ""
+
     def build_context(self, results: Dict) -> str:
         documents = results.get("documents", [[]])[0]
         metadatas = results.get("metadatas", [[]])[0]
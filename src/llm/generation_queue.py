@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO)
+
+# (system prompt, user prompt): kept apart so run_batch can reuse a
+# cached system-prompt prefix
+Prompt = Tuple[str, str]
+
+
+class BatchedGenerationQueue:
+    """
+    Dedicated generation worker for a local (HF) model.
+
+    (system, user) prompt pairs submitted concurrently are queued; the
+    worker takes up to max_batch_size of them (waiting at most max_wait_ms
+    for more to arrive), runs a single batched run_batch(prompts) call on
+    its own thread, and resolves each caller's future with its own
+    completion. Batches run one at a time, so prompts that arrive while
+    the model is busy are picked up together in the next batch.
+
+    Other model work (streaming generation) goes through run_exclusive(),
+    on the same thread, so it never overlaps a batch.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[Prompt]], List[str]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0
+    ):
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+
+        # One thread: the model is never entered concurrently
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="generate")
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop = None
+
+        self.batches = 0
+        self.prompts = 0
+        self.largest_batch = 0
+        self.total_queue_wait = 0.0
+        self.max_queue_wait = 0.0
+
+    # ---------------------------
+    # Public API
+    # ---------------------------
+    async def submit(self, prompt: Prompt) -> str:
+        self._ensure_worker()
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((prompt, future, time.perf_counter()))
+
+        return await future
+
+    async def run_exclusive(self, fn, *args):
+        """
+        Run fn(*args) on the generation thread, after the batch in
+        progress (if any) and before the next one.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    def shutdown(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "batches": self.batches,
+            "prompts": self.prompts,
+            "avg_batch_size": round(self.prompts / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "avg_queue_wait_ms": round(self.total_queue_wait / self.prompts * 1000, 2) if self.prompts else 0.0,
+            "max_queue_wait_ms": round(self.max_queue_wait * 1000, 2),
+            "queued": self._queue.qsize() if self._queue is not None else 0
+        }
+
+    # ---------------------------
+    # Worker
+    # ---------------------------
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+
+        if self._worker is None or self._loop is not loop or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._work())
+
+    async def _collect_batch(self) -> list:
+        loop = asyncio.get_running_loop()
+
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait_ms / 1000
+
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+
+            try:
+                batch.append(
+                    await asyncio.wait_for(self._queue.get(), timeout=remaining)
+                )
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _work(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = await self._collect_batch()
+
+            # Callers that gave up while queued are dropped from the batch
+            batch = [item for item in batch if not item[1].done()]
+            if not batch:
+                continue
+
+            dispatched_at = time.perf_counter()
+            prompts = [prompt for prompt, _, _ in batch]
+
+            for _, _, queued_at in batch:
+                wait = dispatched_at - queued_at
+                self.total_queue_wait += wait
+                self.max_queue_wait = max(self.max_queue_wait, wait)
+
+            try:
+                outputs = await loop.run_in_executor(self.executor, self.run_batch, prompts)
+
+                if len(outputs) != len(batch):
+                    raise RuntimeError(
+                        f"run_batch returned {len(outputs)} outputs for {len(batch)} prompts"
+                    )
+
+                for (_, future, _), output in zip(batch, outputs):
+                    if not future.done():
+                        future.set_result(output)
+
+            except Exception as e:
+                logging.error(f"[GenerationQueue ERROR] {str(e)}")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+            self.batches += 1
+            self.prompts += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+
+            logging.info(
+                f"[GenerationQueue] Generated batch of {len(batch)} in "
+                f"{time.perf_counter() - dispatched_at:.2f}s"
+            )
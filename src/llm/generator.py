@@ -1,51 +1,21 @@
-import httpx
+import asyncio
+import copy
+import os
+import shutil
 import time
 import logging
-import torch
-
-logging.basicConfig(level=logging.INFO)
 
+from src.llm.ollama_client import OllamaClient
+from src.monitoring import tracing
+from src.llm.generation_queue import BatchedGenerationQueue
 
-class GroundedGenerator:
-    def __init__(self, model_name="phi3:mini"):
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        self.use_gpu_llm = torch.cuda.is_available()
-
-        if self.use_gpu_llm:
-            logging.info("[Generator] CUDA detected. Using Mistral-7B-Instruct (4-bit).")
-
-            from transformers import AutoTokenizer, AutoModelForCausalLM, BitsAndBytesConfig
-
-            self.hf_model_name = "mistralai/Mistral-7B-Instruct-v0.2"
-
-            # 4-bit quantization for Kaggle GPU
-            quant_config = BitsAndBytesConfig(
-                load_in_4bit=True,
-                bnb_4bit_compute_dtype=torch.float16,
-                bnb_4bit_use_double_quant=True,
-                bnb_4bit_quant_type="nf4"
-            )
-
-            self.tokenizer = AutoTokenizer.from_pretrained(self.hf_model_name)
-
-            self.model = AutoModelForCausalLM.from_pretrained(
-                self.hf_model_name,
-                quantization_config=quant_config,
-                device_map="auto"
-            )
-
-            self.model.eval()
-
-        else:
-            logging.info("[Generator] CUDA not available. Using Ollama.")
-            self.model_name = model_name
-            self.base_url = "http://localhost:11434/api/generate"
+logging.basicConfig(level=logging.INFO)
 
-    async def generate(self, question: str, context: str) -> str:
-        start_time = time.time()
+LLM_BACKENDS = ("auto", "hf", "ollama")
 
-        prompt = f"""
-You are a highly disciplined government technology assistant specialized in Granicus products.
+# Identical on every request, so it is kept at the front of the prompt
+# where both the HF prefix KV cache and Ollama's prompt cache can reuse it
+SYSTEM_PROMPT = """You are a highly disciplined government technology assistant specialized in Granicus products.
 
 STRICT INSTRUCTIONS:
 
@@ -120,9 +90,226 @@ STYLE REQUIREMENTS
 - Do NOT be verbose.
 
 ----------------------------
+"""
+
+
+def cuda_available() -> bool:
+    """
+    CUDA check that only imports torch (several seconds) on hosts that
+    have an NVIDIA driver at all.
+    """
+    if not (os.path.exists("/proc/driver/nvidia/version") or shutil.which("nvidia-smi")):
+        return False
+
+    try:
+        import torch
+        return torch.cuda.is_available()
+    except ImportError:
+        return False
+
+
+class GroundedGenerator:
+    def __init__(
+        self,
+        model_name="phi3:mini",
+        ollama_client: OllamaClient = None,
+        max_batch_size: int = 8,
+        max_batch_wait_ms: float = 10.0,
+        backend: str = None,
+        prefix_cache: bool = None,
+        keep_alive: str = None
+    ):
+        backend = backend or os.getenv("RAG_LLM_BACKEND", "auto")
+
+        if prefix_cache is None:
+            prefix_cache = os.getenv("RAG_PREFIX_CACHE", "1") == "1"
+
+        if backend not in LLM_BACKENDS:
+            raise ValueError(f"Unknown LLM backend: {backend}")
+
+        if backend == "auto":
+            backend = "hf" if cuda_available() else "ollama"
+
+        self.backend = backend
+        self.use_gpu_llm = backend == "hf"
+        self.device = "cuda" if self.use_gpu_llm else "cpu"
+
+        if self.use_gpu_llm:
+            logging.info("[Generator] Using Mistral-7B-Instruct (4-bit) on CUDA.")
+
+            import torch
+            from transformers import AutoTokenizer, AutoModelForCausalLM, BitsAndBytesConfig
+
+            self.hf_model_name = "mistralai/Mistral-7B-Instruct-v0.2"
+
+            # 4-bit quantization for Kaggle GPU
+            quant_config = BitsAndBytesConfig(
+                load_in_4bit=True,
+                bnb_4bit_compute_dtype=torch.float16,
+                bnb_4bit_use_double_quant=True,
+                bnb_4bit_quant_type="nf4"
+            )
+
+            self.tokenizer = AutoTokenizer.from_pretrained(self.hf_model_name)
+
+            self.model = AutoModelForCausalLM.from_pretrained(
+                self.hf_model_name,
+                quantization_config=quant_config,
+                device_map="auto"
+            )
+
+            self.model.eval()
+
+            # Batched prompts are left-padded so generation continues
+            # from the real end of every prompt
+            self.tokenizer.padding_side = "left"
+            if self.tokenizer.pad_token is None:
+                self.tokenizer.pad_token = self.tokenizer.eos_token
+
+            self.generation_queue = BatchedGenerationQueue(
+                self._generate_batch,
+                max_batch_size=max_batch_size,
+                max_wait_ms=max_batch_wait_ms
+            )
+
+            # KV cache of SYSTEM_PROMPT, computed once and reused by every
+            # single-prompt generation (left-padded batches cannot share it)
+            self.prefix_ids = None
+            self.prefix_cache = None
+            self.prefix_hits = 0
+
+            if prefix_cache:
+                self._build_prefix_cache()
+
+        else:
+            logging.info("[Generator] Using Ollama.")
+            self.model_name = model_name
+            self.ollama = ollama_client or OllamaClient()
+
+            # Keeps the model (and its prompt cache) loaded between requests
+            self.keep_alive = keep_alive or os.getenv("RAG_OLLAMA_KEEP_ALIVE", "30m")
+
+            # Prefill stats reported by Ollama (prompt_eval_*)
+            self.prefill = {"requests": 0, "tokens": 0, "seconds": 0.0}
+
+    # ---------------------------
+    # Lifecycle (FastAPI lifespan)
+    # ---------------------------
+    async def start(self):
+        if not self.use_gpu_llm:
+            await self.ollama.start()
 
+    async def aclose(self):
+        if self.use_gpu_llm:
+            self.generation_queue.shutdown()
+        else:
+            await self.ollama.aclose()
+
+    def stats(self) -> dict:
+        if self.use_gpu_llm:
+            return {
+                "backend": "hf",
+                "model": self.hf_model_name,
+                "batching": self.generation_queue.stats(),
+                "prefix_cache": {
+                    "enabled": self.prefix_cache is not None,
+                    "prefix_tokens": int(self.prefix_ids.shape[1]) if self.prefix_ids is not None else 0,
+                    "hits": self.prefix_hits
+                }
+            }
+
+        requests = self.prefill["requests"]
+
+        return {
+            "backend": "ollama",
+            "model": self.model_name,
+            "keep_alive": self.keep_alive,
+            "pool": self.ollama.pool_stats(),
+            "prefill": {
+                "requests": requests,
+                "avg_prompt_eval_tokens": round(self.prefill["tokens"] / requests, 1) if requests else 0.0,
+                "avg_prompt_eval_ms": round(1000 * self.prefill["seconds"] / requests, 1) if requests else 0.0
+            }
+        }
+
+    def _ollama_payload(self, question: str, context: str) -> dict:
+        """
+        The static instructions go in "system" so they form an identical
+        prefix on every request; with keep_alive holding the model loaded,
+        Ollama only evaluates the tokens after the cached prefix.
+        """
+        return {
+            "model": self.model_name,
+            "system": SYSTEM_PROMPT,
+            "prompt": self.build_user_prompt(question, context),
+            "keep_alive": self.keep_alive,
+            "options": {
+                "temperature": 0.01,
+                "num_predict": 100
+            }
+        }
+
+    def _record_prefill(self, message: dict):
+        if "prompt_eval_duration" not in message:
+            return
+
+        self._trace_ollama(message)
+
+        self.prefill["requests"] += 1
+        self.prefill["tokens"] += message.get("prompt_eval_count", 0)
+        self.prefill["seconds"] += message["prompt_eval_duration"] / 1e9
+
+    # ---------------------------
+    # HF prefix KV cache
+    # ---------------------------
+    def _build_prefix_cache(self):
+        import torch
+
+        start_time = time.time()
+
+        self.prefix_ids = self.tokenizer(
+            SYSTEM_PROMPT, return_tensors="pt"
+        ).input_ids.to(self.device)
+
+        with torch.no_grad():
+            self.prefix_cache = self.model(
+                self.prefix_ids, use_cache=True
+            ).past_key_values
+
+        logging.info(
+            f"[Generator GPU] Cached {self.prefix_ids.shape[1]}-token prompt prefix "
+            f"in {time.time() - start_time:.2f}s"
+        )
+
+    def _prefixed_inputs(self, user_prompt: str) -> dict:
+        """
+        generate() kwargs for one prompt that reuse the prefix KV cache:
+        prefix and suffix are tokenized separately so the cached prefix
+        tokens match exactly, and the cache is copied because generate()
+        extends it in place.
+        """
+        import torch
+
+        suffix_ids = self.tokenizer(
+            user_prompt, return_tensors="pt", add_special_tokens=False
+        ).input_ids.to(self.device)
+
+        input_ids = torch.cat([self.prefix_ids, suffix_ids], dim=1)
+        self.prefix_hits += 1
+
+        return {
+            "input_ids": input_ids,
+            "attention_mask": torch.ones_like(input_ids),
+            "past_key_values": copy.deepcopy(self.prefix_cache)
+        }
+
+    # ---------------------------
+    # Prompt (static prefix + per-request suffix)
+    # ---------------------------
+    def build_user_prompt(self, question: str, context: str) -> str:
+        return f"""
 Context:
-{context[:1500]}
+{context}
 
 User Question:
 {question}
@@ -130,26 +317,104 @@ User Question:
 Final Answer:
 """
 
-        try:
-            # ---------------- GPU PATH (Mistral) ----------------
-            if self.use_gpu_llm:
-                inputs = self.tokenizer(prompt, return_tensors="pt").to(self.device)
-                input_length = inputs["input_ids"].shape[1]
-
-                with torch.no_grad():
-                    outputs = self.model.generate(
-                        **inputs,
-                        max_new_tokens=120,
-                        do_sample=False,
-                        temperature=0.01
-                    )
-
-                generated_tokens = outputs[0][input_length:]
+    def build_prompt(self, question: str, context: str) -> str:
+        return SYSTEM_PROMPT + self.build_user_prompt(question, context)
+
+    # ---------------------------
+    # HF batch generation (runs on the generation queue's thread)
+    # ---------------------------
+    def _generate_batch(self, prompts):
+        import torch
+
+        # A lone prompt reuses the cached prefix; queued prompts arrive as
+        # (system, user) pairs so the suffix can be split off
+        if len(prompts) == 1 and self.prefix_cache is not None:
+            inputs = self._prefixed_inputs(prompts[0][1])
+            input_length = inputs["input_ids"].shape[1]
+
+            with torch.no_grad():
+                outputs = self.model.generate(
+                    **inputs,
+                    max_new_tokens=120,
+                    do_sample=False,
+                    temperature=0.01,
+                    pad_token_id=self.tokenizer.pad_token_id
+                )
 
-                answer = self.tokenizer.decode(
-                    generated_tokens,
+            return [
+                self.tokenizer.decode(
+                    outputs[0][input_length:],
                     skip_special_tokens=True
                 ).strip()
+            ]
+
+        prompts = [system + user for system, user in prompts]
+
+        inputs = self.tokenizer(
+            prompts,
+            return_tensors="pt",
+            padding=True
+        ).to(self.device)
+
+        input_length = inputs["input_ids"].shape[1]
+
+        with torch.no_grad():
+            outputs = self.model.generate(
+                **inputs,
+                max_new_tokens=120,
+                do_sample=False,
+                temperature=0.01,
+                pad_token_id=self.tokenizer.pad_token_id
+            )
+
+        return [
+            self.tokenizer.decode(
+                output[input_length:],
+                skip_special_tokens=True
+            ).strip()
+            for output in outputs
+        ]
+
+    def _trace_ollama(self, message: dict):
+        """
+        Rebuild Ollama's server-side phases (model load, prompt eval,
+        decoding) as child spans ending now, and record as queueing the
+        part of the wall time the server did not account for.
+        """
+        span = tracing.current_span()
+        if span is None:
+            return
+
+        end_ns = time.time_ns()
+
+        for name, key in [
+            ("ollama.eval", "eval_duration"),
+            ("ollama.prompt_eval", "prompt_eval_duration"),
+            ("ollama.load", "load_duration"),
+        ]:
+            duration = int(message.get(key, 0))
+            tracing.add_span(name, end_ns - duration, end_ns)
+            end_ns -= duration
+
+        if "total_duration" in message:
+            queued = (time.time_ns() - span.start_ns - int(message["total_duration"])) / 1e9
+            span.set(**{"ollama.queue_seconds": round(max(queued, 0.0), 4)})
+
+        span.set(**{
+            "ollama.prompt_eval_count": int(message.get("prompt_eval_count", 0)),
+            "ollama.eval_count": int(message.get("eval_count", 0))
+        })
+
+    @tracing.traced("generator.generate")
+    async def generate(self, question: str, context: str) -> str:
+        start_time = time.time()
+
+        try:
+            # ---------------- GPU PATH (Mistral) ----------------
+            if self.use_gpu_llm:
+                answer = await self.generation_queue.submit(
+                    (SYSTEM_PROMPT, self.build_user_prompt(question, context))
+                )
 
                 logging.info(f"[Generator GPU] Question: {question}")
                 logging.info(
@@ -160,21 +425,12 @@ Final Answer:
 
             # ---------------- CPU PATH (Ollama) ----------------
             else:
-                async with httpx.AsyncClient(timeout=None) as client:
-                    response = await client.post(
-                        self.base_url,
-                        json={
-                            "model": self.model_name,
-                            "prompt": prompt,
-                            "stream": False,
-                            "options": {
-                                "temperature": 0.01,
-                                "num_predict": 100
-                            }
-                        }
-                    )
-
-                result = response.json()
+                result = await self.ollama.generate({
+                    **self._ollama_payload(question, context),
+                    "stream": False
+                })
+                self._record_prefill(result)
+
                 answer = result.get("response", "").strip()
 
                 logging.info(f"[Generator CPU] Question: {question}")
@@ -187,3 +443,102 @@ Final Answer:
         except Exception as e:
             logging.error(f"[Generator ERROR] {str(e)}")
             return "I do not have enough information to answer this question."
+
+    async def generate_stream(self, question: str, context: str):
+        """
+        Yield the answer incrementally as text pieces.
+        A failure before the first piece yields the refusal instead; a
+        failure after it is re-raised.
+        """
+        start_time = time.time()
+
+        produced = False
+
+        try:
+            # ---------------- GPU PATH (Mistral) ----------------
+            if self.use_gpu_llm:
+                import torch
+                from transformers import TextIteratorStreamer
+
+                user_prompt = self.build_user_prompt(question, context)
+
+                streamer = TextIteratorStreamer(
+                    self.tokenizer,
+                    skip_prompt=True,
+                    skip_special_tokens=True
+                )
+
+                def run_generate():
+                    try:
+                        if self.prefix_cache is not None:
+                            inputs = self._prefixed_inputs(user_prompt)
+                        else:
+                            inputs = self.tokenizer(
+                                SYSTEM_PROMPT + user_prompt, return_tensors="pt"
+                            ).to(self.device)
+
+                        with torch.no_grad():
+                            self.model.generate(
+                                **inputs,
+                                max_new_tokens=120,
+                                do_sample=False,
+                                temperature=0.01,
+                                pad_token_id=self.tokenizer.pad_token_id,
+                                streamer=streamer
+                            )
+                    except Exception:
+                        # Unblock the reader below before re-raising
+                        streamer.end()
+                        raise
+
+                # Tokenizing, copying the prefix cache and generating all
+                # happen on the generation thread, never beside a batch
+                generation = asyncio.ensure_future(
+                    self.generation_queue.run_exclusive(run_generate)
+                )
+
+                # The streamer is a blocking iterator; pull from it off-loop
+                loop = asyncio.get_running_loop()
+                sentinel = object()
+
+                while True:
+                    piece = await loop.run_in_executor(None, next, streamer, sentinel)
+                    if piece is sentinel:
+                        break
+                    if piece:
+                        produced = True
+                        yield piece
+
+                # Re-raises a generation error
+                await generation
+
+                logging.info(
+                    f"[Generator GPU] Streaming generation time: {time.time() - start_time:.2f}s"
+                )
+
+            # ---------------- CPU PATH (Ollama) ----------------
+            else:
+                async for message in self.ollama.stream_generate(
+                    self._ollama_payload(question, context)
+                ):
+                    self._record_prefill(message)
+
+                    piece = message.get("response", "")
+                    if piece:
+                        produced = True
+                        yield piece
+
+                logging.info(
+                    f"[Generator CPU] Ollama streaming time: {time.time() - start_time:.2f}s"
+                )
+
+        except Exception as e:
+            logging.error(f"[Generator STREAM ERROR] {str(e)}")
+
+            # Part of the answer is already out: the caller must not
+            # treat what it has as complete
+            if produced:
+                raise
+
+        if not produced:
+            yield "I do not have enough information to answer this question."
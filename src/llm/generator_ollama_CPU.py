@@ -1,21 +1,12 @@
-import httpx
+import os
 import time
 import logging
 
-logging.basicConfig(level=logging.INFO)
-
-
-class GroundedGenerator:
-    def __init__(self, model_name="phi3:mini"):
-        self.model_name = model_name
-        self.base_url = "http://localhost:11434/api/generate"
+from src.llm.ollama_client import OllamaClient
 
-        logging.info(f"[Generator] Using Ollama model: {self.model_name}")
-
-    async def generate(self, question: str, context: str) -> str:
-        start_time = time.time()
+logging.basicConfig(level=logging.INFO)
 
-        prompt = f"""
+SYSTEM_PROMPT = """
 You are a government technology assistant specialized in Granicus products.
 
 You MUST answer using ONLY the provided context blocks.
@@ -38,8 +29,37 @@ CRITICAL RULES:
 
 Important: Frame Answers in a way that user do not think you are reading a document.
 
-Context Blocks:
-{context[:1000]}
+"""
+
+
+class GroundedGenerator:
+    def __init__(self, model_name="phi3:mini", ollama_client: OllamaClient = None, keep_alive: str = None):
+        self.model_name = model_name
+        self.ollama = ollama_client or OllamaClient()
+        self.keep_alive = keep_alive or os.getenv("RAG_OLLAMA_KEEP_ALIVE", "30m")
+
+        logging.info(f"[Generator] Using Ollama model: {self.model_name}")
+
+    # ---------------------------
+    # Lifecycle (FastAPI lifespan)
+    # ---------------------------
+    async def start(self):
+        await self.ollama.start()
+
+    async def aclose(self):
+        await self.ollama.aclose()
+
+    def stats(self) -> dict:
+        return {
+            "backend": "ollama",
+            "model": self.model_name,
+            "keep_alive": self.keep_alive,
+            "pool": self.ollama.pool_stats()
+        }
+
+    def build_user_prompt(self, question: str, context: str) -> str:
+        return f"""Context Blocks:
+{context}
 
 User Question:
 {question}
@@ -47,22 +67,32 @@ User Question:
 Final Answer:
 """
 
+    def build_prompt(self, question: str, context: str) -> str:
+        return SYSTEM_PROMPT + self.build_user_prompt(question, context)
+
+    def _payload(self, question: str, context: str) -> dict:
+        # Static instructions go in "system" so every request shares the
+        # same prefix, which Ollama reuses while keep_alive holds the model
+        return {
+            "model": self.model_name,
+            "system": SYSTEM_PROMPT,
+            "prompt": self.build_user_prompt(question, context),
+            "keep_alive": self.keep_alive,
+            "options": {
+                "temperature": 0.0,
+                "num_predict": 75
+            }
+        }
+
+    async def generate(self, question: str, context: str) -> str:
+        start_time = time.time()
+
         try:
-            async with httpx.AsyncClient(timeout=None) as client:
-                response = await client.post(
-                    self.base_url,
-                    json={
-                        "model": self.model_name,
-                        "prompt": prompt,
-                        "stream": False,
-                        "options": {
-                            "temperature": 0.0,
-                            "num_predict": 75
-                        }
-                    }
-                )
-
-            result = response.json()
+            result = await self.ollama.generate({
+                **self._payload(question, context),
+                "stream": False
+            })
+
             answer = result.get("response", "").strip()
 
             logging.info(
@@ -74,3 +104,37 @@ Final Answer:
         except Exception as e:
             logging.error(f"[Generator ERROR] {str(e)}")
             return "I do not have enough information to answer this question."
+
+    async def generate_stream(self, question: str, context: str):
+        """
+        Yield the answer incrementally as Ollama streams it back.
+        A failure before the first piece yields the refusal instead; a
+        failure after it is re-raised.
+        """
+        start_time = time.time()
+
+        produced = False
+
+        try:
+            async for message in self.ollama.stream_generate(
+                self._payload(question, context)
+            ):
+                piece = message.get("response", "")
+                if piece:
+                    produced = True
+                    yield piece
+
+            logging.info(
+                f"[Generator] Ollama streaming time: {time.time() - start_time:.2f}s"
+            )
+
+        except Exception as e:
+            logging.error(f"[Generator STREAM ERROR] {str(e)}")
+
+            # Part of the answer is already out: the caller must not
+            # treat what it has as complete
+            if produced:
+                raise
+
+        if not produced:
+            yield "I do not have enough information to answer this question."
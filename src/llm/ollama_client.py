@@ -0,0 +1,218 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import AsyncIterator, Optional
+
+import httpx
+
+logging.basicConfig(level=logging.INFO)
+
+
+class OllamaClient:
+    """
+    Long-lived, pooled HTTP client for the Ollama API.
+
+    Timeouts are split by phase:
+    - connect_timeout: establishing the TCP connection (and waiting for a
+      free slot in the pool)
+    - first_byte_timeout: maximum silence while waiting on the server
+    - total_timeout: hard deadline for the whole request
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        max_connections: int = 10,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 60.0,
+        connect_timeout: float = 5.0,
+        first_byte_timeout: float = 60.0,
+        total_timeout: float = 120.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.base_url = (
+            base_url or os.getenv("OLLAMA_HOST", "http://localhost:11434")
+        ).rstrip("/")
+
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+
+        self.timeout = httpx.Timeout(
+            connect=connect_timeout,
+            read=first_byte_timeout,
+            write=connect_timeout,
+            pool=connect_timeout
+        )
+
+        self.total_timeout = total_timeout
+        self._transport = transport
+        self.client: Optional[httpx.AsyncClient] = None
+
+        # Usage stats
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.errors = 0
+        self.timeouts = {"connect": 0, "first_byte": 0, "pool": 0, "total": 0}
+
+    # ---------------------------
+    # Lifecycle
+    # ---------------------------
+    async def start(self):
+        if self.client is not None:
+            return
+
+        transport = self._transport or httpx.AsyncHTTPTransport(limits=self.limits)
+
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=self.timeout,
+            transport=transport
+        )
+
+        logging.info(
+            f"[OllamaClient] Connection pool opened for {self.base_url} "
+            f"(max {self.limits.max_connections} connections)"
+        )
+
+    async def aclose(self):
+        if self.client is None:
+            return
+
+        await self.client.aclose()
+        self.client = None
+
+        logging.info("[OllamaClient] Connection pool closed")
+
+    # ---------------------------
+    # Requests
+    # ---------------------------
+    async def generate(self, payload: dict) -> dict:
+        # Scripts and tests that skip the FastAPI lifespan open lazily
+        if self.client is None:
+            await self.start()
+
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+        try:
+            response = await asyncio.wait_for(
+                self.client.post("/api/generate", json=payload),
+                timeout=self.total_timeout
+            )
+            response.raise_for_status()
+            return response.json()
+
+        except asyncio.TimeoutError:
+            self.timeouts["total"] += 1
+            raise
+
+        except httpx.ConnectTimeout:
+            self.timeouts["connect"] += 1
+            raise
+
+        except httpx.PoolTimeout:
+            self.timeouts["pool"] += 1
+            raise
+
+        except httpx.ReadTimeout:
+            self.timeouts["first_byte"] += 1
+            raise
+
+        except Exception:
+            self.errors += 1
+            raise
+
+        finally:
+            self.in_flight -= 1
+
+    async def stream_generate(self, payload: dict) -> AsyncIterator[dict]:
+        """
+        POST with "stream": true and yield each NDJSON message as it
+        arrives. The read timeout bounds the silence between messages;
+        the total deadline is checked as each message arrives.
+        """
+        if self.client is None:
+            await self.start()
+
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+        deadline = time.monotonic() + self.total_timeout
+
+        try:
+            async with self.client.stream(
+                "POST",
+                "/api/generate",
+                json={**payload, "stream": True}
+            ) as response:
+                response.raise_for_status()
+
+                async for line in response.aiter_lines():
+                    if time.monotonic() > deadline:
+                        raise asyncio.TimeoutError("Ollama stream exceeded total deadline")
+
+                    if not line.strip():
+                        continue
+
+                    message = json.loads(line)
+                    yield message
+
+                    if message.get("done"):
+                        break
+
+        except asyncio.TimeoutError:
+            self.timeouts["total"] += 1
+            raise
+
+        except httpx.ConnectTimeout:
+            self.timeouts["connect"] += 1
+            raise
+
+        except httpx.PoolTimeout:
+            self.timeouts["pool"] += 1
+            raise
+
+        except httpx.ReadTimeout:
+            self.timeouts["first_byte"] += 1
+            raise
+
+        except Exception:
+            self.errors += 1
+            raise
+
+        finally:
+            self.in_flight -= 1
+
+    # ---------------------------
+    # Stats
+    # ---------------------------
+    def pool_stats(self) -> dict:
+        open_connections = 0
+        idle_connections = 0
+
+        # httpx does not expose its pool publicly; best effort only
+        pool = getattr(getattr(self.client, "_transport", None), "_pool", None)
+        for connection in getattr(pool, "connections", []):
+            open_connections += 1
+            if connection.is_idle():
+                idle_connections += 1
+
+        return {
+            "base_url": self.base_url,
+            "max_connections": self.limits.max_connections,
+            "open_connections": open_connections,
+            "idle_connections": idle_connections,
+            "requests": self.requests,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "errors": self.errors,
+            "timeouts": dict(self.timeouts)
+        }
@@ -0,0 +1,350 @@
+import atexit
+import json
+import logging
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO)
+
+# Seconds; spans cache hits (ms) through slow CPU generations (tens of s)
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+# name -> (type, help)
+METRICS = {
+    "rag_stage_seconds": (
+        "histogram",
+        "Time spent in each pipeline stage (embed, retrieve, rerank, context, generate, time_to_first_token, total)."
+    ),
+    "rag_requests_total": ("counter", "Chat requests handled, by endpoint."),
+    "rag_cache_hits_total": ("counter", "Questions answered from the semantic cache."),
+    "rag_refusals_total": ("counter", "Questions refused without an answer, by reason."),
+    "rag_errors_total": ("counter", "Requests that failed, by stage."),
+    "rag_in_flight_requests": ("gauge", "Chat requests currently being handled."),
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def label_key(labels: dict) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def format_labels(key: LabelKey, extra: Optional[dict] = None) -> str:
+    pairs = list(key) + list((extra or {}).items())
+    if not pairs:
+        return ""
+
+    def escape(value) -> str:
+        return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+    body = ",".join(f'{k}="{escape(v)}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+def pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+
+def process_start_ticks(pid: int) -> Optional[str]:
+    """
+    Start time of a process in clock ticks since boot (Linux), which
+    tells a process apart from a later one that reuses its pid.
+    """
+    try:
+        stat = Path(f"/proc/{pid}/stat").read_text()
+        return stat.rsplit(")", 1)[1].split()[19]
+    except (OSError, IndexError):
+        return None
+
+
+def default_run_id() -> str:
+    """
+    Identifies one server run: RAG_METRICS_RUN_ID when the launcher sets
+    it, else the uvicorn master that spawned this worker (--workers), else
+    this process itself (single-process uvicorn), as pid plus start time.
+    """
+    run_id = os.getenv("RAG_METRICS_RUN_ID")
+
+    if not run_id:
+        parent = multiprocessing.parent_process()
+        pid = parent.pid if parent is not None else os.getpid()
+        start = process_start_ticks(pid) or str(int(time.time()))
+        run_id = f"{pid}.{start}"
+
+    return re.sub(r"[^A-Za-z0-9_.]", "_", run_id)
+
+
+class MetricsRegistry:
+    """
+    Counters, gauges and histograms rendered in the Prometheus text
+    format.
+
+    Every uvicorn worker keeps its own values in memory and a background
+    thread writes them (at most every flush_interval seconds, and only
+    when something changed) to a per-worker snapshot file in directory.
+    render() merges the snapshots of all workers of the same server run
+    (run_id, see default_run_id()), so whichever worker serves /metrics
+    reports totals for the whole server: counters and histograms are
+    summed, including those of workers that have since exited, and gauges
+    are summed over live workers only. Snapshots of other runs are ignored,
+    and removed once their worker has exited, so a restarted server starts
+    from zero.
+
+    With directory=None the registry is in-process only.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        flush_interval: float = 1.0,
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+        run_id: Optional[str] = None
+    ):
+        self.directory = Path(directory) if directory else None
+        self.flush_interval = flush_interval
+        self.buckets = tuple(buckets)
+
+        self.pid = os.getpid()
+        self.run_id = run_id or default_run_id()
+
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, LabelKey], float] = {}
+        self._gauges: Dict[Tuple[str, LabelKey], float] = {}
+        # (name, labels) -> [count per bucket..., +Inf count, sum]
+        self._histograms: Dict[Tuple[str, LabelKey], list] = {}
+
+        self._dirty = False
+        self._flusher: Optional[threading.Thread] = None
+        self._cleaned = False
+
+    # ---------------------------
+    # Recording
+    # ---------------------------
+    def inc(self, name: str, value: float = 1.0, **labels):
+        key = (name, label_key(labels))
+
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+            self._mark_dirty()
+
+    def set_gauge(self, name: str, value: float, **labels):
+        with self._lock:
+            self._gauges[(name, label_key(labels))] = value
+            self._mark_dirty()
+
+    def add_gauge(self, name: str, value: float, **labels):
+        key = (name, label_key(labels))
+
+        with self._lock:
+            self._gauges[key] = self._gauges.get(key, 0.0) + value
+            self._mark_dirty()
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = (name, label_key(labels))
+
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [0] * (len(self.buckets) + 1) + [0.0]
+
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    histogram[i] += 1
+                    break
+            else:
+                histogram[len(self.buckets)] += 1
+
+            histogram[-1] += seconds
+            self._mark_dirty()
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    @contextmanager
+    def in_flight(self, name: str, **labels):
+        self.add_gauge(name, 1, **labels)
+        try:
+            yield
+        finally:
+            self.add_gauge(name, -1, **labels)
+
+    def total(self, name: str) -> float:
+        """
+        Sum of a counter over all label sets and all workers.
+        """
+        counters, _, _ = self.collect()
+        return sum(value for (metric, _), value in counters.items() if metric == name)
+
+    # ---------------------------
+    # Cross-worker snapshots
+    # ---------------------------
+    def _mark_dirty(self):
+        self._dirty = True
+
+        if self.directory is not None and self._flusher is None:
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name="metrics-flush", daemon=True
+            )
+            self._flusher.start()
+            atexit.register(self.flush)
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            if self._dirty:
+                self.flush()
+
+    def _snapshot_path(self, pid: int = None) -> Path:
+        return self.directory / f"metrics-{self.run_id}-{pid or self.pid}.json"
+
+    def _snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "pid": self.pid,
+                "counters": [[n, list(map(list, l)), v] for (n, l), v in self._counters.items()],
+                "gauges": [[n, list(map(list, l)), v] for (n, l), v in self._gauges.items()],
+                "histograms": [[n, list(map(list, l)), h] for (n, l), h in self._histograms.items()],
+            }
+
+    def flush(self):
+        if self.directory is None:
+            return
+
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+            if not self._cleaned:
+                # Once per process, so files never pile up unscraped
+                self._cleaned = True
+                self._load_snapshots()
+
+            # Cleared before the snapshot is taken: a write that lands in
+            # between is in this snapshot and also marks the next flush
+            with self._lock:
+                self._dirty = False
+
+            # Write-then-rename so a scrape never reads a torn snapshot
+            path = self._snapshot_path()
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(self._snapshot()))
+            os.replace(tmp_path, path)
+
+        except Exception as e:
+            logging.error(f"[Metrics FLUSH ERROR] {str(e)}")
+
+    def _load_snapshots(self) -> list:
+        snapshots = [self._snapshot()]
+
+        if self.directory is None or not self.directory.exists():
+            return snapshots
+
+        for path in self.directory.glob("metrics-*.json"):
+            try:
+                run_id, pid = path.stem[len("metrics-"):].rsplit("-", 1)
+                pid = int(pid)
+            except ValueError:
+                continue
+
+            if run_id != self.run_id:
+                # Left by an earlier server run
+                if not pid_alive(pid):
+                    path.unlink(missing_ok=True)
+                continue
+
+            if pid == self.pid:
+                continue
+
+            try:
+                snapshot = json.loads(path.read_text())
+                snapshot["alive"] = pid_alive(pid)
+                snapshots.append(snapshot)
+            except Exception as e:
+                logging.error(f"[Metrics READ ERROR] {path.name}: {str(e)}")
+
+        return snapshots
+
+    def collect(self):
+        counters, gauges, histograms = {}, {}, {}
+
+        for snapshot in self._load_snapshots():
+            for name, labels, value in snapshot["counters"]:
+                key = (name, tuple(map(tuple, labels)))
+                counters[key] = counters.get(key, 0.0) + value
+
+            # In-flight work of an exited worker is gone
+            if snapshot.get("alive", True):
+                for name, labels, value in snapshot["gauges"]:
+                    key = (name, tuple(map(tuple, labels)))
+                    gauges[key] = gauges.get(key, 0.0) + value
+
+            for name, labels, values in snapshot["histograms"]:
+                key = (name, tuple(map(tuple, labels)))
+                merged = histograms.setdefault(key, [0] * len(values))
+                for i, value in enumerate(values):
+                    merged[i] += value
+
+        return counters, gauges, histograms
+
+    # ---------------------------
+    # Exposition
+    # ---------------------------
+    def render(self) -> str:
+        counters, gauges, histograms = self.collect()
+
+        lines = []
+        series = {"counter": counters, "gauge": gauges, "histogram": histograms}
+
+        for name, (metric_type, help_text) in METRICS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+
+            for (metric, labels), value in sorted(series[metric_type].items()):
+                if metric != name:
+                    continue
+
+                if metric_type != "histogram":
+                    lines.append(f"{name}{format_labels(labels)} {value:g}")
+                    continue
+
+                cumulative = 0
+                for bound, count in zip(self.buckets, value):
+                    cumulative += count
+                    lines.append(
+                        f"{name}_bucket{format_labels(labels, {'le': f'{bound:g}'})} {cumulative}"
+                    )
+
+                cumulative += value[len(self.buckets)]
+                lines.append(f"{name}_bucket{format_labels(labels, {'le': '+Inf'})} {cumulative}")
+                lines.append(f"{name}_sum{format_labels(labels)} {value[-1]:.6f}")
+                lines.append(f"{name}_count{format_labels(labels)} {cumulative}")
+
+        return "\n".join(lines) + "\n"
+
+
+# Shared by the API and the pipeline within one worker
+metrics = MetricsRegistry(
+    directory=os.getenv(
+        "RAG_METRICS_DIR", os.path.join(tempfile.gettempdir(), "rag_metrics")
+    ),
+    flush_interval=float(os.getenv("RAG_METRICS_FLUSH_SECONDS", "1.0"))
+)
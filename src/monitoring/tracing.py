@@ -0,0 +1,250 @@
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+logging.basicConfig(level=logging.INFO)
+
+SERVICE_NAME = "granicus-rag"
+
+# Innermost open span of the current request; copied into executor
+# threads with contextvars.copy_context()
+_current_span: contextvars.ContextVar = contextvars.ContextVar("rag_span", default=None)
+
+
+class Span:
+    __slots__ = (
+        "trace", "name", "span_id", "parent_id",
+        "start_ns", "end_ns", "attributes", "error"
+    )
+
+    def __init__(self, trace, name: str, parent_id: Optional[str], attributes: dict):
+        self.trace = trace
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes
+        self.error = None
+
+    @property
+    def seconds(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+
+class Trace:
+    """
+    Every span recorded while handling one request, sharing its trace
+    and request IDs.
+    """
+
+    def __init__(self, request_id: Optional[str] = None):
+        self.trace_id = uuid.uuid4().hex
+        self.request_id = request_id or self.trace_id[:16]
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    def timings(self) -> Dict[str, float]:
+        """
+        Seconds per span name, in the order spans started (repeated
+        spans, e.g. several vector searches, are summed).
+        """
+        timings = {}
+        for span in sorted(self.spans, key=lambda s: s.start_ns):
+            if span.end_ns is not None:
+                timings[span.name] = round(timings.get(span.name, 0.0) + span.seconds, 4)
+        return timings
+
+    # ---------------------------
+    # OTLP/JSON (the shape of an ExportTraceServiceRequest)
+    # ---------------------------
+    def to_otlp(self) -> dict:
+        spans = []
+        for span in self.spans:
+            if span.end_ns is None:
+                continue
+
+            spans.append({
+                "traceId": self.trace_id,
+                "spanId": span.span_id,
+                "parentSpanId": span.parent_id or "",
+                "name": span.name,
+                "kind": 1,
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns),
+                "attributes": [
+                    otlp_attribute(key, value)
+                    for key, value in {"request.id": self.request_id, **span.attributes}.items()
+                ],
+                "status": (
+                    {"code": 2, "message": span.error} if span.error else {"code": 1}
+                )
+            })
+
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [otlp_attribute("service.name", SERVICE_NAME)]},
+                "scopeSpans": [{
+                    "scope": {"name": "src.monitoring.tracing"},
+                    "spans": spans
+                }]
+            }]
+        }
+
+
+def otlp_attribute(key: str, value) -> dict:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+
+    return {"key": key, "value": typed}
+
+
+class JsonlExporter:
+    """
+    Appends each finished trace as one OTLP/JSON line, readable by the
+    OpenTelemetry Collector's file receiver and otlpjsonfile tools.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, trace: Trace):
+        try:
+            line = json.dumps(trace.to_otlp())
+
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+        except Exception as e:
+            logging.error(f"[Tracing EXPORT ERROR] {str(e)}")
+
+
+_exporter = JsonlExporter(os.environ["RAG_TRACE_FILE"]) if os.getenv("RAG_TRACE_FILE") else None
+
+
+def set_exporter(exporter: Optional[JsonlExporter]):
+    global _exporter
+    _exporter = exporter
+
+
+# ---------------------------
+# Recording
+# ---------------------------
+def _reset(token):
+    try:
+        _current_span.reset(token)
+    except ValueError:
+        # An async generator finalized from another task's context
+        pass
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Child span of the current one. Outside a traced request it records
+    nothing.
+    """
+    parent = _current_span.get()
+
+    if parent is None:
+        yield None
+        return
+
+    child = Span(parent.trace, name, parent.span_id, attributes)
+    parent.trace.add(child)
+    token = _current_span.set(child)
+
+    try:
+        yield child
+    except Exception as e:
+        child.error = str(e)
+        raise
+    finally:
+        child.end_ns = time.time_ns()
+        _reset(token)
+
+
+@contextmanager
+def start_trace(name: str, request_id: Optional[str] = None, **attributes):
+    """
+    Root span of a request. The finished trace is exported when an
+    exporter is configured (RAG_TRACE_FILE).
+    """
+    trace = Trace(request_id)
+    root = Span(trace, name, None, attributes)
+    trace.add(root)
+    token = _current_span.set(root)
+
+    try:
+        yield trace
+    except Exception as e:
+        root.error = str(e)
+        raise
+    finally:
+        root.end_ns = time.time_ns()
+        _reset(token)
+
+        if _exporter is not None:
+            _exporter.export(trace)
+
+
+def add_span(name: str, start_ns: int, end_ns: int, **attributes):
+    """
+    Record an already-finished child span, e.g. one reconstructed from
+    durations reported by a remote server.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return
+
+    child = Span(parent.trace, name, parent.span_id, attributes)
+    child.start_ns = start_ns
+    child.end_ns = end_ns
+    parent.trace.add(child)
+
+
+def traced(name: str):
+    """
+    Decorator form of span() for sync and async functions.
+    """
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorator
@@ -1,131 +1,389 @@
+import os
 import time
 import logging
 import numpy as np
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
 
 from src.vectorstore.store import VectorStore
+from src.vectorstore.retriever import AsyncRetriever
+from src.vectorstore.batcher import EmbeddingBatcher
+from src.cache.semantic_cache import SemanticCache, normalize_question
+from src.cache.single_flight import SingleFlight
 from src.vectorstore.embeddings import Embedder
+from src.vectorstore.embedding_cache import EmbeddingCache
+from src.vectorstore.scope import ScopeGate, SCOPE_FILE
+from src.vectorstore.reranker import load_reranker
 from src.llm.context_builder import ContextBuilder
 from src.llm.generator import GroundedGenerator
 from src.ingestion.loader import DocumentLoader
+from src.monitoring.metrics import metrics
+from src.monitoring import tracing
 from src.chunking.chunker import SmartChunker
+from src.vectorstore.sync import IndexSyncer
 
 
 logging.basicConfig(level=logging.INFO)
 
+REFUSAL = "I do not have enough information to answer this question."
+
 
 class RAGPipeline:
-    def __init__(self):
+    def __init__(
+        self,
+        data_dir: str = "data",
+        persist_dir: Optional[str] = None,
+        retrieval_executor: Optional[str] = None,
+        retrieval_workers: Optional[int] = None,
+        cache_similarity: Optional[float] = None,
+        cache_max_entries: Optional[int] = None,
+        cache_ttl_seconds: Optional[float] = None,
+        embed_batch_size: Optional[int] = None,
+        embed_batch_wait_ms: Optional[float] = None,
+        generator=None
+    ):
         start_time = time.time()
 
+        # Seconds spent building each component, reported at boot
+        self.startup_timings = {}
+
         try:
-            self.embedder = Embedder()
-            self.store = VectorStore(embedder=self.embedder)
-            self.context_builder = ContextBuilder()
-            self.generator = GroundedGenerator()
+            with self._timed("embedder"):
+                self.embedder = Embedder()
+
+            # Persistent chunk-embedding cache: rebuilds only embed new text
+            with self._timed("embedding_cache"):
+                self.embedding_cache = EmbeddingCache(
+                    cache_dir=os.getenv("RAG_EMBEDDING_CACHE_DIR", "embedding_cache"),
+                    model_name=self.embedder.cache_key
+                )
+
+            backend = os.getenv("RAG_VECTOR_BACKEND", "chroma")
+
+            # Compact (quantized / reduced) vectors are a flat-backend feature
+            flat_options = None
+            if backend == "flat":
+                dims = os.getenv("RAG_VECTOR_DIMS")
+                flat_options = {
+                    "precision": os.getenv("RAG_VECTOR_PRECISION", "float32"),
+                    "dims": int(dims) if dims else None,
+                    "reduction": os.getenv("RAG_VECTOR_REDUCTION", "pca"),
+                    "rescore_factor": int(os.getenv("RAG_RESCORE_FACTOR", "4"))
+                }
+
+            with self._timed("vector_store"):
+                self.store = VectorStore(
+                    embedder=self.embedder,
+                    persist_dir=persist_dir or os.getenv("RAG_PERSIST_DIR", "chroma_db"),
+                    embedding_cache=self.embedding_cache,
+                    write_batch_size=int(os.getenv("RAG_INDEX_WRITE_BATCH_SIZE", "256")),
+                    backend=backend,
+                    flat_options=flat_options
+                )
+
+            with self._timed("generator"):
+                # Callers (benchmarks) may supply their own generator
+                self.generator = generator or GroundedGenerator()
+
+            # Cross-encoder reranking of retrieved chunks (optional)
+            self.reranker = None
+            self.reranker_error = None
+            if os.getenv("RAG_RERANK", "1") == "1":
+                rerank_model = os.getenv("RAG_RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+
+                with self._timed("reranker"):
+                    self.reranker = load_reranker(
+                        rerank_model,
+                        min_score=float(os.getenv("RAG_RERANK_MIN_SCORE", "0.05")),
+                        relative_cutoff=float(os.getenv("RAG_RERANK_RELATIVE_CUTOFF", "0.3"))
+                    )
+
+                # Reported in /stats: RAG_RERANK=1 alone does not mean it is on
+                if self.reranker is None:
+                    self.reranker_error = (
+                        f"{rerank_model} failed to load; ranking by vector distance"
+                    )
+
+            # Token-budgeted context packing, counted with the LLM's own
+            # tokenizer when it is loaded locally (HF path)
+            self.context_builder = ContextBuilder(
+                tokenizer=getattr(self.generator, "tokenizer", None),
+                tokenizer_file=os.getenv("RAG_TOKENIZER_FILE"),
+                max_tokens=int(os.getenv("RAG_CONTEXT_TOKENS", "512")),
+                max_chunks=int(os.getenv("RAG_CONTEXT_MAX_CHUNKS", "3"))
+            )
 
-                        # ---------------------------
-            # Auto Index Initialization
             # ---------------------------
-            if self.store.is_empty():
-                logging.info("[RAGPipeline] Vector store empty. Initializing index...")
+            # Out-of-scope gate (centroids stored with the index)
+            # ---------------------------
+            self.scope_gate = None
+            if os.getenv("RAG_SCOPE_GATE", "0") == "1":
+                self.scope_gate = ScopeGate(
+                    Path(self.store.index_dir) / SCOPE_FILE,
+                    n_centroids=int(os.getenv("RAG_SCOPE_CENTROIDS", "16")),
+                    threshold=float(os.getenv("RAG_SCOPE_THRESHOLD", "0.5"))
+                )
 
-                loader = DocumentLoader(data_dir="data")
-                documents = loader.load()
+            # ---------------------------
+            # Incremental Index Sync
+            # ---------------------------
+            # Indexes an empty store from scratch and otherwise re-embeds
+            # only the files in data_dir that changed since the last sync
+            self.syncer = IndexSyncer(
+                self.store,
+                DocumentLoader(
+                    data_dir=data_dir,
+                    workers=int(os.getenv("RAG_INGEST_WORKERS", "1"))
+                ),
+                SmartChunker(),
+                batch_size=int(os.getenv("RAG_INDEX_BATCH_SIZE", "64")),
+                queue_size=int(os.getenv("RAG_INDEX_QUEUE_SIZE", "4")),
+                scope_gate=self.scope_gate
+            )
 
-                chunker = SmartChunker()
-                chunks = chunker.chunk_documents(documents)
+            with self._timed("index_sync"):
+                self.sync_index()
 
-                self.store.index_chunks(chunks)
+            # ---------------------------
+            # Off-loop Retrieval Executor
+            # ---------------------------
+            with self._timed("retriever"):
+                self.retriever = AsyncRetriever(
+                    self.store,
+                    executor_type=retrieval_executor
+                    or os.getenv("RAG_RETRIEVAL_EXECUTOR", "thread"),
+                    max_workers=retrieval_workers
+                    or int(os.getenv("RAG_RETRIEVAL_WORKERS", "4"))
+                )
 
-                logging.info("[RAGPipeline] Index initialization complete.")
+            # ---------------------------
+            # Query-embedding micro-batching
+            # ---------------------------
+            self.embed_batcher = EmbeddingBatcher(
+                self.retriever,
+                max_batch_size=embed_batch_size
+                or int(os.getenv("RAG_EMBED_BATCH_SIZE", "32")),
+                max_wait_ms=embed_batch_wait_ms
+                or float(os.getenv("RAG_EMBED_BATCH_WAIT_MS", "5"))
+            )
 
+            # ---------------------------
+            # Semantic answer cache (high-confidence answers only)
+            # ---------------------------
+            self.cache = SemanticCache(
+                similarity_threshold=cache_similarity
+                or float(os.getenv("RAG_CACHE_SIMILARITY", "0.95")),
+                max_entries=cache_max_entries
+                or int(os.getenv("RAG_CACHE_MAX_ENTRIES", "1000")),
+                max_bytes=int(os.getenv("RAG_CACHE_MAX_BYTES", str(16 * 1024 * 1024))),
+                ttl_seconds=cache_ttl_seconds
+                or float(os.getenv("RAG_CACHE_TTL_SECONDS", "3600"))
+            )
 
-            # High-threshold cache
-            self.cache = {}
+            # Identical concurrent questions share one retrieval + generation
+            self.single_flight = SingleFlight()
 
-            logging.info(
-                f"[RAGPipeline] Initialized in {time.time() - start_time:.2f}s"
+            self.startup_timings["total"] = round(time.time() - start_time, 3)
+
+            breakdown = ", ".join(
+                f"{name} {seconds:.2f}s" for name, seconds in self.startup_timings.items()
             )
+            logging.info(f"[RAGPipeline] Initialized ({breakdown})")
 
         except Exception as e:
             logging.error(f"[RAGPipeline INIT ERROR] {str(e)}")
             raise e
 
+    @contextmanager
+    def _timed(self, component: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.startup_timings[component] = round(time.perf_counter() - start, 3)
+
+    def sync_index(self) -> dict:
+        return self.syncer.sync()
+
+    # ---------------------------
+    # Lifecycle (FastAPI lifespan)
+    # ---------------------------
+    async def startup(self):
+        await self.generator.start()
+
+    async def shutdown(self):
+        await self.generator.aclose()
+        self.embed_batcher.shutdown()
+        self.retriever.shutdown()
+
+    def out_of_scope(self, query_embedding: list) -> bool:
+        if self.scope_gate is None or self.scope_gate.in_scope(query_embedding):
+            return False
+
+        logging.info("[RAG] Out of scope; skipping retrieval and generation")
+        metrics.inc("rag_refusals_total", reason="out_of_scope")
+        return True
+
+    # ---------------------------
+    # Retrieval + Context (shared by ask / ask_stream)
+    # ---------------------------
+    async def _prepare_context(
+        self,
+        question: str,
+        top_k: int,
+        query_embedding: Optional[list] = None
+    ):
+        """
+        Returns (context, confidence, prompt_tokens), or None when the
+        retrieval guardrails decide the question cannot be answered.
+        """
+        retrieval_start = time.time()
+        with tracing.span("rag.retrieve", top_k=top_k):
+            results = await self.retriever.query(
+                question,
+                top_k=top_k,
+                query_embedding=query_embedding
+            )
+        metrics.observe("rag_stage_seconds", time.time() - retrieval_start, stage="retrieve")
+        logging.info(
+            f"[RAG] Retrieval time: {time.time() - retrieval_start:.2f}s"
+        )
+
+        docs = results.get("documents", [[]])[0]
+        distances = results.get("distances", [[]])[0]
+
+        if not docs:
+            metrics.inc("rag_refusals_total", reason="no_results")
+            return None
+
+        # ---------------------------
+        # Similarity Threshold Guard
+        # ---------------------------
+        if distances and min(distances) > 0.35:
+            metrics.inc("rag_refusals_total", reason="low_similarity")
+            return None
+
+        # ---------------------------
+        # Re-ranking (cross-encoder, keeping only chunks above the cutoff)
+        # ---------------------------
+        ranked = sorted(zip(docs, distances), key=lambda x: x[1])
+
+        if self.reranker is not None:
+            rerank_start = time.time()
+            with tracing.span("rag.rerank", candidates=len(docs)):
+                # On the retrieval executor: model calls stay bounded by
+                # RAG_RETRIEVAL_WORKERS, which ONNX threads are sized for
+                kept = await self.retriever.run_local(self.reranker.rerank, question, docs)
+            ranked = [(docs[i], distances[i]) for i, _ in kept]
+            metrics.observe("rag_stage_seconds", time.time() - rerank_start, stage="rerank")
+
+            logging.info(
+                f"[RAG] Reranked {len(docs)} -> {len(ranked)} chunks "
+                f"in {time.time() - rerank_start:.3f}s"
+            )
+
+        # ---------------------------
+        # Context Build (whole chunks, by rank, within the token budget)
+        # ---------------------------
+        with metrics.timer("rag_stage_seconds", stage="context"), tracing.span("rag.context"):
+            packed = self.context_builder.pack([doc for doc, _ in ranked])
+            context = packed["context"]
+
+            prompt_tokens = self.context_builder.count_tokens(
+                self.generator.build_prompt(question, context)
+            )
+
+        logging.info(
+            f"[RAG] Packed {packed['chunks']} chunks "
+            f"({packed['context_tokens']} context / {prompt_tokens} prompt tokens)"
+        )
+
+        # Nothing to ground an answer on (e.g. only blank chunks)
+        if not context:
+            metrics.inc("rag_refusals_total", reason="empty_context")
+            return None
+
+        # ---------------------------
+        # Confidence
+        # ---------------------------
+        avg_distance = np.mean([d for _, d in ranked[:2]])
+        confidence = max(0.0, 1 - avg_distance)
+
+        return context, round(float(confidence), 3), prompt_tokens
+
+    @tracing.traced("rag.ask")
     async def ask(self, question: str, top_k: int = 5):
+        key = f"{top_k}:{normalize_question(question)}"
+
+        return await self.single_flight.do(
+            key,
+            lambda: self._ask(question, top_k)
+        )
+
+    async def _ask(self, question: str, top_k: int):
         pipeline_start = time.time()
 
         try:
             # ---------------------------
-            # Cache Check
+            # Semantic Cache Check
             # ---------------------------
-            if question in self.cache:
-                logging.info("[RAG] Cache hit")
-                return self.cache[question]
+            with metrics.timer("rag_stage_seconds", stage="embed"), tracing.span("rag.embed"):
+                query_embedding = await self.embed_batcher.embed(question)
 
             # ---------------------------
-            # Retrieval
+            # Scope Gate (no retrieval or LLM call for off-topic questions)
             # ---------------------------
-            retrieval_start = time.time()
-            results = self.store.query(question, top_k=top_k)
-            logging.info(
-                f"[RAG] Retrieval time: {time.time() - retrieval_start:.2f}s"
-            )
-
-            docs = results.get("documents", [[]])[0]
-            distances = results.get("distances", [[]])[0]
-
-            if not docs:
+            if self.out_of_scope(query_embedding):
                 return {
-                    "answer": "I do not have enough information to answer this question.",
-                    "confidence": 0.0
+                    "answer": REFUSAL,
+                    "confidence": 0.0,
+                    "prompt_tokens": 0
                 }
 
-            # ---------------------------
-            # Similarity Threshold Guard
-            # ---------------------------
-            if distances and min(distances) > 0.35:
+            index_version = self.store.index_version()
+            cached = self.cache.lookup(query_embedding, index_version)
+            if cached is not None:
+                logging.info("[RAG] Cache hit")
+                metrics.inc("rag_cache_hits_total")
+                return {**cached, "prompt_tokens": 0}
+
+            prepared = await self._prepare_context(
+                question, top_k, query_embedding=query_embedding
+            )
+
+            if prepared is None:
                 return {
-                    "answer": "I do not have enough information to answer this question.",
-                    "confidence": 0.0
+                    "answer": REFUSAL,
+                    "confidence": 0.0,
+                    "prompt_tokens": 0
                 }
 
-            # ---------------------------
-            # Re-ranking (keep best 2)
-            # ---------------------------
-            ranked = sorted(zip(docs, distances), key=lambda x: x[1])
-            top_docs = [doc for doc, _ in ranked[:3]]
-
-            # ---------------------------
-            # Context Build
-            # ---------------------------
-            context = "\n\n".join(top_docs)
+            context, confidence, prompt_tokens = prepared
 
             # ---------------------------
             # Generation
             # ---------------------------
             generation_start = time.time()
             answer = await self.generator.generate(question, context)
+            metrics.observe("rag_stage_seconds", time.time() - generation_start, stage="generate")
             logging.info(
                 f"[RAG] Generation time: {time.time() - generation_start:.2f}s"
             )
 
-            # ---------------------------
-            # Confidence
-            # ---------------------------
-            avg_distance = np.mean([d for _, d in ranked[:2]])
-            confidence = max(0.0, 1 - avg_distance)
-
             result = {
                 "answer": answer,
-                "confidence": round(confidence, 3)
+                "confidence": confidence,
+                "prompt_tokens": prompt_tokens
             }
 
             # ---------------------------
             # High-Confidence Cache (>0.85)
             # ---------------------------
             if confidence > 0.85:
-                self.cache[question] = result
+                self.cache.add(question, query_embedding, result, index_version)
 
+            metrics.observe("rag_stage_seconds", time.time() - pipeline_start, stage="total")
             logging.info(
                 f"[RAG] Total pipeline time: {time.time() - pipeline_start:.2f}s"
             )
@@ -134,7 +392,115 @@ class RAGPipeline:
 
         except Exception as e:
             logging.error(f"[RAG ERROR] {str(e)}")
+            metrics.inc("rag_errors_total", stage="ask")
+            return {
+                "answer": REFUSAL,
+                "confidence": 0.0,
+                "prompt_tokens": 0
+            }
+
+    async def ask_stream(self, question: str, top_k: int = 5):
+        """
+        Streaming variant of ask(). Yields token events as they are
+        generated, then one final "done" event carrying the confidence
+        and per-stage timings (including time to first token).
+        """
+        pipeline_start = time.time()
+        timings = {}
+
+        def done(confidence: float, cached: bool = False, prompt_tokens: int = 0) -> dict:
+            timings["total"] = round(time.time() - pipeline_start, 3)
             return {
-                "answer": "I do not have enough information to answer this question.",
-                "confidence": 0.0
+                "type": "done",
+                "confidence": confidence,
+                "cached": cached,
+                "prompt_tokens": prompt_tokens,
+                "timings": timings
             }
+
+        try:
+            embed_start = time.time()
+            with tracing.span("rag.embed"):
+                query_embedding = await self.embed_batcher.embed(question)
+            timings["embed"] = round(time.time() - embed_start, 3)
+            metrics.observe("rag_stage_seconds", timings["embed"], stage="embed")
+
+            if self.out_of_scope(query_embedding):
+                timings["time_to_first_token"] = round(time.time() - pipeline_start, 3)
+                yield {"type": "token", "text": REFUSAL}
+                yield done(0.0)
+                return
+
+            index_version = self.store.index_version()
+            cached = self.cache.lookup(query_embedding, index_version)
+            if cached is not None:
+                logging.info("[RAG] Cache hit")
+                metrics.inc("rag_cache_hits_total")
+                timings["time_to_first_token"] = round(time.time() - pipeline_start, 3)
+                yield {"type": "token", "text": cached["answer"]}
+                yield done(cached["confidence"], cached=True)
+                return
+
+            retrieval_start = time.time()
+            prepared = await self._prepare_context(
+                question, top_k, query_embedding=query_embedding
+            )
+            timings["retrieval"] = round(time.time() - retrieval_start, 3)
+
+            if prepared is None:
+                timings["time_to_first_token"] = round(time.time() - pipeline_start, 3)
+                yield {"type": "token", "text": REFUSAL}
+                yield done(0.0)
+                return
+
+            context, confidence, prompt_tokens = prepared
+
+            generation_start = time.time()
+            parts = []
+
+            async for piece in self.generator.generate_stream(question, context):
+                if not parts:
+                    timings["time_to_first_token"] = round(time.time() - pipeline_start, 3)
+                    metrics.observe(
+                        "rag_stage_seconds", timings["time_to_first_token"], stage="time_to_first_token"
+                    )
+                    logging.info(
+                        f"[RAG] Time to first token: {timings['time_to_first_token']:.2f}s"
+                    )
+
+                parts.append(piece)
+                yield {"type": "token", "text": piece}
+
+            timings["generation"] = round(time.time() - generation_start, 3)
+
+            # Recorded after the fact: a span must not stay open across yields
+            tracing.add_span(
+                "generator.generate_stream",
+                int(generation_start * 1e9),
+                time.time_ns(),
+                pieces=len(parts)
+            )
+            metrics.observe("rag_stage_seconds", timings["generation"], stage="generate")
+
+            answer = "".join(parts).strip()
+
+            if confidence > 0.85 and answer:
+                self.cache.add(
+                    question,
+                    query_embedding,
+                    {"answer": answer, "confidence": confidence},
+                    index_version
+                )
+
+            metrics.observe("rag_stage_seconds", time.time() - pipeline_start, stage="total")
+            logging.info(
+                f"[RAG] Total streaming pipeline time: {time.time() - pipeline_start:.2f}s"
+            )
+
+            yield done(confidence, prompt_tokens=prompt_tokens)
+
+        except Exception as e:
+            logging.error(f"[RAG STREAM ERROR] {str(e)}")
+            metrics.inc("rag_errors_total", stage="stream")
+            yield {"type": "error", "text": REFUSAL}
+            yield done(0.0)
@@ -0,0 +1,158 @@
+import asyncio
+import contextvars
+import logging
+import time
+from typing import List, Optional
+
+logging.basicConfig(level=logging.INFO)
+
+
+class EmbeddingBatcher:
+    """
+    Dynamic micro-batcher for query embeddings.
+
+    Concurrent embed() calls are queued; a background task collects them
+    for up to max_wait_ms or until max_batch_size items are waiting, runs
+    one batched encode on the retriever's executor, and hands each caller
+    its own vector.
+    """
+
+    def __init__(
+        self,
+        retriever,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0
+    ):
+        self.retriever = retriever
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._encoding = set()
+        self._loop = None
+
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+
+    # ---------------------------
+    # Public API
+    # ---------------------------
+    async def embed(self, query: str) -> List[float]:
+        if self.max_batch_size <= 1:
+            return await self.retriever.embed(query)
+
+        self._ensure_worker()
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((query, future))
+
+        return await future
+
+    def shutdown(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+
+        for task in list(self._encoding):
+            task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch
+        }
+
+    # ---------------------------
+    # Batching loop
+    # ---------------------------
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+
+        # Queue and worker are bound to the loop that created them
+        if self._worker is None or self._loop is not loop or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+
+            # Started in an empty context: batches serve many requests and
+            # must not be traced as part of whichever one arrived first
+            self._worker = contextvars.Context().run(loop.create_task, self._collect())
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        batch = []
+
+        try:
+            while True:
+                batch = [await queue.get()]
+                deadline = loop.time() + self.max_wait_ms / 1000
+
+                while len(batch) < self.max_batch_size:
+                    # Take whatever is already queued before waiting
+                    if not queue.empty():
+                        batch.append(queue.get_nowait())
+                        continue
+
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+
+                    try:
+                        batch.append(
+                            await asyncio.wait_for(queue.get(), timeout=remaining)
+                        )
+                    except asyncio.TimeoutError:
+                        break
+
+                # Encode in the background so the next batch can start
+                # filling; the set keeps a reference until it finishes
+                task = loop.create_task(self._encode(batch))
+                self._encoding.add(task)
+                task.add_done_callback(self._encoding.discard)
+                batch = []
+
+        finally:
+            # Shut down: callers still waiting would otherwise hang forever
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            self._cancel(batch)
+
+    def _cancel(self, batch: list):
+        for _, future in batch:
+            if not future.done():
+                future.cancel()
+
+    async def _encode(self, batch: list):
+        start_time = time.time()
+        texts = [query for query, _ in batch]
+
+        try:
+            vectors = await self.retriever.embed_batch(texts)
+        except asyncio.CancelledError:
+            self._cancel(batch)
+            raise
+        except Exception as e:
+            logging.error(f"[EmbeddingBatcher ERROR] {str(e)}")
+            vectors = []
+
+        # embed_texts returns [] on failure; callers then see [] as with embed_query
+        if len(vectors) != len(batch):
+            vectors = [[] for _ in batch]
+
+        for (_, future), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
+
+        self.batches += 1
+        self.items += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+
+        logging.info(
+            f"[EmbeddingBatcher] Encoded batch of {len(batch)} in {time.time() - start_time:.3f}s"
+        )
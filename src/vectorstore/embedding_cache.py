@@ -0,0 +1,250 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding cache keyed by (model name, text hash).
+
+    Vectors live in an append-only float32 file read through a memory
+    map; a small SQLite index maps each key to its row. Only texts that
+    are not yet cached are sent to the model.
+    """
+
+    def __init__(self, cache_dir: str, model_name: str):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self.model_name = model_name
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        self.vectors_path = self.cache_dir / f"{slug}.f32"
+
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(
+            str(self.cache_dir / "index.sqlite"),
+            check_same_thread=False
+        )
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "model TEXT NOT NULL, text_hash TEXT NOT NULL, row INTEGER NOT NULL, "
+            "PRIMARY KEY (model, text_hash))"
+        )
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS models (model TEXT PRIMARY KEY, dim INTEGER NOT NULL)"
+        )
+        self.db.commit()
+
+        found = self.db.execute(
+            "SELECT dim FROM models WHERE model = ?", (model_name,)
+        ).fetchone()
+        self.dim: Optional[int] = found[0] if found else None
+
+        self._vectors: Optional[np.memmap] = None
+        self._mapped_rows = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    # ---------------------------
+    # Public API
+    # ---------------------------
+    def embed(
+        self,
+        texts: List[str],
+        embed_fn: Callable[[List[str]], List[List[float]]]
+    ) -> List[List[float]]:
+        """
+        Same contract as Embedder.embed_texts: one vector per text, or []
+        if the model call fails.
+        """
+        start_time = time.time()
+
+        hashes = [text_hash(text) for text in texts]
+
+        with self._lock:
+            rows = self._lookup(set(hashes))
+
+        # Embed each missing text once, even if it appears several times
+        missing = {}
+        for text, h in zip(texts, hashes):
+            if h not in rows and h not in missing:
+                missing[h] = text
+
+        hit_count = sum(1 for h in hashes if h in rows)
+        self.hits += hit_count
+        self.misses += len(hashes) - hit_count
+
+        new_vectors = {}
+        if missing:
+            computed = embed_fn(list(missing.values()))
+
+            if len(computed) != len(missing):
+                return []
+
+            computed = np.asarray(computed, dtype=np.float32)
+
+            with self._lock:
+                self._append(list(missing.keys()), computed)
+
+            new_vectors = dict(zip(missing.keys(), computed))
+
+        with self._lock:
+            # Re-resolve rows: a concurrent compaction may have moved them
+            rows = self._lookup(set(hashes) - set(new_vectors))
+            vectors = self._mapped()
+            result = [
+                (vectors[rows[h]] if h in rows else new_vectors[h]).tolist()
+                for h in hashes
+            ]
+
+        logging.info(
+            f"[EmbeddingCache] {hit_count} hits, {len(missing)} embedded "
+            f"in {time.time() - start_time:.2f}s"
+        )
+
+        return result
+
+    def compact(self, keep_texts: Optional[Iterable[str]] = None) -> dict:
+        """
+        Rewrite the vector file without dead rows. If keep_texts is given,
+        entries for any other text are dropped as well.
+        """
+        start_time = time.time()
+
+        with self._lock:
+            entries = self.db.execute(
+                "SELECT text_hash, row FROM embeddings WHERE model = ? ORDER BY row",
+                (self.model_name,)
+            ).fetchall()
+
+            if keep_texts is not None:
+                keep = {text_hash(text) for text in keep_texts}
+                entries = [(h, row) for h, row in entries if h in keep]
+
+            before = self._row_count()
+
+            if self.dim is not None and entries:
+                vectors = self._mapped()
+                compacted = np.ascontiguousarray(vectors[[row for _, row in entries]])
+            else:
+                compacted = np.zeros((0, self.dim or 0), dtype=np.float32)
+
+            # Write-then-rename so readers never see a partial file
+            self._vectors = None
+            tmp_path = self.vectors_path.with_suffix(".tmp")
+            compacted.tofile(tmp_path)
+            os.replace(tmp_path, self.vectors_path)
+
+            self.db.execute("DELETE FROM embeddings WHERE model = ?", (self.model_name,))
+            self.db.executemany(
+                "INSERT INTO embeddings (model, text_hash, row) VALUES (?, ?, ?)",
+                [(self.model_name, h, i) for i, (h, _) in enumerate(entries)]
+            )
+            self.db.commit()
+
+        report = {
+            "rows_before": before,
+            "rows_after": len(entries),
+            "seconds": round(time.time() - start_time, 3)
+        }
+
+        logging.info(
+            f"[EmbeddingCache] Compacted {before} -> {len(entries)} rows "
+            f"in {report['seconds']:.2f}s"
+        )
+
+        return report
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+
+        with self._lock:
+            entries = self.db.execute(
+                "SELECT COUNT(*) FROM embeddings WHERE model = ?", (self.model_name,)
+            ).fetchone()[0]
+            rows = self._row_count()
+
+        return {
+            "model": self.model_name,
+            "entries": entries,
+            "rows": rows,
+            "bytes": self.vectors_path.stat().st_size if self.vectors_path.exists() else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+    # ---------------------------
+    # Internals (caller holds the lock)
+    # ---------------------------
+    def _lookup(self, hashes: set) -> dict:
+        rows = {}
+        hashes = list(hashes)
+
+        # Stay under SQLite's bound-parameter limit
+        for i in range(0, len(hashes), 500):
+            batch = hashes[i:i + 500]
+            placeholders = ",".join("?" * len(batch))
+
+            for h, row in self.db.execute(
+                f"SELECT text_hash, row FROM embeddings "
+                f"WHERE model = ? AND text_hash IN ({placeholders})",
+                [self.model_name, *batch]
+            ):
+                rows[h] = row
+
+        return rows
+
+    def _row_count(self) -> int:
+        if self.dim is None or not self.vectors_path.exists():
+            return 0
+        return self.vectors_path.stat().st_size // (self.dim * 4)
+
+    def _mapped(self) -> np.ndarray:
+        rows = self._row_count()
+
+        # Re-map after the file has grown
+        if self._vectors is None or rows != self._mapped_rows:
+            if rows == 0:
+                self._vectors = np.zeros((0, self.dim or 0), dtype=np.float32)
+            else:
+                self._vectors = np.memmap(
+                    self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim)
+                )
+            self._mapped_rows = rows
+
+        return self._vectors
+
+    def _append(self, hashes: List[str], vectors: np.ndarray):
+        if self.dim is None:
+            self.dim = int(vectors.shape[1])
+            self.db.execute(
+                "INSERT OR REPLACE INTO models (model, dim) VALUES (?, ?)",
+                (self.model_name, self.dim)
+            )
+
+        first_row = self._row_count()
+
+        with open(self.vectors_path, "ab") as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+
+        self.db.executemany(
+            "INSERT OR REPLACE INTO embeddings (model, text_hash, row) VALUES (?, ?, ?)",
+            [(self.model_name, h, first_row + i) for i, h in enumerate(hashes)]
+        )
+        self.db.commit()
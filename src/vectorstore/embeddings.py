@@ -1,28 +1,76 @@
-from sentence_transformers import SentenceTransformer
-from typing import List
-import torch
+from typing import List, Optional
 import logging
+import os
 import time
 
+from src.monitoring.tracing import traced
+
 logging.basicConfig(level=logging.INFO)
 
+BACKENDS = ("torch", "onnx")
+
 
 class Embedder:
-    def __init__(self, model_name: str = "BAAI/bge-small-en-v1.5"):
+    def __init__(
+        self,
+        model_name: str = "BAAI/bge-small-en-v1.5",
+        backend: Optional[str] = None,
+        onnx_dir: Optional[str] = None,
+        onnx_quantize: Optional[bool] = None,
+        onnx_threads: Optional[int] = None
+    ):
         start_time = time.time()
 
-        # Auto device detection
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        logging.info(f"[Embedder] Using device: {self.device}")
+        self.model_name = model_name
+
+        # Falls back to env so process-pool workers pick the same backend
+        self.backend = backend or os.getenv("RAG_EMBEDDING_BACKEND", "torch")
+
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown embedding backend: {self.backend}")
+
+        if self.backend == "onnx":
+            from src.vectorstore.onnx_embedder import OnnxEncoder
+
+            if onnx_quantize is None:
+                onnx_quantize = os.getenv("RAG_ONNX_QUANTIZE", "1") == "1"
+
+            threads = onnx_threads or int(os.getenv("RAG_ONNX_THREADS", "0"))
 
-        self.model = SentenceTransformer(model_name, device=self.device)
+            self.device = "cpu"
+            self.model = OnnxEncoder(
+                model_name,
+                cache_dir=onnx_dir or os.getenv("RAG_ONNX_DIR", "onnx_models"),
+                quantize=onnx_quantize,
+                intra_op_threads=threads or None
+            )
+
+        else:
+            import torch
+            from sentence_transformers import SentenceTransformer
+
+            # Auto device detection
+            self.device = "cuda" if torch.cuda.is_available() else "cpu"
+
+            self.model = SentenceTransformer(model_name, device=self.device)
 
+        # Vectors differ slightly between backends, so cached embeddings
+        # are keyed on the backend variant as well as the model
+        self.cache_key = model_name
+        if self.backend == "onnx":
+            self.cache_key += "@onnx-int8" if onnx_quantize else "@onnx"
+
+        logging.info(f"[Embedder] Using {self.backend} backend on {self.device}")
         logging.info(
             f"[Embedder] Model loaded in {time.time() - start_time:.2f}s"
         )
 
+    @traced("embedder.embed_texts")
     def embed_texts(self, texts: List[str]) -> List[List[float]]:
         try:
+            if self.backend == "onnx":
+                return self.model.encode(texts, batch_size=32).tolist()
+
             embeddings = self.model.encode(
                 texts,
                 batch_size=32,
@@ -34,8 +82,12 @@ class Embedder:
             logging.error(f"[Embedder ERROR] {str(e)}")
             return []
 
+    @traced("embedder.embed_query")
     def embed_query(self, query: str) -> List[float]:
         try:
+            if self.backend == "onnx":
+                return self.model.encode([query])[0].tolist()
+
             embedding = self.model.encode(
                 query,
                 normalize_embeddings=True
@@ -0,0 +1,547 @@
+import json
+import logging
+import os
+import struct
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.vectorstore.quantization import CompactVectors
+
+logging.basicConfig(level=logging.INFO)
+
+VECTORS_FILE = "embeddings.npy"
+METADATA_FILE = "metadata.json"
+
+# Fixed .npy header size, so the row count can be rewritten in place as
+# rows are appended
+HEADER_BYTES = 128
+
+
+def npy_header(rows: int, dim: int) -> bytes:
+    header = repr({"descr": "<f4", "fortran_order": False, "shape": (rows, dim)})
+    header = header.ljust(HEADER_BYTES - 11) + "\n"
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header.encode("latin1")
+
+
+# ---------------------------
+# Metadata filters (Chroma "where" syntax)
+# ---------------------------
+_OPERATORS = {"$eq", "$ne", "$in", "$nin", "$gt", "$gte", "$lt", "$lte"}
+
+
+def _match_value(value, condition) -> bool:
+    if not isinstance(condition, dict):
+        return value == condition
+
+    for op, operand in condition.items():
+        if op not in _OPERATORS:
+            raise ValueError(f"Unsupported filter operator: {op}")
+
+        if op == "$eq":
+            ok = value == operand
+        elif op == "$ne":
+            ok = value != operand
+        elif op == "$in":
+            ok = value in operand
+        elif op == "$nin":
+            ok = value not in operand
+        elif value is None:
+            # Range operators never match a missing field
+            return False
+        elif op == "$gt":
+            ok = value > operand
+        elif op == "$gte":
+            ok = value >= operand
+        elif op == "$lt":
+            ok = value < operand
+        else:
+            ok = value <= operand
+
+        if not ok:
+            return False
+
+    return True
+
+
+def matches_filter(metadata: dict, where: Optional[dict]) -> bool:
+    if not where:
+        return True
+
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_filter(metadata, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_filter(metadata, clause) for clause in condition):
+                return False
+        elif not _match_value(metadata.get(key), condition):
+            return False
+
+    return True
+
+
+class FlatIndex:
+    """
+    Exact in-process vector index with the subset of the Chroma
+    collection API that VectorStore uses.
+
+    Vectors are L2-normalized float32 rows in a .npy file that is opened
+    memory-mapped and grown in place as rows are added; ids, documents
+    and metadata live in a JSON sidecar, whose row count is authoritative.
+    A query is one matrix-vector product plus argpartition, which for a
+    few thousand chunks is faster than HNSW and has perfect recall.
+    Distances are cosine distances (1 - similarity), as with Chroma's
+    "cosine" space.
+
+    With a compact precision (float16/int8) and/or reduced dims, queries
+    first score a small in-memory CompactVectors copy (encoded on the
+    first query after a write), then re-score the best rescore_factor * k
+    rows against the full-precision memmap so the returned order and
+    distances are exact.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        precision: str = "float32",
+        dims: Optional[int] = None,
+        reduction: str = "pca",
+        rescore_factor: int = 4
+    ):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        self.vectors_path = self.path / VECTORS_FILE
+        self.metadata_path = self.path / METADATA_FILE
+
+        self._lock = threading.Lock()
+        self._loaded_mtime = None
+        self._bulk = 0
+        self._dirty = False
+
+        self.ids: List[str] = []
+        self.documents: List[str] = []
+        self.metadatas: List[dict] = []
+        self.vectors = np.zeros((0, 0), dtype=np.float32)
+        self._rows: Dict[str, int] = {}
+        self.generation: Optional[str] = None
+
+        self.rescore_factor = max(1, rescore_factor)
+        self._compact_config = (precision, dims, reduction)
+        self.compact: Optional[CompactVectors] = None
+        self.compact_enabled = precision != "float32" or bool(dims)
+
+        # Validate the configuration up front
+        CompactVectors(precision, dims, reduction)
+
+        self._reload()
+
+    # ---------------------------
+    # Persistence
+    # ---------------------------
+    def _reload(self):
+        """
+        (Re)load from disk if another process has rewritten the index.
+        """
+        if self._bulk:
+            # Mid-bulk the in-memory state is ahead of the sidecar
+            return
+
+        try:
+            mtime = self.metadata_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return
+
+        if mtime == self._loaded_mtime:
+            return
+
+        sidecar = json.loads(self.metadata_path.read_text())
+
+        self.ids = sidecar["ids"]
+        self.documents = sidecar["documents"]
+        self.metadatas = sidecar["metadatas"]
+        self._rows = {chunk_id: row for row, chunk_id in enumerate(self.ids)}
+
+        # Indexes written before generations existed fall back to the mtime
+        self.generation = sidecar.get("generation") or str(mtime)
+
+        self._map_vectors()
+
+        # Encoded lazily by the first query
+        self.compact = None
+
+        self._loaded_mtime = mtime
+
+    def _map_vectors(self):
+        # The file may hold rows appended after the sidecar was written
+        if self.ids:
+            self.vectors = np.load(self.vectors_path, mmap_mode="r")[:len(self.ids)]
+        else:
+            self.vectors = np.zeros((0, 0), dtype=np.float32)
+
+    def _ensure_compact(self):
+        """
+        Encode (or load the persisted encoding of) the current generation
+        once, on the first query after a write rather than on every write.
+        """
+        if self.compact is None and self.compact_enabled and self.ids and not self._bulk:
+            self.compact = self._load_compact()
+
+    def _load_compact(self) -> CompactVectors:
+        compact = CompactVectors(*self._compact_config)
+        compact_path = self.path / f"compact-{compact.key}.npz"
+
+        # Reuse the encoding built for this generation of the index,
+        # otherwise encode once and persist it for the next process
+        if compact.load(compact_path, self.generation):
+            return compact
+
+        compact.fit(self.vectors)
+
+        try:
+            compact.save(compact_path, self.generation)
+        except Exception as e:
+            logging.error(f"[FlatIndex COMPACT SAVE ERROR] {str(e)}")
+
+        logging.info(
+            f"[FlatIndex] Encoded {len(self.ids)} vectors as {compact.key} "
+            f"({compact.nbytes / 1e6:.1f} MB vs {self.vectors.nbytes / 1e6:.1f} MB float32)"
+        )
+
+        return compact
+
+    def _write_vectors(self, vectors: np.ndarray):
+        """
+        Replace the whole vectors file (deletes and resets only).
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        rows, dim = vectors.shape if vectors.ndim == 2 else (0, 0)
+
+        tmp_vectors = self.path / f"{VECTORS_FILE}.tmp"
+        with open(tmp_vectors, "wb") as f:
+            f.write(npy_header(rows, dim))
+            f.write(vectors.tobytes())
+        os.replace(tmp_vectors, self.vectors_path)
+
+    def _write_rows(self, start: int, vectors: np.ndarray, updates: Dict[int, np.ndarray]):
+        """
+        Append rows at `start` (dropping anything past it, e.g. rows of an
+        interrupted bulk write) and overwrite updated rows in place, so a
+        batch costs I/O proportional to its own size.
+        """
+        dim = vectors.shape[1]
+
+        if start == 0 or not self.vectors_path.exists():
+            self._write_vectors(vectors)
+            return
+
+        with open(self.vectors_path, "r+b") as f:
+            np.lib.format.read_magic(f)
+            shape, _, _ = np.lib.format.read_array_header_1_0(f)
+            offset = f.tell()
+
+            if shape[1] != dim:
+                raise ValueError(f"Embedding dimension {dim} does not match index ({shape[1]})")
+
+            if offset != HEADER_BYTES:
+                # Written by np.save: rewrite once with a growable header
+                f.close()
+                existing = np.array(np.load(self.vectors_path, mmap_mode="r")[:start])
+                for row, vector in updates.items():
+                    existing[row] = vector
+                self._write_vectors(np.vstack([existing, vectors]))
+                return
+
+            row_bytes = dim * 4
+
+            for row, vector in updates.items():
+                f.seek(offset + row * row_bytes)
+                f.write(np.ascontiguousarray(vector, dtype=np.float32).tobytes())
+
+            f.seek(offset + start * row_bytes)
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+            f.truncate()
+
+            f.seek(0)
+            f.write(npy_header(start + len(vectors), dim))
+
+    def _write_sidecar(self):
+        # Vectors first, then the sidecar: readers key off the sidecar mtime
+        self.generation = uuid.uuid4().hex
+
+        tmp_metadata = self.metadata_path.with_suffix(".tmp")
+        tmp_metadata.write_text(json.dumps({
+            "generation": self.generation,
+            "ids": self.ids,
+            "documents": self.documents,
+            "metadatas": self.metadatas
+        }))
+        os.replace(tmp_metadata, self.metadata_path)
+
+        self._loaded_mtime = self.metadata_path.stat().st_mtime_ns
+        self._dirty = False
+
+    @contextmanager
+    def bulk(self):
+        """
+        Group many add/upsert calls: vectors are still appended batch by
+        batch, but the sidecar is written once at the end instead of
+        after every batch. Other processes see the writes when the block
+        exits.
+        """
+        with self._lock:
+            self._reload()
+            self._bulk += 1
+
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._bulk -= 1
+
+                if not self._bulk and self._dirty:
+                    self._write_sidecar()
+
+    # ---------------------------
+    # Writes
+    # ---------------------------
+    def add(self, documents, embeddings, ids, metadatas=None):
+        with self._lock:
+            self._reload()
+
+            duplicates = [chunk_id for chunk_id in ids if chunk_id in self._rows]
+            if duplicates or len(set(ids)) != len(ids):
+                raise ValueError(f"Duplicate ids: {duplicates[:5]}")
+
+            self._write(documents, embeddings, ids, metadatas)
+
+    def upsert(self, documents, embeddings, ids, metadatas=None):
+        with self._lock:
+            self._reload()
+            self._write(documents, embeddings, ids, metadatas)
+
+    def _write(self, documents, embeddings, ids, metadatas):
+        new_vectors = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(new_vectors, axis=1, keepdims=True)
+        new_vectors = new_vectors / np.maximum(norms, 1e-12)
+
+        metadatas = metadatas or [{} for _ in ids]
+
+        base = len(self.ids)
+        appended = []
+        updates = {}
+        batch_rows = {}
+
+        for i, chunk_id in enumerate(ids):
+            row = self._rows.get(chunk_id, batch_rows.get(chunk_id))
+
+            if row is None:
+                batch_rows[chunk_id] = base + len(appended)
+                appended.append(i)
+            elif row >= base:
+                # Repeated within this batch: the last one wins
+                appended[row - base] = i
+            else:
+                updates[row] = i
+
+        # Disk first, so a failed write leaves the loaded index intact
+        self._write_rows(
+            base,
+            new_vectors[appended].reshape(len(appended), new_vectors.shape[1]),
+            {row: new_vectors[i] for row, i in updates.items()}
+        )
+
+        for row, i in updates.items():
+            self.documents[row] = documents[i]
+            self.metadatas[row] = metadatas[i]
+
+        for chunk_id, row in batch_rows.items():
+            i = appended[row - base]
+            self._rows[chunk_id] = row
+            self.ids.append(chunk_id)
+            self.documents.append(documents[i])
+            self.metadatas.append(metadatas[i])
+
+        self._map_vectors()
+        self.compact = None
+        self._dirty = True
+
+        if not self._bulk:
+            self._write_sidecar()
+
+    def delete(self, ids: List[str]):
+        with self._lock:
+            self._reload()
+
+            drop = {self._rows[chunk_id] for chunk_id in ids if chunk_id in self._rows}
+            if not drop:
+                return
+
+            keep = [row for row in range(len(self.ids)) if row not in drop]
+
+            self._write_vectors(
+                np.array(self.vectors[keep]) if keep else np.zeros((0, 0), dtype=np.float32)
+            )
+            self._replace_rows(
+                [self.ids[row] for row in keep],
+                [self.documents[row] for row in keep],
+                [self.metadatas[row] for row in keep]
+            )
+
+    def reset(self):
+        with self._lock:
+            self._write_vectors(np.zeros((0, 0), dtype=np.float32))
+            self._replace_rows([], [], [])
+
+    def _replace_rows(self, ids: List[str], documents: List[str], metadatas: List[dict]):
+        # New lists: queries holding the old ones keep a consistent view
+        self.ids = ids
+        self.documents = documents
+        self.metadatas = metadatas
+        self._rows = {chunk_id: row for row, chunk_id in enumerate(ids)}
+
+        self._map_vectors()
+        self.compact = None
+
+        # Row numbers changed: written now even inside bulk()
+        self._write_sidecar()
+
+    # ---------------------------
+    # Reads
+    # ---------------------------
+    def count(self) -> int:
+        with self._lock:
+            self._reload()
+            return len(self.ids)
+
+    def get(self, ids: Optional[List[str]] = None, where: Optional[dict] = None, include=None):
+        with self._lock:
+            self._reload()
+
+            if ids is None:
+                rows = range(len(self.ids))
+            else:
+                rows = [self._rows[chunk_id] for chunk_id in ids if chunk_id in self._rows]
+
+            rows = [row for row in rows if matches_filter(self.metadatas[row], where)]
+
+            result = {
+                "ids": [self.ids[row] for row in rows],
+                "documents": [self.documents[row] for row in rows],
+                "metadatas": [self.metadatas[row] for row in rows]
+            }
+
+            if include and "embeddings" in include:
+                result["embeddings"] = np.array(self.vectors[rows]) if rows else []
+
+            return result
+
+    def query(self, query_embeddings, n_results: int = 10, where: Optional[dict] = None, **kwargs):
+        with self._lock:
+            self._reload()
+            self._ensure_compact()
+            vectors, compact = self.vectors, self.compact
+            ids, documents, metadatas = self.ids, self.documents, self.metadatas
+
+        result = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+
+        if where:
+            candidates = np.array(
+                [row for row in range(len(vectors)) if matches_filter(metadatas[row], where)],
+                dtype=np.int64
+            )
+        else:
+            candidates = None
+
+        for query_embedding in query_embeddings:
+            if compact is not None:
+                rows, distances = self._top_k_rescored(
+                    vectors, compact, query_embedding, n_results, candidates
+                )
+            else:
+                rows, distances = self._top_k(vectors, query_embedding, n_results, candidates)
+
+            result["ids"].append([ids[row] for row in rows])
+            result["documents"].append([documents[row] for row in rows])
+            result["metadatas"].append([metadatas[row] for row in rows])
+            result["distances"].append(distances)
+
+        return result
+
+    @staticmethod
+    def _top_k(vectors, query_embedding, k: int, candidates=None):
+        if len(vectors) == 0 or k <= 0:
+            return [], []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+
+        if candidates is None:
+            scores = vectors @ query
+            row_ids = None
+        else:
+            if len(candidates) == 0:
+                return [], []
+            scores = vectors[candidates] @ query
+            row_ids = candidates
+
+        k = min(k, len(scores))
+
+        # O(n) partial selection, then sort only the k winners
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        rows = (row_ids[top] if row_ids is not None else top).tolist()
+        distances = (1.0 - scores[top]).tolist()
+
+        return rows, distances
+
+    def _top_k_rescored(self, vectors, compact, query_embedding, k: int, candidates=None):
+        if len(vectors) == 0 or k <= 0:
+            return [], []
+
+        if candidates is not None and len(candidates) == 0:
+            return [], []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+
+        # Approximate pass over the compact vectors
+        scores = compact.score(query, candidates)
+        shortlist_size = min(len(scores), k * self.rescore_factor)
+
+        shortlist = np.argpartition(-scores, shortlist_size - 1)[:shortlist_size]
+        if candidates is not None:
+            shortlist = candidates[shortlist]
+
+        # Exact pass over the shortlisted full-precision rows only
+        shortlist = np.sort(shortlist)
+        exact = np.asarray(vectors[shortlist]) @ query
+
+        k = min(k, len(exact))
+        top = np.argpartition(-exact, k - 1)[:k]
+        top = top[np.argsort(-exact[top])]
+
+        return shortlist[top].tolist(), (1.0 - exact[top]).tolist()
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._reload()
+
+            precision, dims, reduction = self._compact_config
+
+            return {
+                "rows": len(self.ids),
+                "dim": int(self.vectors.shape[1]) if len(self.ids) else 0,
+                "precision": precision,
+                "reduced_dims": dims,
+                "reduction": reduction if dims else None,
+                "rescore_factor": self.rescore_factor if self.compact_enabled else None,
+                "full_bytes": int(self.vectors.nbytes),
+                "compact_bytes": self.compact.nbytes if self.compact is not None else None
+            }
@@ -0,0 +1,171 @@
+import json
+import logging
+import os
+import re
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+
+CONFIG_FILE = "embedder_config.json"
+
+
+def default_intra_op_threads() -> int:
+    """
+    Cores per retrieval worker. Up to RAG_RETRIEVAL_WORKERS encodes run
+    at once (threads sharing one session, or one session per process),
+    and each would otherwise start a thread per core.
+    """
+    workers = max(1, int(os.getenv("RAG_RETRIEVAL_WORKERS", "4")))
+    return max(1, (os.cpu_count() or 1) // workers)
+
+
+def export_onnx(model_name: str, export_dir: Path, quantize: bool = True):
+    """
+    One-time export of a SentenceTransformer model to ONNX, plus an
+    optional dynamically int8-quantized copy. Needs torch and
+    sentence-transformers; the exported model does not.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    start_time = time.time()
+    export_dir.mkdir(parents=True, exist_ok=True)
+
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer = model[0].auto_model.eval()
+    tokenizer = model.tokenizer
+
+    # Pooling and sequence length come from the SentenceTransformer config
+    pooling = "cls" if model[1].get_pooling_mode_str() == "cls" else "mean"
+    max_length = model.get_max_seq_length() or 512
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer,
+            tuple(sample[name] for name in input_names),
+            str(export_dir / "model.onnx"),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14
+        )
+
+    tokenizer.save_pretrained(str(export_dir))
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(
+            str(export_dir / "model.onnx"),
+            str(export_dir / "model.int8.onnx"),
+            weight_type=QuantType.QInt8
+        )
+
+    (export_dir / CONFIG_FILE).write_text(json.dumps({
+        "model_name": model_name,
+        "pooling": pooling,
+        "max_length": max_length,
+        "input_names": input_names
+    }, indent=2))
+
+    logging.info(
+        f"[OnnxEncoder] Exported {model_name} to {export_dir} "
+        f"in {time.time() - start_time:.2f}s"
+    )
+
+
+class OnnxEncoder:
+    """
+    Sentence embeddings through ONNX Runtime: tokenizers for input,
+    CLS or mean pooling and L2 normalization done in NumPy, matching
+    SentenceTransformer.encode(..., normalize_embeddings=True).
+
+    The model is exported on first use to cache_dir/<model slug>/.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        cache_dir: str = "onnx_models",
+        quantize: bool = True,
+        intra_op_threads: Optional[int] = None
+    ):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        start_time = time.time()
+
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        self.export_dir = Path(cache_dir) / slug
+
+        model_file = "model.int8.onnx" if quantize else "model.onnx"
+
+        if not (self.export_dir / model_file).exists() or not (self.export_dir / CONFIG_FILE).exists():
+            export_onnx(model_name, self.export_dir, quantize=quantize)
+
+        config = json.loads((self.export_dir / CONFIG_FILE).read_text())
+        self.pooling = config["pooling"]
+        self.input_names = config["input_names"]
+
+        self.tokenizer = Tokenizer.from_file(str(self.export_dir / "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=config["max_length"])
+        self.tokenizer.enable_padding()
+
+        # Latency-oriented session: each encode gets its share of the cores
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads or default_intra_op_threads()
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        self.session = ort.InferenceSession(
+            str(self.export_dir / model_file),
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+
+        self.quantized = quantize
+        self.intra_op_threads = options.intra_op_num_threads
+
+        logging.info(
+            f"[OnnxEncoder] Loaded {model_file} ({self.intra_op_threads} threads) "
+            f"in {time.time() - start_time:.2f}s"
+        )
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        outputs = []
+
+        for i in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(texts[i:i + batch_size])
+
+            feeds = {
+                "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+                "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+                "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64)
+            }
+            feeds = {name: feeds[name] for name in self.input_names}
+
+            hidden = self.session.run(None, feeds)[0]
+
+            if self.pooling == "cls":
+                pooled = hidden[:, 0]
+            else:
+                mask = feeds["attention_mask"][..., None].astype(np.float32)
+                pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+
+            norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+            outputs.append(pooled / np.maximum(norms, 1e-12))
+
+        if not outputs:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        return np.concatenate(outputs).astype(np.float32)
@@ -0,0 +1,154 @@
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+
+PRECISIONS = ("float32", "float16", "int8")
+REDUCTIONS = ("pca", "truncate")
+
+# Rows dequantized per step while scoring, to bound temporary memory
+SCORE_BLOCK_ROWS = 8192
+
+
+class CompactVectors:
+    """
+    Compact copy of an embedding matrix used for the first, approximate
+    scoring pass of FlatIndex.
+
+    - precision: float16, or int8 with one scale per vector
+    - dims: optional dimension reduction, either PCA fitted on the corpus
+      or Matryoshka-style truncation to the leading dimensions
+
+    Reduced vectors are re-normalized, so scores stay cosine similarities.
+    """
+
+    def __init__(self, precision: str = "float32", dims: Optional[int] = None, reduction: str = "pca"):
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision: {precision}")
+        if reduction not in REDUCTIONS:
+            raise ValueError(f"Unknown reduction: {reduction}")
+
+        self.precision = precision
+        self.dims = dims
+        self.reduction = reduction
+
+        self.mean: Optional[np.ndarray] = None
+        self.components: Optional[np.ndarray] = None
+        self.codes: Optional[np.ndarray] = None
+        self.scales: Optional[np.ndarray] = None
+
+    @property
+    def key(self) -> str:
+        reduced = f"-{self.reduction}{self.dims}" if self.dims else ""
+        return f"{self.precision}{reduced}"
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.codes, self.scales, self.mean, self.components)
+        return sum(a.nbytes for a in arrays if a is not None)
+
+    # ---------------------------
+    # Encoding
+    # ---------------------------
+    def fit(self, vectors: np.ndarray) -> "CompactVectors":
+        vectors = np.asarray(vectors, dtype=np.float32)
+
+        if self.dims and self.dims < vectors.shape[1] and self.reduction == "pca":
+            self.mean = vectors.mean(axis=0)
+
+            # Top principal directions of the centred corpus
+            _, _, vt = np.linalg.svd(vectors - self.mean, full_matrices=False)
+            self.components = np.ascontiguousarray(vt[:self.dims].T, dtype=np.float32)
+
+        reduced = self.project(vectors)
+
+        if self.precision == "int8":
+            self.scales = np.maximum(np.abs(reduced).max(axis=1), 1e-12) / 127.0
+            self.codes = np.rint(reduced / self.scales[:, None]).astype(np.int8)
+            self.scales = self.scales.astype(np.float32)
+        else:
+            self.codes = reduced.astype(self.precision)
+
+        return self
+
+    def project(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+
+        if self.components is not None:
+            vectors = (vectors - self.mean) @ self.components
+        elif self.dims:
+            vectors = vectors[..., :self.dims]
+
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    # ---------------------------
+    # Scoring
+    # ---------------------------
+    def score(self, query: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Approximate cosine similarity of query to every stored row (or to
+        the given rows only).
+        """
+        query = self.project(query).astype(np.float32)
+
+        codes = self.codes if rows is None else self.codes[rows]
+        scales = None
+        if self.scales is not None:
+            scales = self.scales if rows is None else self.scales[rows]
+
+        scores = np.empty(len(codes), dtype=np.float32)
+
+        for start in range(0, len(codes), SCORE_BLOCK_ROWS):
+            end = start + SCORE_BLOCK_ROWS
+            scores[start:end] = codes[start:end].astype(np.float32) @ query
+
+        if scales is not None:
+            scores *= scales
+
+        return scores
+
+    # ---------------------------
+    # Persistence
+    # ---------------------------
+    def save(self, path: Path, generation: str):
+        arrays = {"generation": np.array(generation), "codes": self.codes}
+
+        for name in ("scales", "mean", "components"):
+            value = getattr(self, name)
+            if value is not None:
+                arrays[name] = value
+
+        # Write-then-rename so a concurrent loader never sees a partial file
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+    def load(self, path: Path, generation: str) -> bool:
+        """
+        Load a previously saved encoding; False if it is missing or was
+        built for a different version of the index.
+        """
+        try:
+            with np.load(path) as data:
+                if str(data["generation"]) != generation:
+                    return False
+
+                self.codes = data["codes"]
+                self.scales = data["scales"] if "scales" in data else None
+                self.mean = data["mean"] if "mean" in data else None
+                self.components = data["components"] if "components" in data else None
+
+            return True
+
+        except FileNotFoundError:
+            return False
+
+        except Exception as e:
+            logging.error(f"[CompactVectors LOAD ERROR] {str(e)}")
+            return False
@@ -0,0 +1,169 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from src.cache.semantic_cache import normalize_question
+
+logging.basicConfig(level=logging.INFO)
+
+
+class Reranker:
+    """
+    Cross-encoder reranking of retrieved chunks.
+
+    Every (question, chunk) pair is scored jointly by a small
+    cross-encoder, all uncached pairs of a query in one batched forward
+    pass. Scores are cached per (normalized question, chunk text), so
+    repeated questions cost no model call.
+
+    rerank() keeps only the chunks that clear an adaptive cutoff: at
+    least min_score, and at least relative_cutoff times the best chunk's
+    score. A confident top hit therefore drops weak neighbours from the
+    prompt, while uniformly relevant results are all kept. The best chunk
+    is always kept; the retrieval guardrails have already decided the
+    question is answerable.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
+        min_score: float = 0.05,
+        relative_cutoff: float = 0.3,
+        cache_size: int = 4096,
+        model=None
+    ):
+        start_time = time.time()
+
+        if model is None:
+            import torch
+            from sentence_transformers import CrossEncoder
+
+            # Raw logits: single-label models otherwise apply their own
+            # sigmoid in predict(), and score() would apply a second one
+            try:
+                model = CrossEncoder(
+                    model_name, max_length=512, activation_fn=torch.nn.Identity()
+                )
+            except TypeError:
+                # sentence-transformers < 4 names the argument differently
+                model = CrossEncoder(
+                    model_name, max_length=512, default_activation_function=torch.nn.Identity()
+                )
+
+        self.model = model
+        self.model_name = model_name
+        self.min_score = min_score
+        self.relative_cutoff = relative_cutoff
+        self.cache_size = cache_size
+
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.queries = 0
+        self.pairs_scored = 0
+        self.cache_hits = 0
+        self.chunks_in = 0
+        self.chunks_kept = 0
+        self.seconds = 0.0
+
+        logging.info(
+            f"[Reranker] Loaded {model_name} in {time.time() - start_time:.2f}s"
+        )
+
+    # ---------------------------
+    # Scoring
+    # ---------------------------
+    def _key(self, question: str, document: str) -> str:
+        digest = hashlib.sha1(document.encode("utf-8")).hexdigest()
+        return f"{normalize_question(question)}:{digest}"
+
+    def score(self, question: str, documents: List[str]) -> List[float]:
+        """
+        Relevance in [0, 1] (sigmoid of the cross-encoder logit) for
+        each document.
+        """
+        keys = [self._key(question, doc) for doc in documents]
+        scores = [None] * len(documents)
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    scores[i] = self._cache[key]
+
+        missing = [i for i, score in enumerate(scores) if score is None]
+        self.cache_hits += len(documents) - len(missing)
+
+        if missing:
+            logits = self.model.predict(
+                [(question, documents[i]) for i in missing],
+                batch_size=len(missing),
+                show_progress_bar=False
+            )
+            probabilities = 1 / (1 + np.exp(-np.asarray(logits, dtype=np.float64)))
+
+            self.pairs_scored += len(missing)
+
+            with self._lock:
+                for i, probability in zip(missing, probabilities):
+                    scores[i] = float(probability)
+                    self._cache[keys[i]] = scores[i]
+
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return scores
+
+    def rerank(self, question: str, documents: List[str]) -> List[Tuple[int, float]]:
+        """
+        (index into documents, score) of the chunks that clear the
+        cutoff, best first.
+        """
+        if not documents:
+            return []
+
+        start_time = time.time()
+
+        scores = self.score(question, documents)
+        ranked = sorted(enumerate(scores), key=lambda x: x[1], reverse=True)
+
+        cutoff = max(self.min_score, ranked[0][1] * self.relative_cutoff)
+        kept = [ranked[0]] + [(i, s) for i, s in ranked[1:] if s >= cutoff]
+
+        self.queries += 1
+        self.chunks_in += len(documents)
+        self.chunks_kept += len(kept)
+        self.seconds += time.time() - start_time
+
+        return kept
+
+    def stats(self) -> dict:
+        queries = self.queries
+
+        return {
+            "model": self.model_name,
+            "queries": queries,
+            "pairs_scored": self.pairs_scored,
+            "cache_hits": self.cache_hits,
+            "cache_entries": len(self._cache),
+            "avg_chunks_kept": round(self.chunks_kept / queries, 2) if queries else 0.0,
+            "avg_chunks_in": round(self.chunks_in / queries, 2) if queries else 0.0,
+            "avg_ms": round(1000 * self.seconds / queries, 2) if queries else 0.0
+        }
+
+
+def load_reranker(model_name: str, **kwargs) -> Optional[Reranker]:
+    """
+    Reranker, or None when the model cannot be loaded; retrieval then
+    falls back to ranking by vector distance.
+    """
+    try:
+        return Reranker(model_name, **kwargs)
+    except Exception as e:
+        logging.error(f"[Reranker ERROR] {str(e)}")
+        return None
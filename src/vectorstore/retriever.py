@@ -0,0 +1,202 @@
+import asyncio
+import contextvars
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import List, Optional
+
+logging.basicConfig(level=logging.INFO)
+
+
+# ---------------------------
+# Process worker state
+# ---------------------------
+# Each worker process owns its own Embedder + VectorStore, since neither
+# the SentenceTransformer model nor the Chroma client can be pickled.
+_worker_store = None
+
+
+def _init_process_worker(
+    persist_dir: str,
+    model_name: str,
+    backend: str = "chroma",
+    flat_options: Optional[dict] = None
+):
+    global _worker_store
+
+    from src.vectorstore.embeddings import Embedder
+    from src.vectorstore.store import VectorStore
+
+    _worker_store = VectorStore(
+        embedder=Embedder(model_name=model_name),
+        persist_dir=persist_dir,
+        backend=backend,
+        flat_options=flat_options
+    )
+
+
+def _process_query(
+    query: str,
+    top_k: int,
+    filters: Optional[dict],
+    query_embedding: Optional[List[float]]
+):
+    return _worker_store.query(
+        query,
+        top_k=top_k,
+        filters=filters,
+        query_embedding=query_embedding
+    )
+
+
+def _process_embed(query: str) -> List[float]:
+    return _worker_store.embedder.embed_query(query)
+
+
+def _process_embed_batch(texts: List[str]) -> List[List[float]]:
+    return _worker_store.embedder.embed_texts(texts)
+
+
+class AsyncRetriever:
+    """
+    Runs the synchronous, CPU-bound retrieval path (query embedding +
+    vector search) on a bounded executor so the event loop stays free.
+    """
+
+    def __init__(
+        self,
+        store,
+        executor_type: str = "thread",
+        max_workers: int = 4,
+        max_pending: int = 64
+    ):
+        self.store = store
+        self.executor_type = executor_type
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+
+        # Calls on models in this process (see run_local)
+        self.local_executor = None
+
+        if executor_type == "thread":
+            self.executor = ThreadPoolExecutor(
+                max_workers=max_workers,
+                thread_name_prefix="retrieval"
+            )
+
+        elif executor_type == "process":
+            # Models in this process then get one thread beside the workers
+            self.local_executor = ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix="retrieval-local"
+            )
+
+            # spawn, not fork: the parent already holds model + Chroma threads
+            self.executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_process_worker,
+                initargs=(
+                    store.persist_dir,
+                    store.embedder.model_name,
+                    getattr(store, "backend", "chroma"),
+                    getattr(store, "flat_options", None)
+                )
+            )
+
+        else:
+            raise ValueError(f"Unknown executor type: {executor_type}")
+
+        # Backpressure: at most max_pending jobs queued on the executor
+        self._pending = asyncio.Semaphore(max_pending)
+        self.in_flight = 0
+
+        logging.info(
+            f"[AsyncRetriever] {executor_type} executor with {max_workers} workers"
+        )
+
+    async def run(self, fn, *args, **kwargs):
+        """
+        Run an arbitrary blocking callable on the executor.
+        """
+        return await self._submit(self.executor, fn, *args, **kwargs)
+
+    async def run_local(self, fn, *args, **kwargs):
+        """
+        Run a blocking callable that cannot be sent to a worker process,
+        such as the reranker's model. With thread workers it shares their
+        bounded pool, so model calls never exceed max_workers.
+        """
+        return await self._submit(self.local_executor or self.executor, fn, *args, **kwargs)
+
+    async def _submit(self, executor, fn, *args, **kwargs):
+        call = partial(fn, *args, **kwargs)
+
+        # Threads run in a copy of the caller's context, so trace spans
+        # opened inside attach to the request (process workers cannot)
+        if not isinstance(executor, ProcessPoolExecutor):
+            call = partial(contextvars.copy_context().run, call)
+
+        async with self._pending:
+            self.in_flight += 1
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(executor, call)
+            finally:
+                self.in_flight -= 1
+
+    async def embed(self, query: str) -> List[float]:
+        if self.executor_type == "process":
+            return await self.run(_process_embed, query)
+
+        return await self.run(self.store.embedder.embed_query, query)
+
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        if self.executor_type == "process":
+            return await self.run(_process_embed_batch, texts)
+
+        return await self.run(self.store.embedder.embed_texts, texts)
+
+    async def query(
+        self,
+        query: str,
+        top_k: int = 5,
+        filters: Optional[dict] = None,
+        query_embedding: Optional[List[float]] = None
+    ):
+        start_time = time.time()
+
+        if self.executor_type == "process":
+            results = await self.run(
+                _process_query, query, top_k, filters, query_embedding
+            )
+        else:
+            results = await self.run(
+                self.store.query,
+                query,
+                top_k=top_k,
+                filters=filters,
+                query_embedding=query_embedding
+            )
+
+        logging.info(
+            f"[AsyncRetriever] Query completed in {time.time() - start_time:.2f}s"
+        )
+
+        return results
+
+    def stats(self) -> dict:
+        return {
+            "executor": self.executor_type,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "in_flight": self.in_flight
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+        if self.local_executor is not None:
+            self.local_executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,173 @@
+import logging
+import os
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+
+SCOPE_FILE = "scope_centroids.npz"
+
+
+def spherical_kmeans(vectors: np.ndarray, k: int, iterations: int = 25, seed: int = 0) -> np.ndarray:
+    """
+    k-means on the unit sphere (cosine similarity), seeded with
+    k-means++. Returns (k, dim) unit-length centroids.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(vectors)
+    k = min(k, n)
+
+    # k-means++: each next seed is drawn proportionally to its distance
+    # from the seeds picked so far
+    centroids = [vectors[rng.integers(n)]]
+    for _ in range(1, k):
+        distance = 1 - np.max(vectors @ np.array(centroids).T, axis=1)
+        distance = np.clip(distance, 0, None)
+        total = distance.sum()
+        index = rng.choice(n, p=distance / total) if total > 0 else rng.integers(n)
+        centroids.append(vectors[index])
+
+    centroids = np.array(centroids)
+
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+
+        updated = centroids.copy()
+        for c in range(k):
+            members = vectors[assignment == c]
+            if len(members):
+                mean = members.sum(axis=0)
+                updated[c] = mean / max(np.linalg.norm(mean), 1e-12)
+
+        if np.allclose(updated, centroids):
+            break
+        centroids = updated
+
+    return centroids.astype(np.float32)
+
+
+class ScopeGate:
+    """
+    Cheap out-of-scope check on the query embedding.
+
+    At index time the chunk embeddings are summarized into a handful of
+    k-means centroids, saved next to the index together with the index
+    version they describe. A question whose embedding is less similar
+    than threshold to every centroid is about something the corpus does
+    not cover, and can be refused before retrieval and generation.
+
+    With no centroids (empty index, or not built yet) every question is
+    treated as in scope.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        n_centroids: int = 16,
+        threshold: float = 0.5,
+        sample_size: int = 20000
+    ):
+        self.path = Path(path)
+        self.n_centroids = n_centroids
+        self.threshold = threshold
+        self.sample_size = sample_size
+
+        self.centroids: Optional[np.ndarray] = None
+        self.index_version: Optional[str] = None
+
+        self.checks = 0
+        self.rejected = 0
+
+        self.load()
+
+    # ---------------------------
+    # Build / persist
+    # ---------------------------
+    def build(self, store) -> bool:
+        """
+        Fit centroids on the store's chunk embeddings (at most
+        sample_size of them) and save them with the current index version.
+        """
+        start_time = time.time()
+
+        try:
+            version = store.index_version()
+            embeddings = store.get_embeddings(limit=self.sample_size)
+
+            if not len(embeddings):
+                self.centroids = None
+                self.index_version = version
+                return True
+
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.maximum(norms, 1e-12)
+
+            centroids = spherical_kmeans(embeddings, self.n_centroids)
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+
+            # Write-then-rename so other workers never load a torn file
+            tmp_path = self.path.with_suffix(".tmp.npz")
+            np.savez(tmp_path, centroids=centroids, index_version=np.array(version))
+            os.replace(tmp_path, self.path)
+
+            self.centroids = centroids
+            self.index_version = version
+
+            logging.info(
+                f"[ScopeGate] Built {len(centroids)} centroids from "
+                f"{len(embeddings)} chunks in {time.time() - start_time:.2f}s"
+            )
+            return True
+
+        except Exception as e:
+            logging.error(f"[ScopeGate BUILD ERROR] {str(e)}")
+            return False
+
+    def load(self):
+        try:
+            with np.load(self.path) as data:
+                self.centroids = data["centroids"]
+                self.index_version = str(data["index_version"])
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.error(f"[ScopeGate LOAD ERROR] {str(e)}")
+
+    def is_stale(self, store) -> bool:
+        return self.index_version != store.index_version()
+
+    # ---------------------------
+    # Check
+    # ---------------------------
+    def score(self, query_embedding: List[float]) -> float:
+        """
+        Cosine similarity of the query to its nearest centroid.
+        """
+        if self.centroids is None or not len(query_embedding):
+            return 1.0
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / max(np.linalg.norm(query), 1e-12)
+
+        return float(np.max(self.centroids @ query))
+
+    def in_scope(self, query_embedding: List[float]) -> bool:
+        in_scope = self.score(query_embedding) >= self.threshold
+
+        self.checks += 1
+        if not in_scope:
+            self.rejected += 1
+
+        return in_scope
+
+    def stats(self) -> dict:
+        return {
+            "centroids": 0 if self.centroids is None else len(self.centroids),
+            "threshold": self.threshold,
+            "checks": self.checks,
+            "rejected": self.rejected
+        }
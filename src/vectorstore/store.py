@@ -1,29 +1,91 @@
-import chromadb
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
 from typing import List, Optional
 from src.chunking.chunker import Chunk
 from src.vectorstore.embeddings import Embedder
+from src.vectorstore.embedding_cache import EmbeddingCache
+from src.vectorstore.flat_index import FlatIndex
+from src.monitoring.tracing import traced
+import os
 import time
+import uuid
 import logging
+import numpy as np
 
 logging.basicConfig(level=logging.INFO)
 
+INDEX_VERSION_FILE = "index_version"
+FLAT_INDEX_DIR = "flat_index"
+BACKENDS = ("chroma", "flat")
+
 
 class VectorStore:
-    def __init__(self, embedder: Embedder, persist_dir: str = "chroma_db"):
+    def __init__(
+        self,
+        embedder: Embedder,
+        persist_dir: str = "chroma_db",
+        embedding_cache: Optional[EmbeddingCache] = None,
+        write_batch_size: int = 256,
+        write_retries: int = 2,
+        backend: str = "chroma",
+        flat_options: Optional[dict] = None
+    ):
         start_time = time.time()
 
         try:
-            self.client = chromadb.PersistentClient(path=persist_dir)
+            if backend not in BACKENDS:
+                raise ValueError(f"Unknown vector backend: {backend}")
 
-            self.collection = self.client.get_or_create_collection(
-                name="granicus_docs",
-                metadata={"hnsw:space": "cosine"}
-            )
+            self.backend = backend
+            self.flat_options = flat_options or {}
+
+            # The flat backend implements the parts of the Chroma
+            # collection API used below, so the rest of the class is shared
+            if backend == "flat":
+                self.index_dir = str(Path(persist_dir) / FLAT_INDEX_DIR)
+                self.client = None
+                self.collection = FlatIndex(self.index_dir, **self.flat_options)
+                max_batch_size = write_batch_size
+            else:
+                if self.flat_options:
+                    logging.warning(
+                        "[VectorStore] Compact vector options only apply to the flat backend"
+                    )
+
+                # Imported here: chromadb is slow to import and the flat
+                # backend does not need it
+                import chromadb
+
+                self.index_dir = persist_dir
+                self.client = chromadb.PersistentClient(path=persist_dir)
+                self.collection = self.client.get_or_create_collection(
+                    name="granicus_docs",
+                    metadata={"hnsw:space": "cosine"}
+                )
+                max_batch_size = self.client.get_max_batch_size()
 
             self.embedder = embedder
+            self.embedding_cache = embedding_cache
+            self.persist_dir = persist_dir
+
+            # Never send Chroma more rows per call than it accepts
+            self.write_batch_size = max(
+                1, min(write_batch_size, max_batch_size)
+            )
+            self.write_retries = write_retries
+
+            self._version_path = Path(persist_dir) / INDEX_VERSION_FILE
+            self._version = None
+            self._version_mtime = None
+
+            # Indexes built before versioning existed get a version now
+            if not self._version_path.exists():
+                self._bump_index_version()
 
             logging.info(
-                f"[VectorStore] Initialized in {time.time() - start_time:.2f}s"
+                f"[VectorStore] Initialized ({backend} backend) "
+                f"in {time.time() - start_time:.2f}s"
             )
 
         except Exception as e:
@@ -40,63 +102,294 @@ class VectorStore:
             logging.error(f"[VectorStore EMPTY CHECK ERROR] {str(e)}")
             return True
 
+    def count(self) -> int:
+        return self.collection.count()
+
+    def stats(self) -> dict:
+        stats = {"backend": self.backend, "chunks": self.count()}
+
+        if self.backend == "flat":
+            stats.update(self.collection.stats())
+
+        return stats
+
+    # ---------------------------
+    # Index Version
+    # ---------------------------
+    def index_version(self) -> str:
+        """
+        Opaque version of the indexed content. It changes on every write,
+        including writes made by another worker process, so caches keyed
+        on it are invalidated by a reindex.
+        """
+        try:
+            mtime = self._version_path.stat().st_mtime_ns
+
+            if mtime != self._version_mtime:
+                self._version = self._version_path.read_text().strip()
+                self._version_mtime = mtime
+
+            return self._version
+
+        except Exception as e:
+            logging.error(f"[VectorStore VERSION ERROR] {str(e)}")
+            return "unversioned"
+
+    def _bump_index_version(self):
+        try:
+            Path(self.persist_dir).mkdir(parents=True, exist_ok=True)
+
+            # Write-then-rename so readers never see a partial version
+            tmp_path = self._version_path.with_suffix(".tmp")
+            tmp_path.write_text(uuid.uuid4().hex)
+            os.replace(tmp_path, self._version_path)
+
+        except Exception as e:
+            logging.error(f"[VectorStore VERSION ERROR] {str(e)}")
+
+    # ---------------------------
+    # Embedding (through the persistent cache when configured)
+    # ---------------------------
+    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        if self.embedding_cache is None:
+            return self.embedder.embed_texts(texts)
+
+        try:
+            return self.embedding_cache.embed(texts, self.embedder.embed_texts)
+        except Exception as e:
+            logging.error(f"[VectorStore EMBEDDING CACHE ERROR] {str(e)}")
+            return self.embedder.embed_texts(texts)
+
+    def compact_embedding_cache(self) -> Optional[dict]:
+        """
+        Drop cached embeddings for texts that are no longer indexed.
+        """
+        if self.embedding_cache is None:
+            return None
+
+        indexed = self.collection.get(include=["documents"])
+        return self.embedding_cache.compact(keep_texts=indexed["documents"])
+
     # ---------------------------
     # Indexing
     # ---------------------------
-    def index_chunks(self, chunks: List[Chunk]):
+    def index_chunks(self, chunks: List[Chunk], upsert: bool = False) -> bool:
+        """
+        Embed and write chunks in batches of write_batch_size. Embedding
+        of batch N+1 runs on a helper thread while batch N is written.
+        Each failed batch is retried on its own; returns False if any
+        batch still failed, after indexing every batch it could.
+        """
         start_time = time.time()
 
-        
+        if not chunks:
+            logging.warning("[VectorStore] No chunks to index.")
+            return True
 
-        try:
-            if not chunks:
-                logging.warning("[VectorStore] No chunks to index.")
-                return
-
-            texts = [chunk.content for chunk in chunks]
-            ids = [chunk.chunk_id for chunk in chunks]
-
-            metadata = [
-                {
-                    "source": chunk.source,
-                    **getattr(chunk, "metadata", {})
-                }
-                for chunk in chunks
-            ]
-
-            embeddings = self.embedder.embed_texts(texts)
-
-            if not embeddings:
-                logging.error("[VectorStore] Embedding generation failed.")
-                return
-
-            self.collection.add(
-                documents=texts,
-                embeddings=embeddings,
-                ids=ids,
-                metadatas=metadata
+        batches = [
+            chunks[i:i + self.write_batch_size]
+            for i in range(0, len(chunks), self.write_batch_size)
+        ]
+
+        written = 0
+        failed = 0
+
+        with ThreadPoolExecutor(max_workers=1) as pool, self.bulk_write():
+            pending = pool.submit(self.embed_texts, [chunk.content for chunk in batches[0]])
+
+            for i, batch in enumerate(batches):
+                try:
+                    embeddings = pending.result()
+                except Exception as e:
+                    logging.error(f"[VectorStore EMBEDDING ERROR] {str(e)}")
+                    embeddings = []
+
+                # Start embedding the next batch before writing this one
+                if i + 1 < len(batches):
+                    pending = pool.submit(
+                        self.embed_texts, [chunk.content for chunk in batches[i + 1]]
+                    )
+
+                if len(embeddings) != len(batch):
+                    logging.error(
+                        f"[VectorStore] Embedding failed for batch {i + 1}/{len(batches)}"
+                    )
+                    failed += len(batch)
+                    continue
+
+                try:
+                    self.write_batch(batch, embeddings, upsert=upsert)
+                    written += len(batch)
+
+                except Exception as e:
+                    logging.error(
+                        f"[VectorStore INDEX ERROR] Batch {i + 1}/{len(batches)}: {str(e)}"
+                    )
+                    failed += len(batch)
+                    continue
+
+                elapsed = time.time() - start_time
+                logging.info(
+                    f"[VectorStore] Indexed {written}/{len(chunks)} chunks "
+                    f"({written / elapsed if elapsed else 0.0:.1f} chunks/s)"
+                )
+
+        elapsed = time.time() - start_time
+
+        if failed:
+            logging.error(
+                f"[VectorStore] {failed}/{len(chunks)} chunks failed to index "
+                f"in {elapsed:.2f}s"
             )
+            return False
 
-            logging.info(
-                f"[VectorStore] Indexed {len(chunks)} chunks in {time.time() - start_time:.2f}s"
+        logging.info(
+            f"[VectorStore] Indexed {len(chunks)} chunks in {elapsed:.2f}s "
+            f"({len(chunks) / elapsed if elapsed else 0.0:.1f} chunks/s)"
+        )
+
+        return True
+
+    @contextmanager
+    def bulk_write(self):
+        """
+        Group the write_batch calls of one indexing run. The flat backend
+        then rewrites its metadata sidecar once at the end rather than per
+        batch; Chroma writes as before.
+        """
+        if self.backend != "flat":
+            yield
+            return
+
+        try:
+            with self.collection.bulk():
+                yield
+        finally:
+            # The batches become visible to other processes only now
+            self._bump_index_version()
+
+    def write_batch(
+        self,
+        chunks: List[Chunk],
+        embeddings: List[List[float]],
+        upsert: bool = False
+    ):
+        """
+        Write already-embedded chunks in slices of at most write_batch_size,
+        retrying each failed slice on its own. Raises once a slice has
+        exhausted its retries so callers can record the failure.
+        """
+        write = self.collection.upsert if upsert else self.collection.add
+
+        try:
+            for i in range(0, len(chunks), self.write_batch_size):
+                batch = chunks[i:i + self.write_batch_size]
+
+                metadata = [
+                    {
+                        "source": chunk.source,
+                        **getattr(chunk, "metadata", {})
+                    }
+                    for chunk in batch
+                ]
+
+                for attempt in range(self.write_retries + 1):
+                    try:
+                        write(
+                            documents=[chunk.content for chunk in batch],
+                            embeddings=embeddings[i:i + self.write_batch_size],
+                            ids=[chunk.chunk_id for chunk in batch],
+                            metadatas=metadata
+                        )
+                        break
+
+                    except Exception as e:
+                        if attempt == self.write_retries:
+                            raise
+
+                        logging.warning(
+                            f"[VectorStore] Write of {len(batch)} chunks failed "
+                            f"(attempt {attempt + 1}): {str(e)}. Retrying."
+                        )
+                        time.sleep(0.1 * 2 ** attempt)
+
+        finally:
+            # Even a partial write changes what queries can return
+            self._bump_index_version()
+
+    def upsert_chunks(self, chunks: List[Chunk]) -> bool:
+        return self.index_chunks(chunks, upsert=True)
+
+    def delete_chunks(self, ids: List[str]) -> bool:
+        if not ids:
+            return True
+
+        try:
+            self.collection.delete(ids=list(ids))
+            self._bump_index_version()
+
+            logging.info(f"[VectorStore] Deleted {len(ids)} chunks")
+            return True
+
+        except Exception as e:
+            logging.error(f"[VectorStore DELETE ERROR] {str(e)}")
+            return False
+
+    def reset(self):
+        """
+        Drop every indexed chunk (used before a full rebuild).
+        """
+        if self.backend == "flat":
+            self.collection.reset()
+        else:
+            self.client.delete_collection(name="granicus_docs")
+
+            self.collection = self.client.get_or_create_collection(
+                name="granicus_docs",
+                metadata={"hnsw:space": "cosine"}
             )
 
+        self._bump_index_version()
+
+        logging.info("[VectorStore] Collection reset")
+
+    def get_embeddings(self, limit: Optional[int] = None) -> np.ndarray:
+        """
+        Stored chunk embeddings as a (n, dim) float32 array, at most
+        limit rows (used to fit the scope gate at index time).
+        """
+        try:
+            if self.backend == "flat":
+                embeddings = self.collection.get(include=["embeddings"])["embeddings"]
+                embeddings = embeddings[:limit] if limit else embeddings
+            else:
+                embeddings = self.collection.get(
+                    include=["embeddings"], limit=limit
+                )["embeddings"]
+
+            return np.asarray(embeddings, dtype=np.float32).reshape(len(embeddings), -1)
+
         except Exception as e:
-            logging.error(f"[VectorStore INDEX ERROR] {str(e)}")
+            logging.error(f"[VectorStore GET ERROR] {str(e)}")
+            return np.zeros((0, 0), dtype=np.float32)
 
     # ---------------------------
     # Query
     # ---------------------------
+    @traced("vectorstore.query")
     def query(
         self,
         query: str,
         top_k: int = 5,
-        filters: Optional[dict] = None
+        filters: Optional[dict] = None,
+        query_embedding: Optional[List[float]] = None
     ):
         start_time = time.time()
 
         try:
-            query_embedding = self.embedder.embed_query(query)
+            # Callers that already embedded the query skip the model call
+            if query_embedding is None:
+                query_embedding = self.embedder.embed_query(query)
 
             if not query_embedding:
                 logging.error("[VectorStore] Query embedding failed.")
@@ -0,0 +1,209 @@
+import logging
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.ingestion.loader import DocumentLoader
+from src.chunking.chunker import SmartChunker
+
+logging.basicConfig(level=logging.INFO)
+
+# Marks the end of a stage's output
+_DONE = object()
+
+
+class StreamingIndexer:
+    """
+    Bounded-memory ingest -> chunk -> embed -> index pipeline.
+
+    Three stages run concurrently and hand off through bounded queues:
+
+    1. load + chunk (thread): documents are loaded and chunked one at a
+       time and grouped into batches of batch_size chunks
+    2. embed (thread): each batch is embedded
+    3. write (caller's thread): each embedded batch is written to the store
+
+    A full queue blocks the stage feeding it, so at most
+    2 * queue_size + 3 batches are alive at once regardless of corpus
+    size. A batch that fails to embed or write is recorded and skipped;
+    the rest of the corpus is still indexed.
+    """
+
+    def __init__(
+        self,
+        store,
+        loader: DocumentLoader,
+        chunker: Optional[SmartChunker] = None,
+        batch_size: int = 64,
+        queue_size: int = 4
+    ):
+        self.store = store
+        self.loader = loader
+        self.chunker = chunker or SmartChunker()
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+
+    def run(self, paths: Optional[List[Path]] = None, upsert: bool = True) -> Dict:
+        start_time = time.time()
+
+        chunk_queue = queue.Queue(maxsize=self.queue_size)
+        write_queue = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+
+        stats = {
+            "documents": 0,
+            "chunks": 0,
+            "batches": 0,
+            "failed_batches": 0,
+            "chunk_ids": {},
+            "failed_sources": set(),
+            "errors": []
+        }
+
+        def put(q: queue.Queue, item) -> bool:
+            # Blocking put that gives up if the pipeline is shutting down
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def get(q: queue.Queue):
+            # Blocking get that gives up once the pipeline is shutting down
+            # and nothing is left to take
+            while True:
+                try:
+                    return q.get(timeout=0.1)
+                except queue.Empty:
+                    if stop.is_set():
+                        return _DONE
+
+        def finish(q: queue.Queue):
+            # Never blocks: when shutting down with the queue full, the
+            # consumer stops through get() instead
+            if not put(q, _DONE):
+                try:
+                    q.put_nowait(_DONE)
+                except queue.Full:
+                    pass
+
+        # ---------------------------
+        # Stage 1: load + chunk
+        # ---------------------------
+        def produce():
+            batch = []
+
+            try:
+                for document in self.loader.iter_documents(paths):
+                    stats["documents"] += 1
+                    stats["chunk_ids"].setdefault(document.source, [])
+
+                    for chunk in self.chunker.iter_chunks([document]):
+                        stats["chunk_ids"][document.source].append(chunk.chunk_id)
+                        batch.append(chunk)
+
+                        if len(batch) >= self.batch_size:
+                            if not put(chunk_queue, batch):
+                                return
+                            batch = []
+
+                if batch:
+                    put(chunk_queue, batch)
+
+            except Exception as e:
+                logging.error(f"[StreamingIndexer LOAD ERROR] {str(e)}")
+                stats["errors"].append(f"load: {e}")
+                stop.set()
+
+            finally:
+                finish(chunk_queue)
+
+        # ---------------------------
+        # Stage 2: embed
+        # ---------------------------
+        def embed():
+            try:
+                while True:
+                    batch = get(chunk_queue)
+                    if batch is _DONE:
+                        break
+
+                    embeddings = self.store.embed_texts([chunk.content for chunk in batch])
+
+                    if len(embeddings) != len(batch):
+                        logging.error(
+                            f"[StreamingIndexer] Embedding failed for batch of {len(batch)}"
+                        )
+                        self._fail(stats, batch)
+                        continue
+
+                    if not put(write_queue, (batch, embeddings)):
+                        return
+
+            except Exception as e:
+                logging.error(f"[StreamingIndexer EMBED ERROR] {str(e)}")
+                stats["errors"].append(f"embed: {e}")
+                stop.set()
+
+            finally:
+                finish(write_queue)
+
+        producer = threading.Thread(target=produce, name="index-load", daemon=True)
+        embedder = threading.Thread(target=embed, name="index-embed", daemon=True)
+        producer.start()
+        embedder.start()
+
+        # ---------------------------
+        # Stage 3: write
+        # ---------------------------
+        try:
+            with self.store.bulk_write():
+                while True:
+                    item = write_queue.get()
+                    if item is _DONE:
+                        break
+
+                    batch, embeddings = item
+
+                    try:
+                        self.store.write_batch(batch, embeddings, upsert=upsert)
+                        stats["batches"] += 1
+                        stats["chunks"] += len(batch)
+
+                    except Exception as e:
+                        logging.error(f"[StreamingIndexer WRITE ERROR] {str(e)}")
+                        self._fail(stats, batch)
+
+        finally:
+            stop.set()
+
+            # Unblock upstream stages if we are bailing out early
+            for q in (chunk_queue, write_queue):
+                while not q.empty():
+                    q.get_nowait()
+
+            producer.join()
+            embedder.join()
+
+        stats["failed_sources"] = sorted(stats["failed_sources"])
+        stats["seconds"] = round(time.time() - start_time, 3)
+        stats["chunks_per_second"] = (
+            round(stats["chunks"] / stats["seconds"], 1) if stats["seconds"] else 0.0
+        )
+
+        logging.info(
+            f"[StreamingIndexer] Indexed {stats['chunks']} chunks from "
+            f"{stats['documents']} documents in {stats['seconds']:.2f}s "
+            f"({stats['chunks_per_second']} chunks/s, {stats['failed_batches']} failed batches)"
+        )
+
+        return stats
+
+    @staticmethod
+    def _fail(stats: Dict, batch: list):
+        stats["failed_batches"] += 1
+        stats["failed_sources"].update(chunk.source for chunk in batch)
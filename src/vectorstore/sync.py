@@ -0,0 +1,275 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from src.ingestion.loader import DocumentLoader
+from src.chunking.chunker import SmartChunker
+from src.vectorstore.streaming_indexer import StreamingIndexer
+
+logging.basicConfig(level=logging.INFO)
+
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+class IndexSyncer:
+    """
+    Incrementally keeps the vector store in step with data_dir.
+
+    A manifest next to the index records, per source file, its sha256,
+    mtime, size and the chunk IDs it produced. sync() re-loads, re-chunks
+    and re-embeds only files whose content changed, upserts their chunks,
+    and deletes chunks that no longer exist (edited or removed files).
+    Changed files are streamed through StreamingIndexer, so memory stays
+    bounded by the batch size rather than the corpus size. When a scope
+    gate is given, its centroids are refit whenever the index changed.
+    """
+
+    def __init__(
+        self,
+        store,
+        loader: DocumentLoader,
+        chunker: Optional[SmartChunker] = None,
+        manifest_path: Optional[str] = None,
+        batch_size: int = 64,
+        queue_size: int = 4,
+        scope_gate=None
+    ):
+        self.store = store
+        self.scope_gate = scope_gate
+        self.loader = loader
+        self.chunker = chunker or SmartChunker()
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.manifest_path = Path(
+            # One manifest per backend, next to the index it describes
+            manifest_path or Path(store.index_dir) / MANIFEST_FILE
+        )
+
+    # ---------------------------
+    # Manifest
+    # ---------------------------
+    def load_manifest(self) -> Optional[Dict]:
+        try:
+            manifest = json.loads(self.manifest_path.read_text())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.error(f"[IndexSyncer MANIFEST ERROR] {str(e)}")
+            return None
+
+        if manifest.get("version") != MANIFEST_VERSION:
+            return None
+
+        return manifest
+
+    def save_manifest(self, manifest: Dict):
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write-then-rename so a crash never leaves a torn manifest
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+        os.replace(tmp_path, self.manifest_path)
+
+    # ---------------------------
+    # Sync
+    # ---------------------------
+    def sync(self) -> Dict:
+        start_time = time.time()
+
+        manifest = self.load_manifest()
+
+        # An index built without a manifest has random chunk IDs that
+        # cannot be matched to files, so rebuild it once from scratch
+        if manifest is None:
+            if not self.store.is_empty():
+                logging.info("[IndexSyncer] No manifest for existing index. Rebuilding.")
+                self.store.reset()
+
+            manifest = {"version": MANIFEST_VERSION, "files": {}}
+
+        files = manifest["files"]
+
+        report = {
+            "added": [],
+            "updated": [],
+            "removed": [],
+            "unchanged": 0,
+            "failed": [],
+            "chunks_upserted": 0,
+            "chunks_deleted": 0
+        }
+
+        current = {path.name: path for path in self.loader.discover_files()}
+
+        # ---------------------------
+        # Detect added / changed files
+        # ---------------------------
+        changed = []
+
+        for name, path in current.items():
+            stat = path.stat()
+            entry = files.get(name)
+
+            # Cheap check first: unchanged mtime + size means unchanged file
+            if entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+                report["unchanged"] += 1
+                continue
+
+            sha256 = file_sha256(path)
+
+            if entry and entry["sha256"] == sha256:
+                entry["mtime"] = stat.st_mtime
+                report["unchanged"] += 1
+                continue
+
+            changed.append((name, path, stat, sha256, entry))
+
+        # ---------------------------
+        # Stream changed files through load -> chunk -> embed -> upsert
+        # ---------------------------
+        indexer = StreamingIndexer(
+            self.store,
+            self.loader,
+            self.chunker,
+            batch_size=self.batch_size,
+            queue_size=self.queue_size
+        )
+        indexed = indexer.run([path for _, path, _, _, _ in changed]) if changed else None
+        failed_sources = set(indexed["failed_sources"]) if indexed else set()
+
+        if indexed and indexed["errors"]:
+            # The pipeline stopped early; files it never reached are unknown
+            failed_sources.update(name for name, _, _, _, _ in changed)
+
+        for name, path, stat, sha256, entry in changed:
+            if name in failed_sources:
+                report["failed"].append(name)
+                continue
+
+            new_ids = indexed["chunk_ids"].get(name, [])
+            old_ids = set(entry["chunk_ids"]) if entry else set()
+            orphaned = sorted(old_ids - set(new_ids))
+
+            self.store.delete_chunks(orphaned)
+
+            files[name] = {
+                "sha256": sha256,
+                "mtime": stat.st_mtime,
+                "size": stat.st_size,
+                "chunk_ids": new_ids
+            }
+
+            report["updated" if entry else "added"].append(name)
+            report["chunks_upserted"] += len(new_ids)
+            report["chunks_deleted"] += len(orphaned)
+
+        # ---------------------------
+        # Removed files
+        # ---------------------------
+        for name in sorted(set(files) - set(current)):
+            orphaned = files[name]["chunk_ids"]
+
+            if not self.store.delete_chunks(orphaned):
+                report["failed"].append(name)
+                continue
+
+            del files[name]
+
+            report["removed"].append(name)
+            report["chunks_deleted"] += len(orphaned)
+
+        self.save_manifest(manifest)
+
+        # ---------------------------
+        # Scope centroids (refit only when the indexed content changed)
+        # ---------------------------
+        report["scope_rebuilt"] = False
+        if self.scope_gate is not None and self.scope_gate.is_stale(self.store):
+            report["scope_rebuilt"] = self.scope_gate.build(self.store)
+
+        report["seconds"] = round(time.time() - start_time, 3)
+
+        logging.info(
+            f"[IndexSyncer] {len(report['added'])} added, {len(report['updated'])} updated, "
+            f"{len(report['removed'])} removed, {report['unchanged']} unchanged "
+            f"in {report['seconds']:.2f}s"
+        )
+
+        return report
+
+
+# ---------------------------
+# CLI
+# ---------------------------
+def main():
+    parser = argparse.ArgumentParser(
+        description="Incrementally sync the vector index with the data directory."
+    )
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--persist-dir", default="chroma_db")
+    parser.add_argument("--embedding-cache-dir", default="embedding_cache")
+    parser.add_argument("--backend", default="chroma", choices=["chroma", "flat"])
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Process-pool size for document loading (1 = sequential)."
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=64,
+        help="Chunks embedded and written per batch."
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Drop cached embeddings for text that is no longer indexed."
+    )
+    args = parser.parse_args()
+
+    from src.vectorstore.embeddings import Embedder
+    from src.vectorstore.embedding_cache import EmbeddingCache
+    from src.vectorstore.store import VectorStore
+
+    embedder = Embedder()
+    store = VectorStore(
+        embedder=embedder,
+        persist_dir=args.persist_dir,
+        backend=args.backend,
+        embedding_cache=EmbeddingCache(args.embedding_cache_dir, embedder.cache_key)
+    )
+    syncer = IndexSyncer(
+        store,
+        DocumentLoader(data_dir=args.data_dir, workers=args.workers),
+        batch_size=args.batch_size
+    )
+
+    report = syncer.sync()
+
+    if args.compact:
+        report["embedding_cache_compaction"] = store.compact_embedding_cache()
+
+    report["embedding_cache"] = store.embedding_cache.stats()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import hashlib
+
+import pytest
+
+
+class HashEmbedder:
+    """Deterministic stand-in embedder so tests need no model download."""
+
+    model_name = "hash-embedder"
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed_texts(self, texts):
+        self.calls += len(texts)
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        return [b / 255.0 + 0.01 for b in digest[:16]]
+
+
+@pytest.fixture
+def hash_embedder():
+    return HashEmbedder()
@@ -0,0 +1,51 @@
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+import src.api.app as api
+
+
+class SlowPipeline:
+    """Stand-in whose construction blocks until the test releases it."""
+
+    release = threading.Event()
+
+    def __init__(self):
+        self.release.wait(timeout=10)
+        self.startup_timings = {"embedder": 0.01, "total": 0.01}
+
+    async def startup(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    class store:
+        @staticmethod
+        def count():
+            return 3
+
+
+def test_server_is_live_before_pipeline_is_ready(monkeypatch):
+
+    monkeypatch.setattr(api, "RAGPipeline", SlowPipeline)
+    monkeypatch.setattr(api, "rag_pipeline", None)
+
+    with TestClient(api.app) as client:
+        # Liveness answers immediately; readiness and chat wait for the build
+        assert client.get("/health").json() == {"status": "ok", "ready": False}
+        assert client.get("/ready").status_code == 503
+        assert client.post("/chat", json={"question": "hi"}).status_code == 503
+
+        SlowPipeline.release.set()
+
+        for _ in range(100):
+            if client.get("/ready").status_code == 200:
+                break
+            time.sleep(0.05)
+
+        ready = client.get("/ready").json()
+        assert ready["status"] == "ready"
+        assert ready["indexed_chunks"] == 3
+        assert "embedder" in ready["startup_timings"]
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+import time
+import pytest
+from src.vectorstore.retriever import AsyncRetriever
+
+
+class SlowStore:
+    """Stand-in store whose query blocks like an embedding + HNSW search."""
+
+    def query(self, query, top_k=5, filters=None, query_embedding=None):
+        time.sleep(0.2)
+        return {"documents": [[query]], "distances": [[0.1]]}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_queries_overlap_on_executor():
+
+    retriever = AsyncRetriever(SlowStore(), max_workers=4)
+
+    start = time.time()
+    results = await asyncio.gather(
+        *[retriever.query(f"question {i}") for i in range(4)]
+    )
+    elapsed = time.time() - start
+
+    retriever.shutdown()
+
+    # Four 0.2s queries on four workers finish together, not serially
+    assert len(results) == 4
+    assert results[2]["documents"][0][0] == "question 2"
+    assert elapsed < 0.6
+
+
+@pytest.mark.asyncio
+async def test_event_loop_stays_responsive_during_retrieval():
+
+    retriever = AsyncRetriever(SlowStore(), max_workers=1)
+
+    query_task = asyncio.create_task(retriever.query("slow question"))
+
+    # The loop can still schedule other work while the query runs
+    start = time.time()
+    await asyncio.sleep(0.01)
+    assert time.time() - start < 0.1
+
+    await query_task
+    retriever.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_local_model_calls_are_bounded_by_the_executor():
+
+    retriever = AsyncRetriever(SlowStore(), max_workers=2)
+
+    running, peak = [0], [0]
+
+    def rerank():
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        running[0] -= 1
+
+    await asyncio.gather(*[retriever.run_local(rerank) for _ in range(6)])
+    retriever.shutdown()
+
+    assert peak[0] == 2
+
+
+@pytest.mark.asyncio
+async def test_local_calls_stay_in_process_with_process_workers():
+
+    class StoreStandIn:
+        persist_dir = "unused"
+        embedder = type("Embedder", (), {"model_name": "unused"})()
+
+    retriever = AsyncRetriever(StoreStandIn(), executor_type="process", max_workers=2)
+
+    # An unpicklable callable runs on the local thread, not a worker
+    result = await retriever.run_local(lambda: threading.current_thread().name)
+    retriever.shutdown()
+
+    assert result.startswith("retrieval-local")
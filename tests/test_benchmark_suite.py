@@ -0,0 +1,45 @@
+import asyncio
+import os
+from benchmarks.suite import FakeGenerator, compare, patched_env
+
+
+def test_compare_flags_only_real_slowdowns():
+    baseline = {"1x": {"query.p50_ms": 2.0, "ask.p50_ms": 10.0, "load.csv.ms_per_file": 0.02}}
+    current = {"1x": {
+        "query.p50_ms": 2.2,           # 10% slower: within threshold
+        "ask.p50_ms": 14.0,            # 40% slower: regression
+        "load.csv.ms_per_file": 0.04,  # 2x, but below the noise floor
+        "chunk.ms_per_document": 5.0   # no baseline yet
+    }}
+
+    regressions = compare(current, baseline, threshold=0.25)
+
+    assert [(scale, metric) for scale, metric, *_ in regressions] == [("1x", "ask.p50_ms")]
+
+
+def test_per_metric_threshold_overrides_global():
+    baseline = {"10x": {"ask.p50_ms": 10.0}}
+    current = {"10x": {"ask.p50_ms": 14.0}}
+
+    assert compare(current, baseline, threshold=0.25, thresholds={"ask.p50_ms": 0.5}) == []
+
+
+def test_fake_generator_is_deterministic():
+    generator = FakeGenerator()
+    context = "Enterprise: $48,000 per year\nStarter: $5,000"
+
+    first = asyncio.run(generator.generate("price?", context))
+    second = asyncio.run(generator.generate("price?", context))
+
+    assert first == second == "Enterprise: $48,000 per year"
+
+
+def test_patched_env_restores_previous_values(monkeypatch):
+    monkeypatch.setenv("RAG_VECTOR_BACKEND", "chroma")
+    monkeypatch.delenv("RAG_EMBEDDING_CACHE_DIR", raising=False)
+
+    with patched_env(RAG_VECTOR_BACKEND="flat", RAG_EMBEDDING_CACHE_DIR="/tmp/cache"):
+        assert os.environ["RAG_VECTOR_BACKEND"] == "flat"
+
+    assert os.environ["RAG_VECTOR_BACKEND"] == "chroma"
+    assert "RAG_EMBEDDING_CACHE_DIR" not in os.environ
@@ -23,3 +23,14 @@ def test_chunking_creates_chunks():
 
     assert isinstance(first_chunk.content, str)
     assert len(first_chunk.content) > 50
+
+
+def test_chunk_ids_are_deterministic():
+    loader = DocumentLoader(data_dir="data")
+
+    first = SmartChunker().chunk_documents(loader.load())
+    second = SmartChunker().chunk_documents(loader.load())
+
+    # Same content and source always produce the same IDs
+    assert [c.chunk_id for c in first] == [c.chunk_id for c in second]
+    assert len({c.chunk_id for c in first}) == len(first)
@@ -0,0 +1,58 @@
+from src.llm.context_builder import ContextBuilder
+
+
+class WordTokenizer:
+    """transformers-style tokenizer: one token per whitespace word."""
+
+    def encode(self, text, add_special_tokens=True):
+        return text.split()
+
+
+ROW_A = "Enterprise | 100,000 subscribers | $25,000 per year"
+ROW_B = "Professional | 25,000 subscribers | $12,000 per year"
+LONG = " ".join(["word"] * 50)
+
+
+def test_pack_keeps_whole_chunks_in_rank_order_within_budget():
+
+    builder = ContextBuilder(tokenizer=WordTokenizer(), max_tokens=20, max_chunks=5)
+
+    packed = builder.pack([ROW_A, LONG, ROW_B])
+
+    # The long chunk does not fit and is skipped whole; nothing is cut mid-row
+    assert packed["context"] == f"{ROW_A}\n\n{ROW_B}"
+    assert packed["chunks"] == 2
+    assert packed["context_tokens"] == builder.count_tokens(ROW_A) + builder.count_tokens(ROW_B)
+    assert packed["context_tokens"] <= 20
+
+
+def test_pack_respects_max_chunks_and_estimates_without_tokenizer():
+
+    builder = ContextBuilder(max_tokens=1000, max_chunks=1)
+
+    packed = builder.pack([ROW_A, ROW_B])
+
+    assert packed["context"] == ROW_A
+    assert builder.count_tokens("x" * 40) == 10
+
+
+def test_pack_trims_oversized_top_chunk_on_line_boundary():
+
+    builder = ContextBuilder(tokenizer=WordTokenizer(), max_tokens=12)
+
+    packed = builder.pack([f"{ROW_A}\n{ROW_B}\n{ROW_A}"])
+
+    assert packed["context"] == ROW_A
+    assert packed["chunks"] == 1
+
+
+def test_pack_keeps_best_chunk_larger_than_budget_on_one_line():
+
+    builder = ContextBuilder(tokenizer=WordTokenizer(), max_tokens=10)
+
+    # A lower-ranked chunk would fit, but the best one is never dropped
+    packed = builder.pack([LONG, ROW_A])
+
+    assert packed["context"] == " ".join(["word"] * 10)
+    assert packed["context_tokens"] == 10
+    assert packed["chunks"] == 1
@@ -0,0 +1,84 @@
+import asyncio
+import pytest
+from src.vectorstore.batcher import EmbeddingBatcher
+from src.vectorstore.retriever import AsyncRetriever
+
+
+class RecordingEmbedder:
+    """Stand-in embedder that records the size of every encode call."""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def embed_texts(self, texts):
+        self.batch_sizes.append(len(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, query):
+        return self.embed_texts([query])[0]
+
+
+class StoreStandIn:
+    def __init__(self, embedder):
+        self.embedder = embedder
+
+
+@pytest.mark.asyncio
+async def test_concurrent_queries_are_encoded_in_one_batch():
+
+    embedder = RecordingEmbedder()
+    retriever = AsyncRetriever(StoreStandIn(embedder), max_workers=1)
+    batcher = EmbeddingBatcher(retriever, max_batch_size=16, max_wait_ms=20)
+
+    queries = [f"question {'x' * i}" for i in range(8)]
+    vectors = await asyncio.gather(*[batcher.embed(q) for q in queries])
+
+    # Every caller gets its own vector back, in order
+    assert [v[0] for v in vectors] == [float(len(q)) for q in queries]
+
+    # ...from a single model call
+    assert embedder.batch_sizes == [8]
+    assert batcher.stats()["largest_batch"] == 8
+
+    batcher.shutdown()
+    retriever.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_batches_are_capped_at_max_batch_size():
+
+    embedder = RecordingEmbedder()
+    retriever = AsyncRetriever(StoreStandIn(embedder), max_workers=1)
+    batcher = EmbeddingBatcher(retriever, max_batch_size=4, max_wait_ms=20)
+
+    await asyncio.gather(*[batcher.embed(f"q{i}") for i in range(10)])
+
+    assert max(embedder.batch_sizes) <= 4
+    assert sum(embedder.batch_sizes) == 10
+
+    batcher.shutdown()
+    retriever.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_shutdown_cancels_callers_still_waiting():
+
+    class SlowRetriever:
+        async def embed_batch(self, texts):
+            await asyncio.sleep(10)
+
+    batcher = EmbeddingBatcher(SlowRetriever(), max_batch_size=2, max_wait_ms=20)
+
+    # Two fill a batch that is being encoded; the third is still queued
+    callers = [asyncio.ensure_future(batcher.embed(f"q{i}")) for i in range(3)]
+    await asyncio.sleep(0.01)
+    assert len(batcher._encoding) == 1
+
+    batcher.shutdown()
+    results = await asyncio.wait_for(
+        asyncio.gather(*callers, return_exceptions=True), timeout=1
+    )
+
+    assert all(isinstance(r, asyncio.CancelledError) for r in results)
+    await asyncio.sleep(0)
+    assert not batcher._encoding
@@ -0,0 +1,63 @@
+from src.vectorstore.embedding_cache import EmbeddingCache
+
+
+class CountingEmbedder:
+    """Stand-in embedder that counts how many texts reach the model."""
+
+    def __init__(self):
+        self.embedded = 0
+
+    def embed_texts(self, texts):
+        self.embedded += len(texts)
+        return [[float(len(text)), 1.0, 0.5] for text in texts]
+
+
+def test_only_new_text_is_embedded(tmp_path):
+
+    embedder = CountingEmbedder()
+    cache = EmbeddingCache(str(tmp_path), model_name="test-model")
+
+    first = cache.embed(["alpha", "beta"], embedder.embed_texts)
+    assert embedder.embedded == 2
+
+    # "alpha" is served from disk; only "gamma" hits the model
+    second = cache.embed(["alpha", "gamma", "gamma"], embedder.embed_texts)
+    assert embedder.embedded == 3
+
+    assert second[0] == first[0]
+    assert second[1] == second[2] == [5.0, 1.0, 0.5]
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 4
+
+
+def test_cache_persists_and_is_keyed_by_model(tmp_path):
+
+    embedder = CountingEmbedder()
+    EmbeddingCache(str(tmp_path), model_name="model-a").embed(["alpha"], embedder.embed_texts)
+
+    # Reopened from disk: no model call
+    reopened = EmbeddingCache(str(tmp_path), model_name="model-a")
+    assert reopened.embed(["alpha"], embedder.embed_texts) == [[5.0, 1.0, 0.5]]
+    assert embedder.embedded == 1
+
+    # A different model never reuses model-a vectors
+    EmbeddingCache(str(tmp_path), model_name="model-b").embed(["alpha"], embedder.embed_texts)
+    assert embedder.embedded == 2
+
+
+def test_compact_drops_unused_rows(tmp_path):
+
+    embedder = CountingEmbedder()
+    cache = EmbeddingCache(str(tmp_path), model_name="test-model")
+    cache.embed(["alpha", "beta", "gamma"], embedder.embed_texts)
+
+    report = cache.compact(keep_texts=["gamma", "alpha"])
+
+    assert report["rows_before"] == 3
+    assert report["rows_after"] == 2
+    assert cache.embed(["gamma", "alpha"], embedder.embed_texts) == [
+        [5.0, 1.0, 0.5], [5.0, 1.0, 0.5]
+    ]
+    assert embedder.embedded == 3
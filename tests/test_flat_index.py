@@ -0,0 +1,159 @@
+import numpy as np
+from src.chunking.chunker import Chunk
+from src.vectorstore.flat_index import FlatIndex
+from src.vectorstore.store import VectorStore
+
+
+def make_rows(n, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(n, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    ids = [f"id-{i}" for i in range(n)]
+    documents = [f"document {i}" for i in range(n)]
+    metadatas = [{"source": f"file{i % 3}.txt", "rank": i} for i in range(n)]
+
+    return vectors, ids, documents, metadatas
+
+
+def test_flat_index_query_is_exact_and_filtered(tmp_path):
+
+    vectors, ids, documents, metadatas = make_rows(200)
+    index = FlatIndex(str(tmp_path))
+    index.add(documents=documents, embeddings=vectors.tolist(), ids=ids, metadatas=metadatas)
+
+    query = vectors[7] + 0.05
+    scores = vectors @ (query / np.linalg.norm(query))
+    expected = [ids[i] for i in np.argsort(-scores)[:5]]
+
+    result = index.query(query_embeddings=[query.tolist()], n_results=5)
+    assert result["ids"][0] == expected
+    assert result["distances"][0] == sorted(result["distances"][0])
+
+    where = {"$and": [{"source": {"$in": ["file1.txt", "file2.txt"]}}, {"rank": {"$gte": 100}}]}
+    result = index.query(query_embeddings=[query.tolist()], n_results=5, where=where)
+    assert len(result["ids"][0]) == 5
+    assert all(
+        m["source"] != "file0.txt" and m["rank"] >= 100 for m in result["metadatas"][0]
+    )
+
+
+def test_flat_index_upsert_delete_and_reload(tmp_path):
+
+    vectors, ids, documents, metadatas = make_rows(10)
+    index = FlatIndex(str(tmp_path))
+    index.add(documents=documents, embeddings=vectors.tolist(), ids=ids, metadatas=metadatas)
+
+    index.upsert(documents=["replaced"], embeddings=[vectors[0].tolist()], ids=["id-3"])
+    index.delete(["id-0", "id-1"])
+
+    # A fresh instance (another worker process) sees the same index
+    reopened = FlatIndex(str(tmp_path))
+    assert reopened.count() == 8
+    assert reopened.get(ids=["id-3"])["documents"] == ["replaced"]
+    assert reopened.query(query_embeddings=[vectors[0].tolist()], n_results=1)["ids"][0] == ["id-3"]
+
+
+def test_vector_store_flat_backend(tmp_path):
+
+    class StubEmbedder:
+        model_name = "stub"
+
+    vectors, ids, documents, _ = make_rows(20)
+    chunks = [Chunk(chunk_id=ids[i], source="a.txt", content=documents[i]) for i in range(20)]
+
+    store = VectorStore(embedder=StubEmbedder(), persist_dir=str(tmp_path), backend="flat")
+    assert store.is_empty()
+
+    store.write_batch(chunks, vectors.tolist())
+    assert store.count() == 20
+
+    results = store.query("", top_k=3, query_embedding=vectors[4].tolist())
+    assert results["documents"][0][0] == "document 4"
+    assert results["distances"][0][0] < 1e-5
+
+    store.reset()
+    assert store.is_empty()
+
+
+def test_flat_index_compact_vectors_rescore_to_exact_order(tmp_path):
+
+    vectors, ids, documents, metadatas = make_rows(500, dim=64, seed=1)
+    full = FlatIndex(str(tmp_path / "full"))
+    full.add(documents=documents, embeddings=vectors.tolist(), ids=ids, metadatas=metadatas)
+
+    query = (vectors[11] + 0.1).tolist()
+    expected = full.query(query_embeddings=[query], n_results=5)
+
+    for options in (
+        {"precision": "float16"},
+        {"precision": "int8"},
+        {"precision": "int8", "dims": 32, "reduction": "pca"},
+        {"precision": "float16", "dims": 48, "reduction": "truncate"},
+    ):
+        path = tmp_path / "-".join(str(v) for v in options.values())
+        index = FlatIndex(str(path), rescore_factor=10, **options)
+        index.add(documents=documents, embeddings=vectors.tolist(), ids=ids, metadatas=metadatas)
+
+        result = index.query(query_embeddings=[query], n_results=5)
+        assert result["ids"][0] == expected["ids"][0]
+        assert np.allclose(result["distances"][0], expected["distances"][0], atol=1e-5)
+
+        stats = index.stats()
+        assert stats["compact_bytes"] < stats["full_bytes"]
+
+        # A new process reuses the persisted encoding
+        reopened = FlatIndex(str(path), rescore_factor=10, **options)
+        assert reopened.query(query_embeddings=[query], n_results=5)["ids"] == result["ids"]
+        assert reopened.compact is not None
+
+
+def test_flat_index_bulk_appends_in_place_and_commits_once(tmp_path):
+
+    vectors, ids, documents, metadatas = make_rows(100)
+    index = FlatIndex(str(tmp_path), precision="int8")
+    other = FlatIndex(str(tmp_path))
+
+    sidecar_writes = []
+    write_sidecar = index._write_sidecar
+    index._write_sidecar = lambda: sidecar_writes.append(1) or write_sidecar()
+
+    with index.bulk():
+        for start in range(0, 100, 10):
+            rows = slice(start, start + 10)
+            index.add(
+                documents=documents[rows], embeddings=vectors[rows].tolist(),
+                ids=ids[rows], metadatas=metadatas[rows]
+            )
+
+            # Writes do not refit the compact copy
+            assert index.compact is None
+
+        # Other processes only see committed rows
+        assert other.count() == 0
+        assert index.count() == 100
+
+    assert sidecar_writes == [1]
+    assert other.count() == 100
+    assert np.allclose(np.load(tmp_path / "embeddings.npy"), vectors, atol=1e-6)
+
+    index.upsert(documents=["replaced"], embeddings=[vectors[0].tolist()], ids=["id-50"])
+    result = other.query(query_embeddings=[vectors[0].tolist()], n_results=2)
+    assert sorted(result["ids"][0]) == ["id-0", "id-50"]
+    assert index.query(query_embeddings=[vectors[0].tolist()], n_results=1)["ids"][0][0] in {"id-0", "id-50"}
+    assert index.compact is not None
+
+
+def test_flat_index_grows_files_written_by_np_save(tmp_path):
+
+    vectors, ids, documents, metadatas = make_rows(12)
+    index = FlatIndex(str(tmp_path))
+    index.add(documents=documents[:6], embeddings=vectors[:6].tolist(), ids=ids[:6], metadatas=metadatas[:6])
+
+    # An index saved by an earlier version of FlatIndex
+    np.save(tmp_path / "embeddings.npy", np.load(tmp_path / "embeddings.npy"))
+
+    index.add(documents=documents[6:], embeddings=vectors[6:].tolist(), ids=ids[6:], metadatas=metadatas[6:])
+
+    assert np.allclose(np.load(tmp_path / "embeddings.npy"), vectors, atol=1e-6)
+    assert FlatIndex(str(tmp_path)).query(query_embeddings=[vectors[9].tolist()], n_results=1)["ids"][0] == ["id-9"]
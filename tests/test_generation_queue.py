@@ -0,0 +1,105 @@
+import asyncio
+import time
+import pytest
+from src.llm.generation_queue import BatchedGenerationQueue
+
+
+class TinyModel:
+    """
+    Stand-in for the HF model: one forward pass per batch, with a fixed
+    cost per call so batching is observable on CPU.
+    """
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def generate_batch(self, prompts):
+        self.batch_sizes.append(len(prompts))
+        time.sleep(0.05)
+        return [prompt.upper() for prompt in prompts]
+
+
+@pytest.mark.asyncio
+async def test_pending_prompts_are_batched_and_routed_back():
+
+    model = TinyModel()
+    queue = BatchedGenerationQueue(model.generate_batch, max_batch_size=8, max_wait_ms=20)
+
+    prompts = [f"prompt {i}" for i in range(6)]
+    outputs = await asyncio.gather(*[queue.submit(p) for p in prompts])
+
+    # Each caller receives the completion for its own prompt
+    assert outputs == [p.upper() for p in prompts]
+    assert model.batch_sizes == [6]
+
+    stats = queue.stats()
+    assert stats["batches"] == 1
+    assert stats["avg_batch_size"] == 6
+    assert stats["max_queue_wait_ms"] >= 0
+
+    queue.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_prompts_arriving_while_busy_form_the_next_batch():
+
+    model = TinyModel()
+    queue = BatchedGenerationQueue(model.generate_batch, max_batch_size=4, max_wait_ms=1)
+
+    first = asyncio.create_task(queue.submit("first"))
+    await asyncio.sleep(0.01)
+
+    # These queue up while "first" is on the model
+    rest = [asyncio.create_task(queue.submit(f"later {i}")) for i in range(6)]
+    await asyncio.gather(first, *rest)
+
+    assert model.batch_sizes[0] == 1
+    assert max(model.batch_sizes) <= 4
+    assert sum(model.batch_sizes) == 7
+
+    queue.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_batch_failure_is_raised_to_every_caller():
+
+    def broken(prompts):
+        raise RuntimeError("CUDA out of memory")
+
+    queue = BatchedGenerationQueue(broken, max_wait_ms=5)
+
+    results = await asyncio.gather(
+        queue.submit("a"), queue.submit("b"), return_exceptions=True
+    )
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    queue.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_exclusive_work_never_overlaps_a_batch():
+
+    active = []
+    overlaps = []
+
+    def enter(result):
+        if active:
+            overlaps.append(result)
+        active.append(result)
+        time.sleep(0.03)
+        active.pop()
+        return result
+
+    queue = BatchedGenerationQueue(
+        lambda prompts: [enter(p) for p in prompts], max_wait_ms=1
+    )
+
+    results = await asyncio.gather(
+        queue.submit("batched"), queue.run_exclusive(enter, "streamed"), queue.submit("again")
+    )
+
+    assert results == ["batched", "streamed", "again"]
+    assert overlaps == []
+
+    queue.shutdown()
@@ -0,0 +1,74 @@
+import json
+import httpx
+import pytest
+from src.llm.generator import GroundedGenerator, SYSTEM_PROMPT
+from src.llm.ollama_client import OllamaClient
+
+
+@pytest.mark.asyncio
+async def test_ollama_payload_sends_static_system_prompt():
+    payloads = []
+
+    async def handler(request):
+        payloads.append(json.loads(request.content))
+        return httpx.Response(200, json={
+            "response": "ok",
+            "done": True,
+            "prompt_eval_count": 40,
+            "prompt_eval_duration": 20_000_000
+        })
+
+    generator = GroundedGenerator(
+        backend="ollama",
+        ollama_client=OllamaClient(transport=httpx.MockTransport(handler)),
+        keep_alive="10m"
+    )
+
+    await generator.generate("What does it cost?", "Starter: $10")
+    await generator.generate("Which tier has SSO?", "Enterprise: SSO")
+
+    # The instructions are the same on every request; only the prompt changes
+    assert all(p["system"] == SYSTEM_PROMPT for p in payloads)
+    assert all(p["keep_alive"] == "10m" for p in payloads)
+    assert SYSTEM_PROMPT not in payloads[0]["prompt"]
+    assert "Starter: $10" in payloads[0]["prompt"]
+
+    # The full prompt is still the prefix plus the per-request part
+    assert generator.build_prompt("q", "c") == SYSTEM_PROMPT + generator.build_user_prompt("q", "c")
+
+    prefill = generator.stats()["prefill"]
+    assert prefill["requests"] == 2
+    assert prefill["avg_prompt_eval_tokens"] == 40
+    assert prefill["avg_prompt_eval_ms"] == 20.0
+
+    await generator.aclose()
+
+
+class BrokenStream(httpx.AsyncByteStream):
+    """One NDJSON message, then the connection drops."""
+
+    async def __aiter__(self):
+        yield json.dumps({"response": "Email", "done": False}).encode() + b"\n"
+        raise httpx.ReadError("connection reset")
+
+
+@pytest.mark.asyncio
+async def test_stream_failure_after_first_piece_is_raised():
+
+    async def handler(request):
+        return httpx.Response(200, stream=BrokenStream())
+
+    generator = GroundedGenerator(
+        backend="ollama",
+        ollama_client=OllamaClient(transport=httpx.MockTransport(handler))
+    )
+
+    pieces = []
+    with pytest.raises(httpx.ReadError):
+        async for piece in generator.generate_stream("Which channels?", "Email, SMS"):
+            pieces.append(piece)
+
+    # No refusal appended to the partial answer
+    assert pieces == ["Email"]
+
+    await generator.aclose()
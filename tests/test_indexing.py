@@ -27,3 +27,30 @@ def test_indexing_creates_embeddings():
 
     assert count > 0
     assert count == len(chunks)
+
+
+def test_indexing_writes_in_batches_and_retries_failed_batch(tmp_path, hash_embedder):
+
+    chunks = SmartChunker().chunk_documents(DocumentLoader(data_dir="data").load())
+
+    store = VectorStore(
+        embedder=hash_embedder,
+        persist_dir=str(tmp_path / "index"),
+        write_batch_size=16
+    )
+
+    # Fail the second write once; it should be retried on its own
+    add = store.collection.add
+    calls = []
+
+    def flaky_add(**kwargs):
+        calls.append(len(kwargs["ids"]))
+        if len(calls) == 2:
+            raise RuntimeError("transient write failure")
+        return add(**kwargs)
+
+    store.collection.add = flaky_add
+
+    assert store.index_chunks(chunks)
+    assert max(calls) <= 16
+    assert store.collection.count() == len(chunks)
@@ -0,0 +1,69 @@
+import json
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from benchmarks.load_test import find_knee, print_row, summarize
+from benchmarks.mock_ollama import MockOllama, create_app
+
+
+def mock_client(**kwargs):
+    mock = MockOllama(prefill_ms=1, tokens_per_second=1000, num_tokens=5, jitter=0, **kwargs)
+    return TestClient(create_app(mock))
+
+
+def test_mock_ollama_streams_tokens_then_timings():
+    with mock_client() as client:
+        response = client.post("/api/generate", json={"model": "phi3:mini", "prompt": "hi"})
+
+    messages = [json.loads(line) for line in response.text.splitlines()]
+
+    assert [m["done"] for m in messages] == [False] * 5 + [True]
+    assert messages[-1]["eval_count"] == 5
+    assert messages[-1]["prompt_eval_duration"] > 0
+
+
+def test_mock_ollama_non_streaming_respects_num_predict():
+    with mock_client() as client:
+        response = client.post(
+            "/api/generate",
+            json={"model": "phi3:mini", "prompt": "hi", "stream": False, "options": {"num_predict": 3}}
+        )
+
+    body = response.json()
+    assert body["done"] is True
+    assert body["eval_count"] == 3
+    assert len(body["response"].split()) == 3
+
+
+def test_summarize_reports_percentiles_and_errors():
+    results = [{"ok": True, "latency": i / 1000} for i in range(1, 101)]
+    results.append({"ok": False, "latency": 5.0})
+
+    row = summarize(4, results, seconds=10.0)
+
+    assert row["throughput_rps"] == 10.0
+    assert row["error_rate"] == round(1 / 101, 4)
+    assert row["p50_ms"] == 50.5
+    assert row["p99_ms"] < 101
+
+
+def test_knee_is_last_level_within_factor_of_lightest_load():
+    rows = [
+        {"level": 1, "p95_ms": 100.0},
+        {"level": 2, "p95_ms": 120.0},
+        {"level": 4, "p95_ms": 190.0},
+        {"level": 8, "p95_ms": 450.0},
+        {"level": 16, "p95_ms": 180.0},
+    ]
+
+    assert find_knee(rows, 2.0)["level"] == 4
+    assert find_knee([], 2.0) is None
+
+
+def test_row_with_no_successful_requests_prints(capsys):
+
+    row = summarize(8, [{"ok": False, "latency": 1.0}], seconds=1.0)
+    print_row(row, SimpleNamespace(stream=True))
+
+    assert "100.00%" in capsys.readouterr().out
@@ -22,3 +22,13 @@ def test_loader_loads_documents():
 
     assert isinstance(first_doc.content, str)
     assert len(first_doc.content) > 50
+
+
+def test_parallel_load_matches_sequential_order_and_content():
+    sequential = DocumentLoader(data_dir="data").load()
+
+    # Small page ranges so the PDF is also split across workers
+    parallel = DocumentLoader(data_dir="data", workers=2, pdf_pages_per_task=1).load()
+
+    assert [d.source for d in parallel] == [d.source for d in sequential]
+    assert [d.content for d in parallel] == [d.content for d in sequential]
@@ -0,0 +1,91 @@
+import json
+import os
+import time
+from src.monitoring.metrics import MetricsRegistry
+
+
+def test_histogram_and_counters_render_in_prometheus_format():
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+
+    registry.observe("rag_stage_seconds", 0.05, stage="embed")
+    registry.observe("rag_stage_seconds", 0.5, stage="embed")
+    registry.observe("rag_stage_seconds", 3.0, stage="embed")
+    registry.inc("rag_refusals_total", reason="out_of_scope")
+
+    with registry.in_flight("rag_in_flight_requests"):
+        text = registry.render()
+
+    assert "# TYPE rag_stage_seconds histogram" in text
+    assert 'rag_stage_seconds_bucket{stage="embed",le="0.1"} 1' in text
+    assert 'rag_stage_seconds_bucket{stage="embed",le="1"} 2' in text
+    assert 'rag_stage_seconds_bucket{stage="embed",le="+Inf"} 3' in text
+    assert 'rag_stage_seconds_count{stage="embed"} 3' in text
+    assert 'rag_refusals_total{reason="out_of_scope"} 1' in text
+    assert "rag_in_flight_requests 1" in text
+
+    # The gauge drops back once the request finishes
+    assert "rag_in_flight_requests 0" in registry.render()
+
+
+def test_workers_are_aggregated_through_snapshots(tmp_path):
+    worker = MetricsRegistry(directory=tmp_path)
+    worker.inc("rag_requests_total", endpoint="chat")
+    worker.add_gauge("rag_in_flight_requests", 2)
+    worker.flush()
+
+    # A sibling worker of the same server that has exited: its counters
+    # still count, its in-flight gauge does not
+    dead_pid = 2 ** 22 + 12345
+    path = tmp_path / f"metrics-{worker.run_id}-{dead_pid}.json"
+    path.write_text(json.dumps({
+        "pid": dead_pid,
+        "counters": [["rag_requests_total", [["endpoint", "chat"]], 3]],
+        "gauges": [["rag_in_flight_requests", [], 5]],
+        "histograms": []
+    }))
+
+    # Left over from an earlier server run: ignored and removed
+    stale = tmp_path / f"metrics-1.1-{dead_pid}.json"
+    stale.write_text(path.read_text())
+
+    scraper = MetricsRegistry(directory=tmp_path)
+    scraper.pid = os.getpid() + 1
+    text = scraper.render()
+
+    assert 'rag_requests_total{endpoint="chat"} 4' in text
+    assert "rag_in_flight_requests 2" in text
+    assert scraper.total("rag_requests_total") == 4
+    assert not stale.exists()
+
+
+def test_restarted_server_does_not_inherit_earlier_counts(tmp_path):
+    dead_pid = 2 ** 22 + 12345
+
+    # First run: one request, then the process exits
+    first = MetricsRegistry(directory=tmp_path, run_id="1000.1")
+    first.pid = dead_pid
+    first.inc("rag_requests_total", endpoint="chat")
+    first.flush()
+
+    # Second run, same directory (and possibly the same parent process)
+    second = MetricsRegistry(directory=tmp_path, run_id="2000.2")
+    second.inc("rag_requests_total", endpoint="chat")
+    second.flush()
+
+    assert second.total("rag_requests_total") == 1
+    assert [p.name for p in tmp_path.glob("metrics-*.json")] == [
+        f"metrics-2000.2-{second.pid}.json"
+    ]
+
+
+def test_scrapes_do_not_hold_back_the_next_flush(tmp_path):
+    registry = MetricsRegistry(directory=tmp_path, flush_interval=0.05)
+    registry.inc("rag_requests_total", endpoint="chat")
+    registry.flush()
+
+    registry.inc("rag_requests_total", endpoint="chat")
+    registry.render()
+    time.sleep(0.3)
+
+    snapshot = json.loads(registry._snapshot_path().read_text())
+    assert snapshot["counters"] == [["rag_requests_total", [["endpoint", "chat"]], 2.0]]
@@ -0,0 +1,75 @@
+import asyncio
+import json
+import httpx
+import pytest
+from src.llm.ollama_client import OllamaClient
+
+
+@pytest.mark.asyncio
+async def test_client_is_reused_across_requests():
+
+    async def handler(request):
+        return httpx.Response(200, json={"response": "ok", "done": True})
+
+    ollama = OllamaClient(transport=httpx.MockTransport(handler))
+
+    first = await ollama.generate({"model": "phi3:mini", "prompt": "a"})
+    client = ollama.client
+    second = await ollama.generate({"model": "phi3:mini", "prompt": "b"})
+
+    # One long-lived client serves every request
+    assert ollama.client is client
+    assert first["response"] == second["response"] == "ok"
+
+    stats = ollama.pool_stats()
+    assert stats["requests"] == 2
+    assert stats["in_flight"] == 0
+
+    await ollama.aclose()
+    assert ollama.client is None
+
+
+@pytest.mark.asyncio
+async def test_stalled_server_hits_total_deadline():
+
+    async def handler(request):
+        await asyncio.sleep(5)
+        return httpx.Response(200, json={"response": "late"})
+
+    ollama = OllamaClient(
+        transport=httpx.MockTransport(handler),
+        total_timeout=0.1
+    )
+
+    with pytest.raises(asyncio.TimeoutError):
+        await ollama.generate({"model": "phi3:mini", "prompt": "a"})
+
+    assert ollama.pool_stats()["timeouts"]["total"] == 1
+
+    await ollama.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stream_generate_yields_ndjson_messages():
+
+    async def handler(request):
+        lines = [
+            {"response": "Gov", "done": False},
+            {"response": "Delivery", "done": False},
+            {"response": "", "done": True, "eval_count": 2},
+        ]
+        body = "\n".join(json.dumps(line) for line in lines) + "\n"
+        return httpx.Response(200, content=body.encode())
+
+    ollama = OllamaClient(transport=httpx.MockTransport(handler))
+
+    messages = [
+        message
+        async for message in ollama.stream_generate({"model": "phi3:mini", "prompt": "a"})
+    ]
+
+    assert "".join(m["response"] for m in messages) == "GovDelivery"
+    assert messages[-1]["done"] is True
+    assert ollama.pool_stats()["in_flight"] == 0
+
+    await ollama.aclose()
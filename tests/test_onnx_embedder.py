@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("onnx")
+
+from src.vectorstore.embeddings import Embedder
+
+
+TEXTS = [
+    "What are the key features of GovDelivery Communications Cloud?",
+    "Meeting Management Suite stores agendas, minutes and recordings.",
+    "Data is encrypted with AES-256 at rest and TLS 1.2 in transit.",
+]
+
+
+@pytest.mark.parametrize("quantize", [False, True])
+def test_onnx_embeddings_agree_with_torch(tmp_path, quantize):
+
+    try:
+        reference = Embedder(backend="torch")
+        onnx = Embedder(backend="onnx", onnx_dir=str(tmp_path), onnx_quantize=quantize)
+    except Exception as e:
+        pytest.skip(f"Embedding model unavailable: {e}")
+
+    expected = np.array(reference.embed_texts(TEXTS))
+    actual = np.array(onnx.embed_texts(TEXTS))
+
+    assert actual.shape == expected.shape
+
+    # Both are L2-normalized, so the row-wise dot product is the cosine
+    cosine = (expected * actual).sum(axis=1)
+    assert cosine.min() > (0.98 if quantize else 0.9999)
+
+    query = np.array(onnx.embed_query(TEXTS[0]))
+    assert np.allclose(query, actual[0], atol=1e-5)
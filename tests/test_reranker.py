@@ -0,0 +1,73 @@
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+from src.vectorstore.reranker import Reranker
+
+
+class CountingModel:
+    """
+    Fake cross-encoder: logit = fixed score per document, recording
+    every batch it is asked to score.
+    """
+
+    def __init__(self, logits):
+        self.logits = logits
+        self.batches = []
+
+    def predict(self, pairs, batch_size=32, show_progress_bar=False):
+        self.batches.append(len(pairs))
+        return np.array([self.logits[doc] for _, doc in pairs])
+
+
+def test_rerank_keeps_chunks_above_adaptive_cutoff():
+    model = CountingModel({"pricing table": 4.0, "plan tiers": 1.0, "office hours": -6.0})
+    reranker = Reranker(model=model, min_score=0.05, relative_cutoff=0.3)
+
+    kept = reranker.rerank("enterprise price", ["office hours", "pricing table", "plan tiers"])
+
+    # Best first; the irrelevant chunk falls below the cutoff
+    assert [i for i, _ in kept] == [1, 2]
+    assert kept[0][1] > kept[1][1]
+
+    # All pairs scored in one batch
+    assert model.batches == [3]
+
+
+def test_scores_are_cached_per_question_and_chunk():
+    model = CountingModel({"a": 2.0, "b": 0.5, "c": -1.0})
+    reranker = Reranker(model=model)
+
+    reranker.rerank("What is the price?", ["a", "b"])
+    reranker.rerank("what is the price", ["a", "b", "c"])
+
+    # Only the new chunk is scored the second time
+    assert model.batches == [2, 1]
+    assert reranker.stats()["cache_hits"] == 2
+
+
+def test_best_chunk_is_always_kept():
+    model = CountingModel({"a": -8.0, "b": -9.0})
+    reranker = Reranker(model=model, min_score=0.5)
+
+    kept = reranker.rerank("q", ["a", "b"])
+
+    assert [i for i, _ in kept] == [0]
+
+
+def test_older_sentence_transformers_also_load_without_activation(monkeypatch):
+
+    class OldCrossEncoder(CountingModel):
+        """sentence-transformers < 4: no activation_fn keyword."""
+
+        def __init__(self, model_name, max_length=512, default_activation_function=None):
+            super().__init__({"a": 0.0})
+            self.activation = default_activation_function
+
+    monkeypatch.setitem(sys.modules, "torch", SimpleNamespace(nn=SimpleNamespace(Identity=lambda: "identity")))
+    monkeypatch.setitem(sys.modules, "sentence_transformers", SimpleNamespace(CrossEncoder=OldCrossEncoder))
+
+    reranker = Reranker("old-model")
+
+    assert reranker.model.activation == "identity"
+    assert reranker.score("q", ["a"]) == [0.5]
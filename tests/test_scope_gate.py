@@ -0,0 +1,65 @@
+import numpy as np
+from src.vectorstore.scope import ScopeGate
+
+
+class FakeStore:
+    def __init__(self, embeddings, version="v1"):
+        self.embeddings = np.asarray(embeddings, dtype=np.float32)
+        self.version = version
+
+    def index_version(self):
+        return self.version
+
+    def get_embeddings(self, limit=None):
+        return self.embeddings[:limit] if limit else self.embeddings
+
+
+def clustered_corpus(dim=32, clusters=4, per_cluster=50, seed=0):
+    rng = np.random.default_rng(seed)
+
+    # Corpus topics live in the first half of the space
+    centers = np.zeros((clusters, dim))
+    centers[:, :dim // 2] = rng.normal(size=(clusters, dim // 2))
+
+    points = np.repeat(centers, per_cluster, axis=0)
+    points += 0.1 * rng.normal(size=points.shape)
+    return points / np.linalg.norm(points, axis=1, keepdims=True), centers
+
+
+def test_gate_separates_corpus_topics_from_unrelated_queries(tmp_path):
+    corpus, centers = clustered_corpus()
+
+    gate = ScopeGate(tmp_path / "scope.npz", n_centroids=4, threshold=0.5)
+    assert gate.build(FakeStore(corpus))
+
+    # A query near a corpus topic passes; one in the unused half does not
+    assert gate.in_scope(centers[2] + 0.05)
+
+    off_topic = np.zeros(32)
+    off_topic[20] = 1.0
+    assert not gate.in_scope(off_topic)
+
+    assert gate.stats()["checks"] == 2
+    assert gate.stats()["rejected"] == 1
+
+
+def test_centroids_persist_with_index_version(tmp_path):
+    corpus, _ = clustered_corpus()
+    store = FakeStore(corpus, version="v1")
+
+    ScopeGate(tmp_path / "scope.npz", n_centroids=4).build(store)
+
+    # A new worker loads the centroids instead of refitting
+    reloaded = ScopeGate(tmp_path / "scope.npz")
+    assert reloaded.centroids.shape == (4, 32)
+    assert not reloaded.is_stale(store)
+
+    store.version = "v2"
+    assert reloaded.is_stale(store)
+
+
+def test_gate_without_centroids_lets_everything_through(tmp_path):
+    gate = ScopeGate(tmp_path / "scope.npz")
+
+    assert gate.build(FakeStore(np.zeros((0, 8))))
+    assert gate.in_scope([0.0] * 7 + [1.0])
@@ -0,0 +1,76 @@
+import numpy as np
+from src.cache.semantic_cache import SemanticCache
+
+
+def unit(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+def test_paraphrase_above_threshold_is_served_from_cache():
+
+    cache = SemanticCache(similarity_threshold=0.95)
+
+    result = {"answer": "GovDelivery pricing ...", "confidence": 0.9}
+    cache.add("What does GovDelivery cost?", unit([1.0, 0.0, 0.1]), result)
+
+    # Near-identical embedding (e.g. different casing / punctuation)
+    assert cache.lookup(unit([1.0, 0.0, 0.12])) == result
+
+    # Unrelated question falls below the threshold
+    assert cache.lookup(unit([0.0, 1.0, 0.0])) is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["entries"] == 1
+
+
+def test_threshold_is_tunable():
+
+    cache = SemanticCache(similarity_threshold=0.5)
+    cache.add("q", unit([1.0, 1.0]), {"answer": "a", "confidence": 0.9})
+
+    # cos(45°) ≈ 0.707 passes a 0.5 threshold
+    assert cache.lookup(unit([1.0, 0.0])) is not None
+
+
+def test_lru_eviction_respects_max_entries():
+
+    cache = SemanticCache(similarity_threshold=0.99, max_entries=2)
+
+    cache.add("a", unit([1.0, 0.0, 0.0]), {"answer": "a", "confidence": 0.9})
+    cache.add("b", unit([0.0, 1.0, 0.0]), {"answer": "b", "confidence": 0.9})
+
+    # Touch "a" so "b" becomes least recently used
+    assert cache.lookup(unit([1.0, 0.0, 0.0]))["answer"] == "a"
+
+    cache.add("c", unit([0.0, 0.0, 1.0]), {"answer": "c", "confidence": 0.9})
+
+    assert len(cache) == 2
+    assert cache.lookup(unit([0.0, 1.0, 0.0])) is None
+    assert cache.lookup(unit([1.0, 0.0, 0.0]))["answer"] == "a"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl():
+
+    cache = SemanticCache(ttl_seconds=0.0)
+    cache.add("a", unit([1.0, 0.0]), {"answer": "a", "confidence": 0.9})
+
+    assert cache.lookup(unit([1.0, 0.0])) is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["bytes"] == 0
+
+
+def test_new_index_version_invalidates_entries():
+
+    cache = SemanticCache()
+    cache.add("a", unit([1.0, 0.0]), {"answer": "a", "confidence": 0.9}, "v1")
+
+    assert cache.lookup(unit([1.0, 0.0]), "v1") is not None
+
+    # After a reindex the old answer must not be served
+    assert cache.lookup(unit([1.0, 0.0]), "v2") is None
+    assert cache.stats()["invalidations"] == 1
+    assert len(cache) == 0
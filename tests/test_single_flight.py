@@ -0,0 +1,47 @@
+import asyncio
+import pytest
+from src.cache.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_calls_share_one_execution():
+
+    flight = SingleFlight()
+    calls = 0
+
+    async def generate():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"answer": "shared", "confidence": 0.9}
+
+    results = await asyncio.gather(
+        *[flight.do("what does govdelivery cost", generate) for _ in range(5)]
+    )
+
+    # One generation, five identical answers
+    assert calls == 1
+    assert all(result is results[0] for result in results)
+
+    stats = flight.stats()
+    assert stats["leaders"] == 1
+    assert stats["coalesced"] == 4
+    assert stats["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_shared_work():
+
+    flight = SingleFlight()
+
+    async def generate():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    leader = asyncio.create_task(flight.do("q", generate))
+    follower = asyncio.create_task(flight.do("q", generate))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+
+    assert await follower == "done"
@@ -0,0 +1,182 @@
+import json
+
+from fastapi.testclient import TestClient
+
+import src.api.app as api
+from src.cache.semantic_cache import SemanticCache
+from src.llm.context_builder import ContextBuilder
+from src.rag_pipeline import REFUSAL, RAGPipeline
+
+
+class FakeBatcher:
+    async def embed(self, question):
+        return [1.0, 0.0, 0.0]
+
+
+class FakeRetriever:
+    def __init__(self, documents, distances, error=None):
+        self.documents = documents
+        self.distances = distances
+        self.error = error
+        self.calls = 0
+
+    async def query(self, question, top_k=5, query_embedding=None):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return {"documents": [self.documents], "distances": [self.distances]}
+
+
+class FakeStore:
+    def index_version(self):
+        return "v1"
+
+
+class FakeGenerator:
+    """Streams the answer in fixed pieces, like Ollama's NDJSON stream."""
+
+    pieces = ["Email, ", "SMS ", "and analytics."]
+
+    def build_prompt(self, question, context):
+        return f"{context}\n{question}"
+
+    async def generate_stream(self, question, context):
+        for piece in self.pieces:
+            yield piece
+
+
+class FailingGenerator(FakeGenerator):
+    """Drops the connection after the first piece."""
+
+    async def generate_stream(self, question, context):
+        yield self.pieces[0]
+        raise RuntimeError("connection reset")
+
+
+def make_pipeline(retriever):
+    # Only the attributes ask_stream uses; no models are loaded
+    rag = RAGPipeline.__new__(RAGPipeline)
+    rag.embed_batcher = FakeBatcher()
+    rag.retriever = retriever
+    rag.store = FakeStore()
+    rag.cache = SemanticCache(similarity_threshold=0.95)
+    rag.scope_gate = None
+    rag.reranker = None
+    rag.context_builder = ContextBuilder()
+    rag.generator = FakeGenerator()
+    return rag
+
+
+def parse_events(body: str) -> list:
+    events = []
+
+    for block in body.strip().split("\n\n"):
+        event_line, data_line = block.split("\n")
+        assert event_line.startswith("event: ") and data_line.startswith("data: ")
+
+        data = json.loads(data_line[len("data: "):])
+        assert data["type"] == event_line[len("event: "):]
+        events.append(data)
+
+    return events
+
+
+def stream(rag, monkeypatch, question="What features does GovDelivery have?"):
+    monkeypatch.setattr(api, "rag_pipeline", rag)
+
+    # No lifespan: the pipeline is injected instead of built
+    client = TestClient(api.app)
+    response = client.post(
+        "/chat/stream", json={"question": question}, headers={"X-Request-ID": "req-1"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["X-Request-ID"] == "req-1"
+
+    return parse_events(response.text)
+
+
+def test_stream_sends_tokens_then_done_with_timings(monkeypatch):
+
+    retriever = FakeRetriever(["GovDelivery supports email and SMS."], [0.05])
+    events = stream(make_pipeline(retriever), monkeypatch)
+
+    assert [e["type"] for e in events] == ["token"] * 3 + ["done"]
+    assert "".join(e["text"] for e in events[:-1]) == "".join(FakeGenerator.pieces)
+
+    done = events[-1]
+    assert done["cached"] is False
+    assert done["confidence"] == 0.95
+    assert done["prompt_tokens"] > 0
+    assert set(done["timings"]) >= {"embed", "retrieval", "time_to_first_token", "generation", "total"}
+    assert done["timings"]["time_to_first_token"] <= done["timings"]["total"]
+
+
+def test_repeated_question_is_streamed_from_the_cache(monkeypatch):
+
+    retriever = FakeRetriever(["GovDelivery supports email and SMS."], [0.05])
+    rag = make_pipeline(retriever)
+
+    stream(rag, monkeypatch)
+    events = stream(rag, monkeypatch)
+
+    assert retriever.calls == 1
+    assert [e["type"] for e in events] == ["token", "done"]
+    assert events[0]["text"] == "Email, SMS and analytics."
+    assert events[-1]["cached"] is True
+
+
+def test_unrelated_question_is_refused_without_generation(monkeypatch):
+
+    retriever = FakeRetriever(["Unrelated chunk."], [0.8])
+    events = stream(make_pipeline(retriever), monkeypatch)
+
+    assert events == [
+        {"type": "token", "text": REFUSAL},
+        {**events[-1], "type": "done", "confidence": 0.0, "cached": False},
+    ]
+    assert "generation" not in events[-1]["timings"]
+
+
+def test_pipeline_failure_ends_the_stream_with_an_error_event(monkeypatch):
+
+    retriever = FakeRetriever([], [], error=RuntimeError("vector store unavailable"))
+    events = stream(make_pipeline(retriever), monkeypatch)
+
+    assert [e["type"] for e in events] == ["error", "done"]
+    assert events[0]["text"] == REFUSAL
+    assert events[-1]["confidence"] == 0.0
+
+
+def test_empty_question_is_rejected(monkeypatch):
+
+    monkeypatch.setattr(api, "rag_pipeline", make_pipeline(FakeRetriever([], [])))
+
+    response = TestClient(api.app).post("/chat/stream", json={"question": "  "})
+    assert response.status_code == 400
+
+
+def test_failure_after_first_token_ends_with_error_and_is_not_cached(monkeypatch):
+
+    retriever = FakeRetriever(["GovDelivery supports email and SMS."], [0.05])
+    rag = make_pipeline(retriever)
+    rag.generator = FailingGenerator()
+
+    events = stream(rag, monkeypatch)
+
+    assert [e["type"] for e in events] == ["token", "error", "done"]
+    assert events[-1]["confidence"] == 0.0
+    assert len(rag.cache) == 0
+
+
+def test_blank_context_is_refused_without_generation(monkeypatch):
+
+    rag = make_pipeline(FakeRetriever(["   "], [0.05]))
+    rag.generator = FailingGenerator()
+
+    events = stream(rag, monkeypatch)
+
+    assert [e["type"] for e in events] == ["token", "done"]
+    assert events[0]["text"] == REFUSAL
+    assert "generation" not in events[-1]["timings"]
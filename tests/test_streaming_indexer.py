@@ -0,0 +1,108 @@
+import threading
+import time
+
+from src.ingestion.loader import DocumentLoader
+from src.chunking.chunker import SmartChunker
+from src.vectorstore.store import VectorStore
+from src.vectorstore.streaming_indexer import StreamingIndexer
+
+
+class FlakyStore(VectorStore):
+    """Fails every write that contains a chunk from bad.txt."""
+
+    def write_batch(self, chunks, embeddings, upsert=False):
+        if any(chunk.source == "bad.txt" for chunk in chunks):
+            raise RuntimeError("write failed")
+        return super().write_batch(chunks, embeddings, upsert=upsert)
+
+
+class Aborted(BaseException):
+    """Escapes the per-batch error handling, like a KeyboardInterrupt."""
+
+
+class AbortingStore(VectorStore):
+    """Aborts the first write, once the upstream queues have filled up."""
+
+    def write_batch(self, chunks, embeddings, upsert=False):
+        time.sleep(0.3)
+        raise Aborted()
+
+
+def make_data(tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+
+    for i in range(5):
+        (data_dir / f"doc{i}.txt").write_text(
+            f"Document {i} about Granicus communications and agenda management. " * 40
+        )
+
+    return data_dir
+
+
+def test_streaming_indexer_matches_batch_indexing(tmp_path, hash_embedder):
+
+    data_dir = make_data(tmp_path)
+    loader = DocumentLoader(data_dir=str(data_dir))
+    chunker = SmartChunker(chunk_size=200, overlap=20)
+
+    store = VectorStore(embedder=hash_embedder, persist_dir=str(tmp_path / "index"))
+    stats = StreamingIndexer(store, loader, chunker, batch_size=3, queue_size=1).run()
+
+    expected = chunker.chunk_documents(loader.load())
+
+    assert stats["documents"] == 5
+    assert stats["chunks"] == len(expected)
+    assert stats["batches"] > 1
+    assert stats["failed_batches"] == 0
+    assert store.collection.count() == len(expected)
+    assert sorted(sum(stats["chunk_ids"].values(), [])) == sorted(c.chunk_id for c in expected)
+
+
+def test_streaming_indexer_isolates_failed_batches(tmp_path, hash_embedder):
+
+    data_dir = make_data(tmp_path)
+    (data_dir / "bad.txt").write_text("This file cannot be written to the index. " * 10)
+
+    store = FlakyStore(embedder=hash_embedder, persist_dir=str(tmp_path / "index"))
+    indexer = StreamingIndexer(
+        store,
+        DocumentLoader(data_dir=str(data_dir)),
+        SmartChunker(chunk_size=200, overlap=20),
+        batch_size=1
+    )
+
+    stats = indexer.run()
+
+    # The other documents are still indexed
+    assert stats["failed_sources"] == ["bad.txt"]
+    assert stats["failed_batches"] >= 1
+    assert stats["chunks"] > 0
+    assert store.collection.count() == stats["chunks"]
+
+
+def test_streaming_indexer_shuts_down_when_the_writer_dies_on_full_queues(tmp_path, hash_embedder):
+
+    store = AbortingStore(embedder=hash_embedder, persist_dir=str(tmp_path / "index"))
+    indexer = StreamingIndexer(
+        store,
+        DocumentLoader(data_dir=str(make_data(tmp_path))),
+        SmartChunker(chunk_size=200, overlap=20),
+        batch_size=1,
+        queue_size=1
+    )
+
+    raised = []
+
+    def run():
+        try:
+            indexer.run()
+        except Aborted:
+            raised.append(True)
+
+    runner = threading.Thread(target=run, daemon=True)
+    runner.start()
+    runner.join(timeout=10)
+
+    assert not runner.is_alive()
+    assert raised == [True]
@@ -0,0 +1,47 @@
+from src.ingestion.loader import DocumentLoader
+from src.chunking.chunker import SmartChunker
+from src.vectorstore.store import VectorStore
+from src.vectorstore.sync import IndexSyncer
+
+
+PARAGRAPH = "GovDelivery Communications Cloud supports email, SMS and social publishing. "
+
+
+def test_sync_only_reembeds_changed_files(tmp_path, hash_embedder):
+
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    (data_dir / "a.txt").write_text(PARAGRAPH * 3)
+    (data_dir / "b.txt").write_text("Meeting Management Suite stores recordings. " * 4)
+
+    embedder = hash_embedder
+    store = VectorStore(embedder=embedder, persist_dir=str(tmp_path / "index"))
+    syncer = IndexSyncer(store, DocumentLoader(data_dir=str(data_dir)), SmartChunker())
+
+    # First sync indexes everything
+    report = syncer.sync()
+    assert sorted(report["added"]) == ["a.txt", "b.txt"]
+    initial_count = store.collection.count()
+    assert initial_count > 0
+
+    # Nothing changed: nothing is embedded
+    embedder.calls = 0
+    report = syncer.sync()
+    assert report["unchanged"] == 2
+    assert embedder.calls == 0
+    assert store.collection.count() == initial_count
+
+    # Edit one file: only it is re-embedded, its old chunks are removed
+    (data_dir / "a.txt").write_text("Granicus Peak Performance includes load balancing. " * 3)
+    report = syncer.sync()
+    assert report["updated"] == ["a.txt"]
+    assert report["chunks_deleted"] > 0
+
+    # Remove a file: its chunks are deleted
+    (data_dir / "b.txt").unlink()
+    report = syncer.sync()
+    assert report["removed"] == ["b.txt"]
+
+    manifest = syncer.load_manifest()
+    assert list(manifest["files"]) == ["a.txt"]
+    assert store.collection.count() == len(manifest["files"]["a.txt"]["chunk_ids"])
@@ -0,0 +1,72 @@
+import asyncio
+import json
+import pytest
+from src.monitoring import tracing
+from src.vectorstore.retriever import AsyncRetriever
+
+
+class FakeStore:
+    persist_dir = "unused"
+
+    @tracing.traced("vectorstore.query")
+    def query(self, query, top_k=5, filters=None, query_embedding=None):
+        return {"documents": [["doc"]], "distances": [[0.1]]}
+
+
+@pytest.mark.asyncio
+async def test_spans_follow_the_request_into_executor_threads(tmp_path):
+    trace_file = tmp_path / "traces.jsonl"
+    tracing.set_exporter(tracing.JsonlExporter(str(trace_file)))
+
+    retriever = AsyncRetriever(FakeStore(), executor_type="thread", max_workers=2)
+
+    try:
+        with tracing.start_trace("POST /chat", request_id="req-1") as trace:
+            with tracing.span("rag.retrieve"):
+                await retriever.query("price?")
+    finally:
+        tracing.set_exporter(None)
+        retriever.shutdown()
+
+    spans = {span.name: span for span in trace.spans}
+
+    # The query ran on a retrieval thread but is a child of rag.retrieve
+    assert spans["vectorstore.query"].parent_id == spans["rag.retrieve"].span_id
+    assert spans["rag.retrieve"].parent_id == spans["POST /chat"].span_id
+    assert list(trace.timings()) == ["POST /chat", "rag.retrieve", "vectorstore.query"]
+
+    # One OTLP/JSON line per trace, every span carrying the request ID
+    exported = json.loads(trace_file.read_text().strip())
+    otlp_spans = exported["resourceSpans"][0]["scopeSpans"][0]["spans"]
+
+    assert len(otlp_spans) == 3
+    assert {s["traceId"] for s in otlp_spans} == {trace.trace_id}
+    assert all(
+        {"key": "request.id", "value": {"stringValue": "req-1"}} in s["attributes"]
+        for s in otlp_spans
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_keep_separate_traces():
+
+    @tracing.traced("work")
+    async def work():
+        await asyncio.sleep(0.01)
+
+    async def request(request_id):
+        with tracing.start_trace("request", request_id=request_id) as trace:
+            await work()
+        return trace
+
+    first, second = await asyncio.gather(request("a"), request("b"))
+
+    assert [s.name for s in first.spans] == ["request", "work"]
+    assert [s.name for s in second.spans] == ["request", "work"]
+
+
+def test_spans_outside_a_request_record_nothing():
+    with tracing.span("orphan") as span:
+        assert span is None
+
+    assert tracing.current_span() is None